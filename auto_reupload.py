@@ -18,11 +18,13 @@
 
 import argparse
 import base64
+import copy
 import glob
 import json
 import logging
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pprint import pformat
 from typing import Dict, Tuple, Any, Union
@@ -57,6 +59,7 @@ from modules.torrent_client import Clients, TorrentClientFactory
 from utilities.utils_dupes import search_for_dupes_api
 from utilities.utils_reupload import (
     AutoReUploaderManager,
+    RetryStage,
     TorrentFailureStatus,
     TrackerUploadStatus,
 )
@@ -65,7 +68,12 @@ from utilities.utils_reupload import (
 # Method that will search for dupes in trackers.
 # This is used to take screenshots and eventually upload them to either imgbox, imgbb, ptpimg or freeimage
 from utilities.utils_screenshots import GGBotScreenshotManager
-from utilities.utils_torrent import GGBotTorrentCreator
+from utilities.utils_stage_graph import GGBotStageGraph
+from utilities.utils_torrent import (
+    GGBotTorrentCreator,
+    get_piece_size_policies,
+)
+from utilities.utils_tracker_fanout import GGBotTrackerLimiter, run_for_trackers
 
 # PTP is blacklisted for Reuploader since support for PTP is still a work in progress
 # GPW is blacklisted since the dupe check is pretty much a hit and miss since audio information
@@ -84,10 +92,6 @@ console = Console()
 working_folder = os.path.dirname(os.path.realpath(__file__))
 cookies_dump = COOKIES_DUMP_DIR.format(base_path=working_folder)
 
-# This is an important dict that we use to store info about the media file as we discover it
-# Once all necessary info has been collected we will loop through this dict and set the correct tracker API Keys to it
-torrent_info = {}
-
 # Debug logs for the upload processing
 # Logger running in "w" : write mode
 logging.basicConfig(
@@ -248,6 +252,10 @@ logging.info(
     "[Main] Going to establish connection to the torrent client configured"
 )
 reuploader_config = ReUploaderConfig()
+# limits the requests made to the trackers across all the torrents being processed
+tracker_limiter = GGBotTrackerLimiter(
+    requests_per_minute=reuploader_config.TRACKER_REQUESTS_PER_MINUTE
+)
 # getting an instance of the torrent client factory
 torrent_client_factory = TorrentClientFactory()
 # creating the torrent client using the factory based on the users configuration
@@ -347,7 +355,7 @@ if reuploader_config.ENABLE_VISOR_SERVER:
 # ---------------------------------------------------------------------- #
 #                          Dupe Check in Tracker                         #
 # ---------------------------------------------------------------------- #
-def check_for_dupes_in_tracker(tracker, temp_tracker_api_key):
+def check_for_dupes_in_tracker(tracker, temp_tracker_api_key, torrent_info):
     """
     Method to check for any duplicate torrents in the tracker.
     First we read the configuration for the tracker and format the title according to the tracker configuration
@@ -735,7 +743,7 @@ def upload_to_site(upload_to, tracker_api_key, config, tracker_settings):
 # ---------------------------------------------------------------------- #
 #                          Analysing basic details!                      #
 # ---------------------------------------------------------------------- #
-def identify_type_and_basic_info(full_path, guess_it_result):
+def identify_type_and_basic_info(full_path, guess_it_result, torrent_info):
     """
     guessit is typically pretty good at getting the title, year, resolution, group extracted
     but we need to do some more work for things like audio channels, codecs, etc
@@ -745,6 +753,7 @@ def identify_type_and_basic_info(full_path, guess_it_result):
         ffprobe to get that ourselves (pymediainfo has issues when dealing with atmos and more complex codecs)
 
     :param full_path: the full path for the file / folder
+    :param torrent_info: the processing context of the torrent being reuploaded
 
     Returns `skip_to_next_file` if there are no video files in thhe provided folder
     """
@@ -963,7 +972,9 @@ def identify_type_and_basic_info(full_path, guess_it_result):
     for missing_val in keys_we_need_but_missing_torrent_info:
         # Save the analyze_video_file() return result into the 'torrent_info' dict
         torrent_info[missing_val] = analyze_video_file(
-            missing_value=missing_val, media_info=media_info_result
+            missing_value=missing_val,
+            media_info=media_info_result,
+            torrent_info=torrent_info,
         )
 
     logging.debug(
@@ -1030,7 +1041,7 @@ def identify_type_and_basic_info(full_path, guess_it_result):
 # -------------- END of identify_type_and_basic_info --------------
 
 
-def analyze_video_file(missing_value, media_info):
+def analyze_video_file(missing_value, media_info, torrent_info):
     """
     This method is being called in loop with mediainfo calculation all taking place multiple times.
     Optimize this code for better performance
@@ -1160,7 +1171,9 @@ def analyze_video_file(missing_value, media_info):
 # ---------------------------------------------------------------------- #
 #                      Analysing miscellaneous details!                  #
 # ---------------------------------------------------------------------- #
-def identify_miscellaneous_details(guess_it_result, file_to_parse):
+def identify_miscellaneous_details(
+    guess_it_result, file_to_parse, torrent_info
+):
     """
     This function is dedicated to analyzing the filename and extracting snippets such as "repack, "DV", "AMZN", etc
     Depending on what the "source" is we might need to search for a "web source" (amzn, nf, hulu, etc)
@@ -1344,30 +1357,68 @@ def identify_miscellaneous_details(guess_it_result, file_to_parse):
 # ---------------------------------------------------------------------- #
 #                             Torrent Processor!                         #
 # ---------------------------------------------------------------------- #
-def _process_torrent(torrent: Dict):
+def _process_torrent(torrent: Dict, cached_data: Union[Dict, None]):
     # for each completed torrents we start the processing
     logging.info(
         f'[Main] Starting processing of torrent {torrent["name"]} from path {torrent["save_path"]}'
     )
 
-    cached_data: Dict = reupload_manager.get_cached_data(torrent["hash"])
+    # cached data is obtained along with the processable torrents, hence need not be queried again here
     logging.debug(
         f"[Main] Cached data obtained from cache for torrent {torrent['hash']}: {pformat(cached_data)}"
     )
 
     if cached_data is None:
-        # Initializing the torrent data to cache
-        cached_data: Dict = reupload_manager.initialize_torrent(torrent)
+        # Initializing the torrent data to cache. The torrent is claimed by this instance during the initialization
+        cached_data = reupload_manager.initialize_torrent(torrent)
+        is_new_torrent = True
     else:
         logging.info(
             f"[Main] Cached data found for torrent with hash {torrent['hash']}"
         )
-        if reupload_manager.skip_reupload(cached_data):
-            logging.info(
-                f"[Main] Skipping upload and processing of torrent {cached_data['name']} since retry limit has exceeded"
+        # the cached data is refreshed while claiming, since another instance could have processed the torrent
+        cached_data = reupload_manager.claim_torrent(torrent["hash"])
+        is_new_torrent = False
+    if cached_data is None:
+        logging.info(
+            f"[Main] Skipping torrent {torrent['name']} since it is being processed by another instance"
+        )
+        return
+
+    # the lease is renewed while the torrent is being processed and released once the processing is complete
+    with reupload_manager.lease(torrent["hash"]):
+        retry_context = None
+        if not is_new_torrent:
+            if reupload_manager.skip_reupload(cached_data):
+                logging.info(
+                    f"[Main] Skipping upload and processing of torrent {cached_data['name']} since retry limit has exceeded"
+                )
+                return
+            retry_context = reupload_manager.resume_scheduled_retry(cached_data)
+
+        try:
+            _reupload_torrent(torrent, cached_data, retry_context)
+        except Exception:
+            logging.exception(
+                f"[Main] Unexpected error while processing torrent {torrent['name']} ({torrent['hash']})"
             )
-            return
+            # unexpected errors could be transient (network, file system etc.). such failures are retried later with
+            # the screenshots and .torrent files generated by this attempt
+            if not reupload_manager.schedule_retry(
+                torrent["hash"],
+                TorrentFailureStatus.UNKNOWN_FAILURE,
+                cached_data["upload_attempt"],
+                retry_stage=RetryStage.PROCESSING,
+            ):
+                reupload_manager.mark_torrent_failure(
+                    torrent["hash"],
+                    status=TorrentFailureStatus.UNKNOWN_FAILURE,
+                )
+
 
+def _reupload_torrent(
+    torrent: Dict, cached_data: Dict, retry_context: Union[Dict, None]
+):
     # dynamic_tracker_selection
     target_trackers = reupload_manager.get_trackers_dynamically(
         torrent=torrent,
@@ -1375,6 +1426,19 @@ def _process_torrent(torrent: Dict):
         api_keys_dict=api_keys_dict,
         all_trackers_list=acronym_to_tracker.keys(),
     )
+    if (
+        retry_context is not None
+        and retry_context["retry_stage"] == RetryStage.TRACKER_UPLOAD
+    ):
+        # only the trackers to which the upload failed in the previous attempt are retried
+        retry_trackers = [
+            tracker
+            for tracker in target_trackers
+            if tracker in retry_context["retry_trackers"]
+        ]
+        target_trackers = (
+            retry_trackers if len(retry_trackers) > 0 else target_trackers
+        )
     logging.info(
         f"[Main] Trackers this torrent needs to be uploaded to are {target_trackers}"
     )
@@ -1385,7 +1449,9 @@ def _process_torrent(torrent: Dict):
         torrent["content_path"]
     )
 
-    torrent_info.clear()
+    # This is an important dict that we use to store info about the media file as we discover it.
+    # Every torrent gets its own dict, so that multiple torrents can be processed in parallel by the workers.
+    torrent_info: Dict = {}
 
     # This list will contain tags that are applicable to the torrent being uploaded.
     # The tags that are generated will be based on the media properties and tag groupings from `tag_grouping.json`
@@ -1397,8 +1463,13 @@ def _process_torrent(torrent: Dict):
     torrent_info["tags"] = []
 
     # Remove all old temp_files & data from the previous upload
+    # when torrents are processed in parallel, only the data of this torrent can be removed
+    # when retrying a failed attempt, the data is preserved so that the screenshots and .torrent are not generated again
     torrent_info["working_folder"] = utils.delete_leftover_files(
-        working_folder, file=torrent_path, resume=False
+        working_folder,
+        file=torrent_path,
+        resume=retry_context is not None,
+        isolated=reuploader_config.REUPLOAD_WORKERS > 1,
     )
     torrent_info["cookies_dump"] = cookies_dump
     torrent_info[
@@ -1439,7 +1510,7 @@ def _process_torrent(torrent: Dict):
     # this guy will also try to set tmdb and imdb from media info summary
     if (
         identify_type_and_basic_info(
-            torrent_info["upload_media"], guess_it_result
+            torrent_info["upload_media"], guess_it_result, torrent_info
         )
         == "skip_to_next_file"
     ):
@@ -1455,6 +1526,140 @@ def _process_torrent(torrent: Dict):
         )
         return
 
+    # Rest of the processing is done as a graph of stages. The metadata identification (network bound) does not
+    # depend on the screenshots and the .torrent hashing (cpu / disk bound), hence these can run concurrently.
+    # Results of all the stages are joined before the tracker specific tasks.
+    # since the stages run concurrently, the screenshots and hashing stages works on a snapshot of `torrent_info`.
+    # when the stages are run one after another, screenshots are taken from `torrent_info` updated by the metadata
+    parallel_stages = reuploader_config.PARALLEL_PROCESSING_STAGES
+    prepared_torrent_info = (
+        dict(torrent_info) if parallel_stages else torrent_info
+    )
+    stage_graph = GGBotStageGraph(
+        name=f"ReUpload-{torrent['hash'][:8]}",
+        max_workers=None if parallel_stages else 1,
+    )
+    stage_graph.add_stage(
+        "metadata",
+        lambda _: _identify_metadata(
+            torrent=torrent,
+            torrent_info=torrent_info,
+            cached_data=cached_data,
+            guess_it_result=guess_it_result,
+            target_trackers=target_trackers,
+            stage_graph=stage_graph,
+        ),
+    )
+    stage_graph.add_stage(
+        "screenshots",
+        lambda _: _generate_screenshots(prepared_torrent_info),
+        # when the stages are not running in parallel, we take screenshots only after metadata has been identified.
+        depends_on=[] if parallel_stages else ["metadata"],
+    )
+    if parallel_stages:
+        # a base .torrent file is generated here.
+        # for all trackers, the torrent will then be edited from this one in the tracker specific tasks
+        stage_graph.add_stage(
+            "torrent",
+            lambda _: _generate_base_torrent(
+                torrent=torrent,
+                torrent_info=prepared_torrent_info,
+                target_trackers=target_trackers,
+                is_cancelled=lambda: stage_graph.is_cancelled,
+            ),
+        )
+    stage_results = stage_graph.run()
+    if not stage_results.get("metadata", False):
+        # metadata identification failed and the failure has been updated in cache.
+        return
+    torrent_info.update(stage_results["screenshots"])
+
+    if reupload_manager.is_lease_lost(torrent["hash"]):
+        # another instance has taken over the torrent. uploading now could result in duplicate uploads
+        logging.error(
+            f"[Main] Lease of torrent {torrent['name']} was lost during processing. Skipping the tracker uploads"
+        )
+        return
+
+    # At this point the only stuff that remains to be done is site specific so we can start a loop here for each
+    # site we are uploading to
+    logging.info("[Main] Now starting tracker specific tasks")
+    # each tracker works on its own copy of `torrent_info`, so that the tracker specific data (torrent title,
+    # description, tags etc.) doesn't leak into other trackers, even when the trackers are processed concurrently
+    tracker_status_map: Dict[
+        str, Tuple[TrackerUploadStatus, Union[Dict, Any]]
+    ] = run_for_trackers(
+        target_trackers,
+        lambda current_tracker: _upload_to_tracker(
+            tracker=current_tracker,
+            target_trackers=target_trackers,
+            torrent=torrent,
+            torrent_info=copy.deepcopy(torrent_info),
+        ),
+        max_workers=reuploader_config.TRACKER_UPLOAD_WORKERS,
+    )
+
+    previous_tracker_statuses = (
+        retry_context["tracker_status"] if retry_context is not None else {}
+    )
+    # uploads that failed (tracker / network errors) are retried later only for the failed trackers.
+    # the torrent label is not updated until the retries are complete, so that the torrent will be picked up again
+    failed_trackers = [
+        tracker
+        for tracker, status in tracker_status_map.items()
+        if status[0] == TrackerUploadStatus.FAILED
+    ]
+    if len(failed_trackers) > 0 and reupload_manager.schedule_retry(
+        torrent["hash"],
+        TorrentFailureStatus.TRACKER_UPLOAD_FAILED,
+        cached_data["upload_attempt"],
+        retry_stage=RetryStage.TRACKER_UPLOAD,
+        retry_trackers=failed_trackers,
+        tracker_statuses={
+            **previous_tracker_statuses,
+            **{
+                tracker: status[0]
+                for tracker, status in tracker_status_map.items()
+            },
+        },
+    ):
+        return
+
+    # saving tracker status to job repo and updating torrent status
+    reupload_manager.update_jobs_and_torrent_status(
+        torrent["hash"], tracker_status_map, previous_tracker_statuses
+    )
+    # updating torrent label in torrent client
+    torrent_client.update_torrent_category(
+        info_hash=torrent["hash"],
+        category_name=reupload_manager.get_client_label_for_torrent(
+            reupload_manager.merge_tracker_statuses(
+                previous_tracker_statuses, tracker_status_map
+            )
+        ),
+    )
+
+
+# -------------- END of _process_torrent --------------
+
+
+# ---------------------------------------------------------------------- #
+#                           Processing Stages!                           #
+# ---------------------------------------------------------------------- #
+def _identify_metadata(
+    *,
+    torrent: Dict,
+    torrent_info: Dict,
+    cached_data: Union[Dict, None],
+    guess_it_result,
+    target_trackers,
+    stage_graph: GGBotStageGraph,
+) -> bool:
+    """
+    Identifies the metadata database ids of the torrent, fixes the media properties in `torrent_info` and performs
+    the dupe check for single tracker uploads.
+    Returns False if the torrent cannot be uploaded. The failure would have been updated in cache by then.
+    """
     # the metadata items will be first obtained from cached_data. if it's not available then we'll go ahead with
     # mediainfo_summary data and tmdb search
     movie_db = reupload_manager.cached_moviedb_details(
@@ -1498,7 +1703,8 @@ def _process_torrent(torrent: Dict):
             torrent["hash"],
             status=TorrentFailureStatus.TMDB_IDENTIFICATION_FAILED,
         )
-        return
+        stage_graph.cancel()
+        return False
     else:
         logging.info(
             "[Main] Obtained metadata database ids. Proceeding with upload process"
@@ -1537,6 +1743,7 @@ def _process_torrent(torrent: Dict):
         torrent_info["raw_video_file"]
         if "raw_video_file" in torrent_info
         else torrent_info["upload_media"],
+        torrent_info,
     )
 
     # Fix some default naming styles
@@ -1556,9 +1763,10 @@ def _process_torrent(torrent: Dict):
             align="center",
         )
 
-        dupe_check_response = check_for_dupes_in_tracker(
-            tracker, temp_tracker_api_key
-        )
+        with tracker_limiter.request(tracker):
+            dupe_check_response = check_for_dupes_in_tracker(
+                tracker, temp_tracker_api_key, torrent_info
+            )
         # If dupes are present and user decided to stop upload, for single tracker uploads we stop operation
         # immediately True == dupe_found False == no_dupes/continue upload
         if dupe_check_response:
@@ -1576,17 +1784,27 @@ def _process_torrent(torrent: Dict):
                 style="bold red",
                 highlight=False,
             )
-            return
+            stage_graph.cancel()
+            return False
+
+    return True
 
+
+def _generate_screenshots(torrent_info: Dict) -> Dict:
+    """
+    Takes and uploads the screenshots for the torrent.
+    Returns the data that needs to be added to `torrent_info` for the upload.
+    """
+    screenshot_info = {}
     # -------- Take / Upload Screenshots --------
     media_info_duration = MediaInfo.parse(
         torrent_info["raw_video_file"]
         if "raw_video_file" in torrent_info
         else torrent_info["upload_media"]
     ).tracks[1]
-    torrent_info["duration"] = str(media_info_duration.duration).split(".", 1)[
-        0
-    ]
+    screenshot_info["duration"] = str(media_info_duration.duration).split(
+        ".", 1
+    )[0]
 
     # This is used to evenly space out timestamps for screenshots
     # Call function to actually take screenshots & upload them (different file)
@@ -1596,7 +1814,7 @@ def _process_torrent(torrent: Dict):
         else torrent_info["upload_media"]
     )
     is_screenshots_available = GGBotScreenshotManager(
-        duration=torrent_info["duration"],
+        duration=screenshot_info["duration"],
         torrent_title=torrent_info["title"],
         upload_media=upload_media_for_screenshot,
         base_path=working_folder,
@@ -1613,54 +1831,83 @@ def _process_torrent(torrent: Dict):
                 )
             )
         )
-        torrent_info["bbcode_images"] = screenshots_data["bbcode_images"]
-        torrent_info["bbcode_images_nothumb"] = screenshots_data[
+        screenshot_info["bbcode_images"] = screenshots_data["bbcode_images"]
+        screenshot_info["bbcode_images_nothumb"] = screenshots_data[
             "bbcode_images_nothumb"
         ]
-        torrent_info["bbcode_thumb_nothumb"] = screenshots_data[
+        screenshot_info["bbcode_thumb_nothumb"] = screenshots_data[
             "bbcode_thumb_nothumb"
         ]
-        torrent_info["url_images"] = screenshots_data["url_images"]
-        torrent_info["data_images"] = screenshots_data["data_images"]
-        torrent_info["screenshots_data"] = SCREENSHOTS_RESULT_FILE_PATH.format(
+        screenshot_info["url_images"] = screenshots_data["url_images"]
+        screenshot_info["data_images"] = screenshots_data["data_images"]
+        screenshot_info[
+            "screenshots_data"
+        ] = SCREENSHOTS_RESULT_FILE_PATH.format(
             base_path=working_folder,
             sub_folder=torrent_info["working_folder"],
         )
+    return screenshot_info
 
-    # At this point the only stuff that remains to be done is site specific so we can start a loop here for each
-    # site we are uploading to
-    logging.info("[Main] Now starting tracker specific tasks")
-    tracker_status_map: Dict[
-        str, Tuple[TrackerUploadStatus, Union[Dict, Any]]
-    ] = {trkr: (TrackerUploadStatus.PENDING, None) for trkr in target_trackers}
-    for current_tracker in target_trackers:
-        tracker_status_map[current_tracker] = _upload_to_tracker(
-            tracker=current_tracker,
-            target_trackers=target_trackers,
-            torrent=torrent,
-        )
 
-    # saving tracker status to job repo and updating torrent status
-    reupload_manager.update_jobs_and_torrent_status(
-        torrent["hash"], tracker_status_map
+def _generate_base_torrent(
+    *, torrent: Dict, torrent_info: Dict, target_trackers, is_cancelled
+) -> None:
+    """
+    Generates a base .torrent file of the media with the announce urls and source of the first target tracker.
+    The .torrent files for the trackers are then created by editing this one, hence the media needs to be hashed
+    only once.
+    """
+    tracker = target_trackers[0]
+    config = json.load(
+        open(
+            site_templates_path
+            + str(acronym_to_tracker.get(str(tracker).lower()))
+            + ".json",
+            encoding="utf-8",
+        )
     )
-    # updating torrent label in torrent client
-    torrent_client.update_torrent_category(
-        info_hash=torrent["hash"],
-        category_name=reupload_manager.get_client_label_for_torrent(
-            tracker_status_map
+    GGBotTorrentCreator(
+        media=_get_torrent_media(torrent_info),
+        announce_urls=TrackerConfig(tracker).ANNOUNCE_URL.split(" "),
+        source=config["source"],
+        working_folder=working_folder,
+        hash_prefix=torrent_info["working_folder"],
+        use_mktorrent=args.use_mktorrent,
+        # base torrent is not named after the tracker so that it is never mistaken for a tracker specific torrent
+        tracker="GGBOT_BASE",
+        torrent_title=utils.normalize_for_system_path(torrent_info["title"]),
+        is_cancelled=is_cancelled,
+        export_client_torrent=_get_client_torrent_exporter(torrent),
+        piece_size_policies=get_piece_size_policies(
+            target_trackers, site_templates_path, acronym_to_tracker
         ),
-    )
+    ).generate_dot_torrent()
 
 
-# -------------- END of _process_torrent --------------
+def _get_client_torrent_exporter(torrent: Dict):
+    # the torrent is complete in the client, hence its pieces can be reused instead of hashing the media again
+    if (
+        not reuploader_config.REUSE_CLIENT_TORRENT
+        or not torrent_client.supports_torrent_export
+    ):
+        return None
+    return lambda: torrent_client.export_torrent(torrent["hash"])
+
+
+def _get_torrent_media(torrent_info: Dict) -> str:
+    # If the type is a movie, then we only include the `raw_video_file` for torrent file creation. If type is
+    # an episode, then we'll create torrent file for the `upload_media` which could be an single episode
+    # or a season folder
+    if torrent_info["type"] == "movie" and "raw_video_file" in torrent_info:
+        return torrent_info["raw_video_file"]
+    return torrent_info["upload_media"]
 
 
 # ---------------------------------------------------------------------- #
 #                            Upload To Tracker!                          #
 # ---------------------------------------------------------------------- #
 def _upload_to_tracker(
-    tracker: str, target_trackers, torrent: Dict
+    tracker: str, target_trackers, torrent: Dict, torrent_info: Dict
 ) -> Tuple[TrackerUploadStatus, Union[Dict, Any]]:
     tracker_env_config = TrackerConfig(tracker)
     torrent_info[
@@ -1708,33 +1955,30 @@ def _upload_to_tracker(
     # different for each site
     bbcode_line_break = config["bbcode_line_break"]
 
+    # every tracker gets its own description file
+    description_file_path = TRACKER_DESCRIPTION_FILE_PATH.format(
+        base_path=working_folder,
+        sub_folder=torrent_info["working_folder"],
+        tracker=tracker,
+    )
     # -------- Add bbcode images to description.txt --------
     utils.add_bbcode_images_to_description(
         torrent_info=torrent_info,
         config=config,
-        description_file_path=DESCRIPTION_FILE_PATH.format(
-            base_path=working_folder,
-            sub_folder=torrent_info["working_folder"],
-        ),
+        description_file_path=description_file_path,
         bbcode_line_break=bbcode_line_break,
     )
 
     # -------- Add custom uploader signature to description.txt --------
     utils.write_uploader_signature_to_description(
-        description_file_path=DESCRIPTION_FILE_PATH.format(
-            base_path=working_folder,
-            sub_folder=torrent_info["working_folder"],
-        ),
+        description_file_path=description_file_path,
         tracker=tracker,
         bbcode_line_break=bbcode_line_break,
         release_group=torrent_info["release_group"],
     )
 
     # Add the finished file to the 'torrent_info' dict
-    torrent_info["description"] = DESCRIPTION_FILE_PATH.format(
-        base_path=working_folder,
-        sub_folder=torrent_info["working_folder"],
-    )
+    torrent_info["description"] = description_file_path
 
     # -------- Check for Dupes Multiple Trackers --------
     # when the user has configured multiple trackers to upload to
@@ -1750,9 +1994,10 @@ def _upload_to_tracker(
         )
         # Call the function that will search each site for dupes and return a similarity percentage,
         # if it exceeds what the user sets in config.env we skip the upload
-        dupe_check_response = check_for_dupes_in_tracker(
-            tracker, temp_tracker_api_key
-        )
+        with tracker_limiter.request(tracker):
+            dupe_check_response = check_for_dupes_in_tracker(
+                tracker, temp_tracker_api_key, torrent_info
+            )
         # True == dupe_found
         # False == no_dupes/continue upload
         if dupe_check_response:
@@ -1771,16 +2016,8 @@ def _upload_to_tracker(
     logging.debug(
         f"[Main] Torrent info just before dot torrent creation. \n {pformat(torrent_info)}"
     )
-    # If the type is a movie, then we only include the `raw_video_file` for torrent file creation. If type is
-    # an episode, then we'll create torrent file for the `upload_media` which could be an single episode
-    # or a season folder
-    if torrent_info["type"] == "movie" and "raw_video_file" in torrent_info:
-        torrent_media = torrent_info["raw_video_file"]
-    else:
-        torrent_media = torrent_info["upload_media"]
-
     GGBotTorrentCreator(
-        media=torrent_media,
+        media=_get_torrent_media(torrent_info),
         announce_urls=tracker_env_config.ANNOUNCE_URL.split(" "),
         source=config["source"],
         working_folder=working_folder,
@@ -1788,6 +2025,10 @@ def _upload_to_tracker(
         use_mktorrent=args.use_mktorrent,
         tracker=tracker,
         torrent_title=torrent_info["torrent_title"],
+        export_client_torrent=_get_client_torrent_exporter(torrent),
+        piece_size_policies=get_piece_size_policies(
+            target_trackers, site_templates_path, acronym_to_tracker
+        ),
     ).generate_dot_torrent()
 
     # TAGS GENERATION. Generations all the tags that are applicable to this upload
@@ -1818,12 +2059,13 @@ def _upload_to_tracker(
     # 1.1 things like screenshots, TMDB/IMDB ID's can & are reused for each site you upload to
     # 2.0 we take all the info we generated outside of this loop (mediainfo, description, etc.)
     # and combine it with tracker specific info and upload it all now
-    upload_status, upload_response = upload_to_site(
-        upload_to=tracker,
-        tracker_api_key=temp_tracker_api_key,
-        config=config,
-        tracker_settings=tracker_settings,
-    )
+    with tracker_limiter.request(tracker):
+        upload_status, upload_response = upload_to_site(
+            upload_to=tracker,
+            tracker_api_key=temp_tracker_api_key,
+            config=config,
+            tracker_settings=tracker_settings,
+        )
 
     # Tracker Settings
     if not upload_status:
@@ -1895,8 +2137,29 @@ def reupload_job():
     logging.info(
         f"[Main] There are a total of {len(torrents)} completed torrents that needs to be re-uploaded"
     )
-    for torrent in torrents:
-        _process_torrent(torrent)
+    workers = min(reuploader_config.REUPLOAD_WORKERS, len(torrents))
+    if workers <= 1:
+        for torrent, cached_data in torrents:
+            _process_torrent(torrent, cached_data)
+        return
+
+    logging.info(f"[Main] Processing torrents with {workers} workers")
+    # the job waits for all the workers to complete, so that the next scheduled run doesn't pick the same torrents
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="ReUploadWorker"
+    ) as executor:
+        futures = {
+            executor.submit(_process_torrent, torrent, cached_data): torrent
+            for torrent, cached_data in torrents
+        }
+        for future in as_completed(futures):
+            torrent = futures[future]
+            try:
+                future.result()
+            except Exception:
+                logging.exception(
+                    f"[Main] Unexpected error while processing torrent {torrent['name']} ({torrent['hash']})"
+                )
 
 
 # -------------- END of reupload_job --------------
@@ -18,6 +18,7 @@
 
 import argparse
 import base64
+import copy
 import glob
 import json
 import logging
@@ -53,7 +54,11 @@ from modules.constants import *
 # Method that will search for dupes in trackers.
 from modules.template_schema_validator import TemplateSchemaValidator
 from utilities.utils_screenshots import GGBotScreenshotManager
-from utilities.utils_torrent import GGBotTorrentCreator
+from utilities.utils_torrent import (
+    GGBotTorrentCreator,
+    get_piece_size_policies,
+)
+from utilities.utils_tracker_fanout import GGBotTrackerLimiter, run_for_trackers
 
 # utility methods
 # Method that will read and accept text components for torrent description
@@ -124,6 +129,14 @@ api_keys_dict = utils.prepare_and_validate_tracker_api_keys_dict(
 # Import 'auto_mode' status
 upload_assistant_config = UploadAssistantConfig()
 auto_mode = upload_assistant_config.AUTO_MODE
+# limits the requests made to the trackers
+tracker_limiter = GGBotTrackerLimiter(
+    requests_per_minute=upload_assistant_config.TRACKER_REQUESTS_PER_MINUTE
+)
+# trackers are processed concurrently only in auto mode, since the user cannot be prompted by multiple trackers at once
+tracker_upload_workers = (
+    upload_assistant_config.TRACKER_UPLOAD_WORKERS if auto_mode else 1
+)
 
 # Setup args
 parser = argparse.ArgumentParser()
@@ -313,7 +326,7 @@ args = parser.parse_args()
 # ---------------------------------------------------------------------- #
 #                          Dupe Check in Tracker                         #
 # ---------------------------------------------------------------------- #
-def check_for_dupes_in_tracker(tracker, temp_tracker_api_key):
+def check_for_dupes_in_tracker(tracker, temp_tracker_api_key, torrent_info):
     """
     Method to check for any duplicate torrents in the tracker.
     First we read the configuration for the tracker and format the title according to the tracker configuration
@@ -1016,7 +1029,9 @@ def identify_miscellaneous_details(guess_it_result, file_to_parse):
 # ---------------------------------------------------------------------- #
 #                             Upload that shit!                          #
 # ---------------------------------------------------------------------- #
-def upload_to_site(upload_to, tracker_api_key):
+def upload_to_site(
+    upload_to, tracker_api_key, config, tracker_settings, torrent_info
+):
     logging.info(f"[TrackerUpload] Attempting to upload to: {upload_to}")
     url = str(config["upload_form"]).format(api_key=tracker_api_key)
     url_masked = str(config["upload_form"]).format(api_key="REDACTED")
@@ -1269,7 +1284,7 @@ def upload_to_site(upload_to, tracker_api_key):
                 f"\nCanceling upload to [bright_red]{upload_to}[/bright_red]"
             )
             logging.error(
-                f"[TrackerUpload] User chose to cancel the upload to {tracker}"
+                f"[TrackerUpload] User chose to cancel the upload to {upload_to}"
             )
             return False
 
@@ -1417,7 +1432,7 @@ def upload_to_site(upload_to, tracker_api_key):
             )
             console.print("Upload failed", style="bold red")
             logging.critical(
-                f"[TrackerUpload] 404 was returned on that upload, this is a problem with the site ({tracker})"
+                f"[TrackerUpload] 404 was returned on that upload, this is a problem with the site ({upload_to})"
             )
             logging.error("[TrackerUpload] Upload failed")
 
@@ -1443,11 +1458,11 @@ def upload_to_site(upload_to, tracker_api_key):
             console.print("Upload failed.", style="bold red")
             try:
                 logging.critical(
-                    f'[TrackerUpload] 400 was returned on that upload, this is a problem with the site ({tracker}). Error: Error {response.json()["error"] if "error" in response.json() else response.json()}'
+                    f'[TrackerUpload] 400 was returned on that upload, this is a problem with the site ({upload_to}). Error: Error {response.json()["error"] if "error" in response.json() else response.json()}'
                 )
             except Exception:
                 logging.critical(
-                    f"[TrackerUpload] 400 was returned on that upload, this is a problem with the site ({tracker})."
+                    f"[TrackerUpload] 400 was returned on that upload, this is a problem with the site ({upload_to})."
                 )
             logging.error("[TrackerUpload] Upload failed")
 
@@ -1471,6 +1486,267 @@ def upload_to_site(upload_to, tracker_api_key):
     return False
 
 
+def _upload_to_tracker(tracker, torrent_info):
+    """
+    Performs all the tracker specific tasks (dupe check, .torrent file, payload and upload) for a tracker.
+    `torrent_info` is expected to be a copy that belongs only to this tracker.
+
+    Returns the upload status for the tracker. None is returned when the upload was skipped (dupes / payload errors)
+    """
+    tracker_env_config = TrackerConfig(tracker)
+
+    torrent_info[
+        "shameless_self_promotion"
+    ] = f'Uploaded with {"<3" if str(tracker).upper() in ("BHD", "BHDTV") or os.name == "nt" else "❤"} using GG-BOT Upload Assistant'
+
+    temp_tracker_api_key = api_keys_dict[f"{str(tracker).lower()}_api_key"]
+    logging.info(f"[Main] Trying to upload to: {tracker}")
+
+    # Create a new dictionary that we store the exact keys/vals that the site is expecting
+    tracker_settings = {}
+
+    # Open the correct .json file since we now need things like announce URL, API Keys, and API info
+    config = json.load(
+        open(
+            site_templates_path
+            + str(acronym_to_tracker.get(str(tracker).lower()))
+            + ".json",
+            encoding="utf-8",
+        )
+    )
+
+    # checking for banned groups. If this group is banned in this tracker, then we stop
+    if (
+        "banned_groups" in config
+        and torrent_info["release_group"] in config["banned_groups"]
+    ):
+        torrent_info[f"{tracker}_upload_status"] = False
+        logging.fatal(
+            f"[Main] Release group {torrent_info['release_group']} is banned in this at {tracker}. Skipping upload..."
+        )
+        console.rule(
+            f"[bold red] :warning: Group {torrent_info['release_group']} is banned on {tracker} :warning: [/bold red]",
+            style="red",
+        )
+        return False
+
+    # If the user provides this arg with the title right after in double quotes then we automatically use that
+    # If the user does not manually provide the title (Most common) then we pull the renaming template from *.json & use all the info we gathered earlier to generate a title
+    # -------- format the torrent title --------
+    torrent_info["torrent_title"] = (
+        str(args.title[0])
+        if args.title
+        else translation_utilities.format_title(config, torrent_info)
+    )
+
+    # (Theory) BHD has a different bbcode parser then BLU/ACM so the line break is different for each site
+    # this is why we set it in each sites *.json file then retrieve it here in this 'for loop' since its different for each site
+    bbcode_line_break = config["bbcode_line_break"]
+
+    # every tracker gets its own description file
+    description_file_path = TRACKER_DESCRIPTION_FILE_PATH.format(
+        base_path=working_folder,
+        sub_folder=torrent_info["working_folder"],
+        tracker=tracker,
+    )
+    # -------- Add custom descriptions to description.txt --------
+    utils.write_cutsom_user_inputs_to_description(
+        torrent_info=torrent_info,
+        description_file_path=description_file_path,
+        config=config,
+        tracker=tracker,
+        bbcode_line_break=bbcode_line_break,
+        debug=args.debug,
+    )
+
+    # -------- Add bbcode images to description.txt --------
+    utils.add_bbcode_images_to_description(
+        torrent_info=torrent_info,
+        config=config,
+        description_file_path=description_file_path,
+        bbcode_line_break=bbcode_line_break,
+    )
+
+    # -------- Add custom uploader signature to description.txt --------
+    utils.write_uploader_signature_to_description(
+        description_file_path=description_file_path,
+        tracker=tracker,
+        bbcode_line_break=bbcode_line_break,
+        release_group=torrent_info["release_group"],
+    )
+
+    # Add the finished file to the 'torrent_info' dict
+    torrent_info["description"] = description_file_path
+
+    # -------- Check for Dupes Multiple Trackers --------
+    # when the user has configured multiple trackers to upload to
+    # we take the screenshots and uploads them, then do dupe check for the trackers.
+    # dupe check need not be performed if user provided only one tracker.
+    # in cases where only one tracker is provided, dupe check will be performed prior to taking screenshots.
+    if upload_assistant_config.CHECK_FOR_DUPES and len(upload_to_trackers) > 1:
+        console.line(count=2)
+        console.rule(
+            f"Dupe Check [bold]({tracker})[/bold]",
+            style="red",
+            align="center",
+        )
+        logging.debug(
+            f"[Main] Dumping torrent_info contents to log before dupe check: \n{pformat(torrent_info)}"
+        )
+        # Call the function that will search each site for dupes and return a similarity percentage, if it exceeds what the user sets in config.env we skip the upload
+        with tracker_limiter.request(tracker):
+            dupe_check_response = check_for_dupes_in_tracker(
+                tracker, temp_tracker_api_key, torrent_info
+            )
+        # True == dupe_found
+        # False == no_dupes/continue upload
+        if dupe_check_response:
+            logging.error(
+                f"[Main] Could not upload to: {tracker} because we found a dupe on site"
+            )
+            # If dupe was found & the script is auto_mode OR if the user responds with 'n' for the 'dupe found, continue?' prompt
+            #  we will essentially stop the upload to this tracker and move on to the next one (if exists else quits)
+            return None
+
+    # -------- Generate .torrent file --------
+    console.print(
+        f"\n[bold]Generating .torrent file for [chartreuse1]{tracker}[/chartreuse1][/bold]"
+    )
+    logging.debug(
+        f"[Main] Torrent info just before dot torrent creation. \n {pformat(torrent_info)}"
+    )
+    # If the type is a movie, then we only include the `raw_video_file` for torrent file creation.
+    # If type is an episode, then we'll create torrent file for the the `upload_media` which could be an single episode or a season folder
+    if (
+        args.allow_multiple_files == False
+        and torrent_info["type"] == "movie"
+        and "raw_video_file" in torrent_info
+    ):
+        torrent_media = torrent_info["raw_video_file"]
+    else:
+        torrent_media = torrent_info["upload_media"]
+
+    GGBotTorrentCreator(
+        media=torrent_media,
+        announce_urls=tracker_env_config.ANNOUNCE_URL.split(" "),
+        source=config["source"],
+        working_folder=working_folder,
+        hash_prefix=torrent_info["working_folder"],
+        use_mktorrent=args.use_mktorrent,
+        tracker=tracker,
+        torrent_title=torrent_info["torrent_title"],
+        piece_size_policies=get_piece_size_policies(
+            upload_to_trackers, site_templates_path, acronym_to_tracker
+        ),
+    ).generate_dot_torrent()
+
+    # TAGS GENERATION. Generations all the tags that are applicable to this upload
+    translation_utilities.generate_all_applicable_tags(torrent_info)
+
+    # -------- Assign specific tracker keys --------
+    # This function takes the info we have the dict torrent_info and associates with the right key/values needed for us to use X trackers API
+    # if for some reason the upload cannot be performed to the specific tracker, the method returns "STOP"
+    if (
+        translation_utilities.choose_right_tracker_keys(
+            config,
+            tracker_settings,
+            tracker,
+            torrent_info,
+            args,
+            working_folder,
+        )
+        == "STOP"
+    ):
+        return None
+
+    logging.debug(
+        "::::::::::::::::::::::::::::: Final 'torrent_info' with all data filled :::::::::::::::::::::::::::::"
+    )
+    logging.debug(f"\n{pformat(torrent_info)}")
+
+    # once the uploader finishes filling all the details as per the template, users can override values with custom actions.
+    if (
+        "custom_actions" in config["technical_jargons"]
+        and len(config["technical_jargons"]["custom_actions"]) > 0
+    ):
+        try:
+            for action in config["technical_jargons"]["custom_actions"]:
+                logging.info(f"[Main] Loading custom action :: {action}")
+                custom_action = utils.load_custom_actions(action)
+                logging.info(
+                    f"[Main] Loaded custom action :: {action} :: Executing..."
+                )
+                # any additional values added to tracker_settings will be treated as optional values by `upload_to_site`
+                # and all such keys will be sent to tracker.
+                custom_action(torrent_info, tracker_settings, config)
+        except Exception as e:
+            # if any sorts of exception occurs from custom actions, we stop the upload to the tracker here
+            logging.exception(
+                f"[Main] Exception thrown from custom action :: {action}. Skipping upload to tracker {tracker}",
+                exc_info=e,
+            )
+            console.print(
+                f"[bold red]A custom action [yellow]({action})[/yellow] has failed for this tracker. Skipping upload to {tracker}[/bold red]"
+            )
+            torrent_info[
+                f"{tracker}_upload_status"
+            ] = False  # to skip Post-Processing steps for this tracker
+            return False
+
+        # TODO save torrent_info before custom actions and restore the original torrent_info.
+        # custom actions cannot modify torrent info, only tracker settings and tracker config can be modified
+        # logging.debug("::::::::::::::::::::::::::::: Final 'torrent_info' after 'custom_actions' :::::::::::::::::::::::::::::")
+        # logging.debug(f'\n{pformat(torrent_info)}')
+
+    # -------- Upload everything! --------
+    # 1.0 everything we do in this for loop isn't persistent, its specific to each site that you upload to
+    # 1.1 things like screenshots, TMDB/IMDB ID's can & are reused for each site you upload to
+    # 2.0 we take all the info we generated outside of this loop (mediainfo, description, etc) and combine it with tracker specific info and upload it all now
+    with tracker_limiter.request(tracker):
+        torrent_info[f"{tracker}_upload_status"] = upload_to_site(
+            upload_to=tracker,
+            tracker_api_key=temp_tracker_api_key,
+            config=config,
+            tracker_settings=tracker_settings,
+            torrent_info=torrent_info,
+        )
+    if (
+        torrent_info[f"{tracker}_upload_status"] is True
+        and "success_processor" in config["technical_jargons"]
+    ):
+        logging.info(
+            f"[Main] Upload to tracker {tracker} is successful and success processor is configured"
+        )
+        action = config["technical_jargons"]["success_processor"]
+        logging.info(
+            f"[Main] Performing success processor action '{action}' for tracker {tracker}"
+        )
+        custom_action = utils.load_custom_actions(action)
+        logging.info(f"[Main] Loaded custom action :: {action} :: Executing...")
+        custom_action(torrent_info, tracker_settings, config, working_folder)
+
+    # Tracker Settings
+    console.print("\n\n")
+    tracker_settings_table = Table(
+        show_header=True,
+        title="[bold][deep_pink1]Tracker Settings[/bold][/deep_pink1]",
+        header_style="bold cyan",
+    )
+    tracker_settings_table.add_column("Key", justify="left")
+    tracker_settings_table.add_column("Value", justify="left")
+
+    for tracker_settings_key, tracker_settings_value in sorted(
+        tracker_settings.items()
+    ):
+        # Add torrent_info data to each row
+        tracker_settings_table.add_row(
+            f"[purple][bold]{tracker_settings_key}[/bold][/purple]",
+            str(tracker_settings_value),
+        )
+    console.print(tracker_settings_table, justify="center")
+    return torrent_info[f"{tracker}_upload_status"]
+
+
 # ---------------------------------------------------------------------------------------------------------------------------------------------------------------------#
 #  **START** This is the first code that executes when we run the script, we log that info and we start a timer so we can keep track of total script runtime **START** #
 # ---------------------------------------------------------------------------------------------------------------------------------------------------------------------#
@@ -1864,9 +2140,10 @@ for file in upload_queue:
         logging.debug(
             f"[Main] Dumping torrent_info contents to log before dupe check: \n{pformat(torrent_info)}"
         )
-        dupe_check_response = check_for_dupes_in_tracker(
-            tracker, temp_tracker_api_key
-        )
+        with tracker_limiter.request(tracker):
+            dupe_check_response = check_for_dupes_in_tracker(
+                tracker, temp_tracker_api_key, torrent_info
+            )
         # If dupes are present and user decided to stop upload, for single tracker uploads we stop operation immediately
         # True == dupe_found
         # False == no_dupes/continue upload
@@ -1934,262 +2211,18 @@ for file in upload_queue:
 
     # At this point the only stuff that remains to be done is site specific so we can start a loop here for each site we are uploading to
     logging.info("[Main] Now starting tracker specific tasks")
-    for tracker in upload_to_trackers:
-        tracker_env_config = TrackerConfig(tracker)
-
-        torrent_info[
-            "shameless_self_promotion"
-        ] = f'Uploaded with {"<3" if str(tracker).upper() in ("BHD", "BHDTV") or os.name == "nt" else "❤"} using GG-BOT Upload Assistant'
-
-        temp_tracker_api_key = api_keys_dict[f"{str(tracker).lower()}_api_key"]
-        logging.info(f"[Main] Trying to upload to: {tracker}")
-
-        # Create a new dictionary that we store the exact keys/vals that the site is expecting
-        tracker_settings = {}
-        tracker_settings.clear()
-
-        # Open the correct .json file since we now need things like announce URL, API Keys, and API info
-        config = json.load(
-            open(
-                site_templates_path
-                + str(acronym_to_tracker.get(str(tracker).lower()))
-                + ".json",
-                encoding="utf-8",
-            )
-        )
-
-        # checking for banned groups. If this group is banned in this tracker, then we stop
-        if (
-            "banned_groups" in config
-            and torrent_info["release_group"] in config["banned_groups"]
-        ):
-            torrent_info[f"{tracker}_upload_status"] = False
-            logging.fatal(
-                f"[Main] Release group {torrent_info['release_group']} is banned in this at {tracker}. Skipping upload..."
-            )
-            console.rule(
-                f"[bold red] :warning: Group {torrent_info['release_group']} is banned on {tracker} :warning: [/bold red]",
-                style="red",
-            )
-            continue
-
-        # If the user provides this arg with the title right after in double quotes then we automatically use that
-        # If the user does not manually provide the title (Most common) then we pull the renaming template from *.json & use all the info we gathered earlier to generate a title
-        # -------- format the torrent title --------
-        torrent_info["torrent_title"] = (
-            str(args.title[0])
-            if args.title
-            else translation_utilities.format_title(config, torrent_info)
-        )
-
-        # (Theory) BHD has a different bbcode parser then BLU/ACM so the line break is different for each site
-        # this is why we set it in each sites *.json file then retrieve it here in this 'for loop' since its different for each site
-        bbcode_line_break = config["bbcode_line_break"]
-
-        # -------- Add custom descriptions to description.txt --------
-        utils.write_cutsom_user_inputs_to_description(
-            torrent_info=torrent_info,
-            description_file_path=DESCRIPTION_FILE_PATH.format(
-                base_path=working_folder,
-                sub_folder=torrent_info["working_folder"],
-            ),
-            config=config,
-            tracker=tracker,
-            bbcode_line_break=bbcode_line_break,
-            debug=args.debug,
-        )
-
-        # -------- Add bbcode images to description.txt --------
-        utils.add_bbcode_images_to_description(
-            torrent_info=torrent_info,
-            config=config,
-            description_file_path=DESCRIPTION_FILE_PATH.format(
-                base_path=working_folder,
-                sub_folder=torrent_info["working_folder"],
-            ),
-            bbcode_line_break=bbcode_line_break,
-        )
-
-        # -------- Add custom uploader signature to description.txt --------
-        utils.write_uploader_signature_to_description(
-            description_file_path=DESCRIPTION_FILE_PATH.format(
-                base_path=working_folder,
-                sub_folder=torrent_info["working_folder"],
-            ),
-            tracker=tracker,
-            bbcode_line_break=bbcode_line_break,
-            release_group=torrent_info["release_group"],
-        )
-
-        # Add the finished file to the 'torrent_info' dict
-        torrent_info["description"] = DESCRIPTION_FILE_PATH.format(
-            base_path=working_folder, sub_folder=torrent_info["working_folder"]
-        )
-
-        # -------- Check for Dupes Multiple Trackers --------
-        # when the user has configured multiple trackers to upload to
-        # we take the screenshots and uploads them, then do dupe check for the trackers.
-        # dupe check need not be performed if user provided only one tracker.
-        # in cases where only one tracker is provided, dupe check will be performed prior to taking screenshots.
-        if (
-            upload_assistant_config.CHECK_FOR_DUPES
-            and len(upload_to_trackers) > 1
-        ):
-            console.line(count=2)
-            console.rule(
-                f"Dupe Check [bold]({tracker})[/bold]",
-                style="red",
-                align="center",
-            )
-            logging.debug(
-                f"[Main] Dumping torrent_info contents to log before dupe check: \n{pformat(torrent_info)}"
-            )
-            # Call the function that will search each site for dupes and return a similarity percentage, if it exceeds what the user sets in config.env we skip the upload
-            dupe_check_response = check_for_dupes_in_tracker(
-                tracker, temp_tracker_api_key
-            )
-            # True == dupe_found
-            # False == no_dupes/continue upload
-            if dupe_check_response:
-                logging.error(
-                    f"[Main] Could not upload to: {tracker} because we found a dupe on site"
-                )
-                # If dupe was found & the script is auto_mode OR if the user responds with 'n' for the 'dupe found, continue?' prompt
-                #  we will essentially stop the current 'for loops' iteration & jump back to the beginning to start next cycle (if exists else quits)
-                continue
-
-        # -------- Generate .torrent file --------
-        console.print(
-            f"\n[bold]Generating .torrent file for [chartreuse1]{tracker}[/chartreuse1][/bold]"
-        )
-        logging.debug(
-            f"[Main] Torrent info just before dot torrent creation. \n {pformat(torrent_info)}"
-        )
-        # If the type is a movie, then we only include the `raw_video_file` for torrent file creation.
-        # If type is an episode, then we'll create torrent file for the the `upload_media` which could be an single episode or a season folder
-        if (
-            args.allow_multiple_files == False
-            and torrent_info["type"] == "movie"
-            and "raw_video_file" in torrent_info
-        ):
-            torrent_media = torrent_info["raw_video_file"]
-        else:
-            torrent_media = torrent_info["upload_media"]
-
-        GGBotTorrentCreator(
-            media=torrent_media,
-            announce_urls=tracker_env_config.ANNOUNCE_URL.split(" "),
-            source=config["source"],
-            working_folder=working_folder,
-            hash_prefix=torrent_info["working_folder"],
-            use_mktorrent=args.use_mktorrent,
-            tracker=tracker,
-            torrent_title=torrent_info["torrent_title"],
-        ).generate_dot_torrent()
-
-        # TAGS GENERATION. Generations all the tags that are applicable to this upload
-        translation_utilities.generate_all_applicable_tags(torrent_info)
-
-        # -------- Assign specific tracker keys --------
-        # This function takes the info we have the dict torrent_info and associates with the right key/values needed for us to use X trackers API
-        # if for some reason the upload cannot be performed to the specific tracker, the method returns "STOP"
-        if (
-            translation_utilities.choose_right_tracker_keys(
-                config,
-                tracker_settings,
-                tracker,
-                torrent_info,
-                args,
-                working_folder,
-            )
-            == "STOP"
-        ):
-            continue
-
-        logging.debug(
-            "::::::::::::::::::::::::::::: Final 'torrent_info' with all data filled :::::::::::::::::::::::::::::"
-        )
-        logging.debug(f"\n{pformat(torrent_info)}")
-
-        # once the uploader finishes filling all the details as per the template, users can override values with custom actions.
-        if (
-            "custom_actions" in config["technical_jargons"]
-            and len(config["technical_jargons"]["custom_actions"]) > 0
-        ):
-            try:
-                for action in config["technical_jargons"]["custom_actions"]:
-                    logging.info(f"[Main] Loading custom action :: {action}")
-                    custom_action = utils.load_custom_actions(action)
-                    logging.info(
-                        f"[Main] Loaded custom action :: {action} :: Executing..."
-                    )
-                    # any additional values added to tracker_settings will be treated as optional values by `upload_to_site`
-                    # and all such keys will be sent to tracker.
-                    custom_action(torrent_info, tracker_settings, config)
-            except Exception as e:
-                # if any sorts of exception occurs from custom actions, we stop the upload to the tracker here
-                logging.exception(
-                    f"[Main] Exception thrown from custom action :: {action}. Skipping upload to tracker {tracker}",
-                    exc_info=e,
-                )
-                console.print(
-                    f"[bold red]A custom action [yellow]({action})[/yellow] has failed for this tracker. Skipping upload to {tracker}[/bold red]"
-                )
-                torrent_info[
-                    f"{tracker}_upload_status"
-                ] = False  # to skip Post-Processing steps for this tracker
-                continue
-
-            # TODO save torrent_info before custom actions and restore the original torrent_info.
-            # custom actions cannot modify torrent info, only tracker settings and tracker config can be modified
-            # logging.debug("::::::::::::::::::::::::::::: Final 'torrent_info' after 'custom_actions' :::::::::::::::::::::::::::::")
-            # logging.debug(f'\n{pformat(torrent_info)}')
-
-        # -------- Upload everything! --------
-        # 1.0 everything we do in this for loop isn't persistent, its specific to each site that you upload to
-        # 1.1 things like screenshots, TMDB/IMDB ID's can & are reused for each site you upload to
-        # 2.0 we take all the info we generated outside of this loop (mediainfo, description, etc) and combine it with tracker specific info and upload it all now
-        torrent_info[f"{tracker}_upload_status"] = upload_to_site(
-            upload_to=tracker, tracker_api_key=temp_tracker_api_key
-        )
-        if (
-            torrent_info[f"{tracker}_upload_status"] is True
-            and "success_processor" in config["technical_jargons"]
-        ):
-            logging.info(
-                f"[Main] Upload to tracker {tracker} is successful and success processor is configured"
-            )
-            action = config["technical_jargons"]["success_processor"]
-            logging.info(
-                f"[Main] Performing success processor action '{action}' for tracker {tracker}"
-            )
-            custom_action = utils.load_custom_actions(action)
-            logging.info(
-                f"[Main] Loaded custom action :: {action} :: Executing..."
-            )
-            custom_action(
-                torrent_info, tracker_settings, config, working_folder
-            )
-
-        # Tracker Settings
-        console.print("\n\n")
-        tracker_settings_table = Table(
-            show_header=True,
-            title="[bold][deep_pink1]Tracker Settings[/bold][/deep_pink1]",
-            header_style="bold cyan",
-        )
-        tracker_settings_table.add_column("Key", justify="left")
-        tracker_settings_table.add_column("Value", justify="left")
-
-        for tracker_settings_key, tracker_settings_value in sorted(
-            tracker_settings.items()
-        ):
-            # Add torrent_info data to each row
-            tracker_settings_table.add_row(
-                f"[purple][bold]{tracker_settings_key}[/bold][/purple]",
-                str(tracker_settings_value),
-            )
-        console.print(tracker_settings_table, justify="center")
+    # each tracker works on its own copy of `torrent_info`, so that the tracker specific data (torrent title,
+    # description, tags etc.) doesn't leak into other trackers, even when the trackers are processed concurrently
+    tracker_upload_statuses = run_for_trackers(
+        upload_to_trackers,
+        lambda tracker: _upload_to_tracker(
+            tracker, copy.deepcopy(torrent_info)
+        ),
+        max_workers=tracker_upload_workers,
+    )
+    for tracker, upload_status in tracker_upload_statuses.items():
+        if upload_status is not None:
+            torrent_info[f"{tracker}_upload_status"] = upload_status
 
     # Torrent Info
     console.print("\n\n")
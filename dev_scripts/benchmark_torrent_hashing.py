@@ -0,0 +1,119 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Compares the time taken to hash the pieces of a media with GGBotPieceHasher, torf and mktorrent (when installed).
+# The page cache makes repeated runs faster, hence drop the caches between the runs for cold reads
+#   sync && echo 3 | sudo tee /proc/sys/vm/drop_caches
+#
+# usage: python3 dev_scripts/benchmark_torrent_hashing.py <media> [--piece-size 16777216] [--workers 8] [--runs 1]
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+working_folder = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(working_folder))
+
+from modules.torrent_generator.piece_hasher import (  # noqa: E402
+    GGBotPieceHasher,
+)
+from modules.torrent_generator.torf_generator import GGBOTTorrent  # noqa: E402
+
+
+def _benchmark_ggbot(torrent, workers):
+    return GGBotPieceHasher(
+        filepaths=list(torrent.filepaths),
+        piece_size=torrent.piece_size,
+        workers=workers,
+    ).hash_pieces()
+
+
+def _benchmark_torf(torrent, workers):
+    torrent.generate(threads=workers)
+    return torrent.metainfo["info"]["pieces"]
+
+
+def _benchmark_mktorrent(torrent, workers):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        torrent_path = f"{temp_dir}/benchmark.torrent"
+        subprocess.run(
+            [
+                "mktorrent",
+                "-p",
+                "-l",
+                str(torrent.piece_size.bit_length() - 1),
+                "-t",
+                str(workers),
+                "-a",
+                "https://localhost/announce",
+                "-o",
+                torrent_path,
+                torrent.path,
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        return GGBOTTorrent.read(torrent_path).metainfo["info"]["pieces"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark piece hashing")
+    parser.add_argument("media", help="file or folder to hash")
+    parser.add_argument("--piece-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--runs", type=int, default=1)
+    args = parser.parse_args()
+
+    engines = {"ggbot": _benchmark_ggbot, "torf": _benchmark_torf}
+    if shutil.which("mktorrent") is not None:
+        engines["mktorrent"] = _benchmark_mktorrent
+    else:
+        print("mktorrent is not installed. Skipping mktorrent")
+
+    results = {}
+    for engine, benchmark in engines.items():
+        for run in range(args.runs):
+            torrent = GGBOTTorrent(path=args.media, private=True)
+            if args.piece_size is not None:
+                torrent.piece_size = args.piece_size
+            start_time = time.perf_counter()
+            pieces = benchmark(torrent, args.workers)
+            duration = time.perf_counter() - start_time
+            results.setdefault(engine, []).append((duration, pieces))
+            print(
+                f" * {engine:<10} run {run + 1}: {duration:8.2f} seconds "
+                f"({torrent.size / duration / 2**20:8.1f} MiB/s)"
+            )
+
+    reference_pieces = results["torf"][0][1]
+    print(
+        f"\nSize: {torrent.size} bytes, Piece size: {torrent.piece_size} bytes, Workers: {args.workers}"
+    )
+    for engine, runs in results.items():
+        best = min(duration for duration, _ in runs)
+        matches = all(pieces == reference_pieces for _, pieces in runs)
+        print(
+            f" * {engine:<10} best: {best:8.2f} seconds, pieces match torf: {matches}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -17,10 +17,12 @@
 import enum
 
 from modules.cache_vendors.cache_mongo import Mongo
+from modules.cache_vendors.cache_sqlite import Sqlite
 
 
 class CacheVendor(enum.Enum):
     Mongo = 1
+    Sqlite = 2
 
 
 class CacheFactory:
@@ -36,7 +38,7 @@ class Cache:
         """Cache is wrapper ever the different cache_clients that can be created.
 
         Caches are created by the CacheFactory based on the user's configuration.
-        Currently only Mongo Cache is available
+        Currently Mongo and Sqlite Caches are available
         """
         self.cache_client = cache_client
 
@@ -55,6 +57,30 @@ class Cache:
     def get(self, key, filter=None):
         return self.cache_client.get(key, filter)
 
+    def get_by_hashes(self, key, hashes, fields=None):
+        return self.cache_client.get_by_hashes(key, hashes, fields)
+
+    def update_fields(self, key, fields):
+        return self.cache_client.update_fields(key, fields)
+
+    def increment(self, key, field, amount=1):
+        return self.cache_client.increment(key, field, amount)
+
+    def set_if_status(self, key, statuses, fields):
+        return self.cache_client.set_if_status(key, statuses, fields)
+
+    def update_fields_if(self, key, condition, fields):
+        return self.cache_client.update_fields_if(key, condition, fields)
+
+    def insert_if_absent(self, key, data):
+        return self.cache_client.insert_if_absent(key, data)
+
+    def ensure_indexes(self):
+        self.cache_client.ensure_indexes()
+
+    def index_usage(self):
+        return self.cache_client.index_usage()
+
     def close(self):
         self.cache_client.close()
 
@@ -17,8 +17,10 @@
 import functools
 import logging
 
-from pymongo import MongoClient
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
 
+from modules.cache_vendors.constants import CACHE_INDEXES
 from modules.config import CacheConfig
 from modules.exceptions.exception import (
     GGBotCacheClientException,
@@ -58,6 +60,7 @@ class Mongo:
                 raise GGBotCacheClientException(
                     f"Failed to connect to Mongo DB. Error: {ex}"
                 )
+            self.ensure_indexes()
 
     def _get_mongo_client(self):
         # Provide the mongodb atlas url to connect python to mongodb using pymongo
@@ -90,6 +93,15 @@ class Mongo:
         key = key.split("::")
         return self.database[key[0] + "_" + key[1]]
 
+    @staticmethod
+    def __get_document_filter(key):
+        key = key.split("::")
+        if len(key) <= 2:
+            raise GGBotCacheClientException(
+                "No hash provided in key. Cannot identify the document to update"
+            )
+        return {"hash": key[2]}
+
     def save(self, key, data):
         collection = self.__get_collection(key)
         if "_id" not in data:
@@ -124,6 +136,18 @@ class Mongo:
         )
         return collection.find(filter)
 
+    @map_cursor_to_list
+    def get_by_hashes(self, key, hashes, fields=None):
+        """
+        Method to fetch the documents of multiple hashes from a collection in a single query.
+        When `fields` are provided, only those fields are returned for the documents.
+        """
+        collection = self.__get_collection(key)
+        projection = (
+            {field: 1 for field in fields} if fields is not None else None
+        )
+        return collection.find({"hash": {"$in": list(hashes)}}, projection)
+
     @map_cursor_to_list
     def advanced_get(self, key, limit, page_number, sort_field, filter=None):
         collection = self.__get_collection(key)
@@ -134,10 +158,138 @@ class Mongo:
             .sort(sort_field, -1)
         )
 
+    def update_fields(self, key, fields):
+        """
+        Method to update only the provided fields of the document identified by the key.
+        Returns True if a document was found for the key.
+        """
+        collection = self.__get_collection(key)
+        result = collection.update_one(
+            self.__get_document_filter(key), {"$set": fields}
+        )
+        return result.matched_count > 0
+
+    def increment(self, key, field, amount=1):
+        """
+        Method to atomically increment a numeric field of the document identified by the key.
+        Returns the value of the field after the increment or None if there are no documents for the key.
+        """
+        collection = self.__get_collection(key)
+        document = collection.find_one_and_update(
+            self.__get_document_filter(key),
+            {"$inc": {field: amount}},
+            projection={field: 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        return document[field] if document is not None else None
+
+    def set_if_status(self, key, statuses, fields):
+        """
+        Method to update the fields of the document identified by the key, only if the current `status` of the
+        document is one among `statuses`. The check and the update are performed atomically.
+        Returns True if the document was updated.
+        """
+        collection = self.__get_collection(key)
+        document = collection.find_one_and_update(
+            {**self.__get_document_filter(key), "status": {"$in": statuses}},
+            {"$set": fields},
+            projection={"status": 1},
+        )
+        return document is not None
+
+    def update_fields_if(self, key, condition, fields):
+        """
+        Method to update the fields of the document identified by the key, only if the document also matches the
+        `condition` filter. The check and the update are performed atomically.
+        Returns the updated document or None if the document didn't match the condition.
+        """
+        collection = self.__get_collection(key)
+        return collection.find_one_and_update(
+            {"$and": [self.__get_document_filter(key), condition]},
+            {"$set": fields},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    def insert_if_absent(self, key, data):
+        """
+        Method to insert the document identified by the key, only if there is no document for the key yet.
+        Returns True if the document was inserted.
+        """
+        collection = self.__get_collection(key)
+        document = {
+            field: value for field, value in data.items() if field != "_id"
+        }
+        try:
+            result = collection.update_one(
+                self.__get_document_filter(key),
+                {"$setOnInsert": document},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # another client inserted the document between the lookup and the insert
+            return False
+        if result.upserted_id is None:
+            return False
+        data["_id"] = result.upserted_id
+        return True
+
     def count(self, key, filter=None):
         collection = self.__get_collection(key)
         return collection.count_documents(filter if filter is not None else {})
 
+    def ensure_indexes(self):
+        """
+        Method to create the indexes declared in `CACHE_INDEXES`, if they are not already present.
+        Failure to create an index is not fatal, the queries will continue to work without it.
+        """
+        for key, indexes in CACHE_INDEXES.items():
+            collection = self.__get_collection(key)
+            for index in indexes:
+                try:
+                    collection.create_index(
+                        index["fields"],
+                        name=index["name"],
+                        unique=index["unique"],
+                        background=True,
+                    )
+                except OperationFailure as ex:
+                    # unique indexes cannot be created when the collection already has duplicate documents
+                    logging.error(
+                        f"[Cache] Failed to create index `{index['name']}` on `{collection.name}`. Error: {ex}"
+                    )
+        logging.info("[Cache] Ensured indexes for mongo collections")
+
+    def index_usage(self):
+        """
+        Method to report the usage of the indexes present in the collections used by the uploader.
+        Returns a dict with the collection name as the key and the list of indexes with the number of times each
+        index was used to serve a query, since the `since` timestamp.
+        """
+        usage = {}
+        for key in CACHE_INDEXES.keys():
+            collection = self.__get_collection(key)
+            try:
+                usage[collection.name] = [
+                    {
+                        "name": index_stats["name"],
+                        "key": dict(index_stats["key"]),
+                        "ops": index_stats["accesses"]["ops"],
+                        "since": index_stats["accesses"]["since"].isoformat(),
+                    }
+                    for index_stats in collection.aggregate(
+                        [{"$indexStats": {}}]
+                    )
+                ]
+            except OperationFailure as ex:
+                logging.error(
+                    f"[Cache] Failed to get index usage of `{collection.name}`. Error: {ex}"
+                )
+                usage[collection.name] = [
+                    {"name": name, "key": dict(info["key"])}
+                    for name, info in collection.index_information().items()
+                ]
+        return usage
+
     def close(self):
         """
         Method to close the connection to the redis server
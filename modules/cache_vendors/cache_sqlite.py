@@ -0,0 +1,539 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+from pathlib import Path
+
+from modules.cache_vendors.constants import CACHE_INDEXES
+from modules.config import CacheConfig
+from modules.constants import REUPLOADER_SQLITE_CACHE
+from modules.exceptions.exception import (
+    GGBotCacheClientException,
+    GGBotCacheNotInitializedException,
+)
+
+# fields that are stored in their own columns, so that they can be indexed and queried without parsing the documents
+# rest of the fields are queried from the json document using `json_extract`
+INDEXED_COLUMNS = ["hash", "status", "id", "date_created"]
+
+_FIELD_PATTERN = re.compile(r"^[A-Za-z0-9_][A-Za-z0-9_.]*$")
+
+_COMPARISON_OPERATORS = {
+    "$eq": "=",
+    "$gt": ">",
+    "$gte": ">=",
+    "$lt": "<",
+    "$lte": "<=",
+}
+
+
+def _regexp(pattern, value):
+    return value is not None and re.search(pattern, str(value)) is not None
+
+
+class Sqlite:
+    """
+    Embedded cache backed by a sqlite database. Can be used instead of `Mongo` when the uploader is running in a
+    single machine, so that no external services are needed.
+
+    Each collection (GROUP::COLLECTION) is stored in its own table, with the document as json and the frequently
+    queried fields (`INDEXED_COLUMNS`) in indexed columns. Mongo style filters used by the uploader
+    (equality, $in, $nin, $ne, $regex, $exists, comparisons, $and, $or) are translated to sql.
+    """
+
+    connection = None
+    is_sqlite_initialized = False
+
+    def __init__(self):
+        self.config: CacheConfig = CacheConfig()
+        self.lock = threading.RLock()
+        self.tables = set()
+        try:
+            self.database_path = self._get_database_path()
+            logging.info(
+                f"[Cache] Using sqlite database at {self.database_path}"
+            )
+            # sqlite caches the compiled statements (prepared statements) for the parameterized queries
+            self.connection = sqlite3.connect(
+                self.database_path,
+                check_same_thread=False,
+                isolation_level=None,
+                cached_statements=256,
+            )
+            self.connection.row_factory = sqlite3.Row
+            self.connection.create_function(
+                "REGEXP", 2, _regexp, deterministic=True
+            )
+            # WAL mode allows visor to read while the reuploader is writing
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("PRAGMA busy_timeout=5000")
+            self.is_sqlite_initialized = True
+        except Exception as ex:
+            logging.fatal(
+                f"[Cache] Failed to open sqlite database. Error: {ex}"
+            )
+            raise GGBotCacheClientException(
+                f"Failed to open sqlite database. Error: {ex}"
+            )
+        self.ensure_indexes()
+
+    def _get_database_path(self):
+        if (
+            self.config.CACHE_PATH is not None
+            and len(self.config.CACHE_PATH) > 0
+        ):
+            database_path = self.config.CACHE_PATH
+        else:
+            database_path = REUPLOADER_SQLITE_CACHE.format(
+                base_path=Path(__file__).resolve().parent.parent.parent
+            )
+        if database_path != ":memory:":
+            os.makedirs(
+                os.path.dirname(os.path.abspath(database_path)), exist_ok=True
+            )
+        return database_path
+
+    def hello(self):
+        if self.is_sqlite_initialized:
+            self.connection.execute("SELECT 1")
+            print("Sqlite Cache Initialized Successfully")
+            return True
+        else:
+            print("Failed to initialize sqlite cache")
+            return False
+
+    @staticmethod
+    def _table_name(key):
+        key = key.split("::")
+        return f"{key[0]}_{key[1]}"
+
+    def __get_table(self, key):
+        if not self.is_sqlite_initialized:
+            raise GGBotCacheNotInitializedException()
+        table = self._table_name(key)
+        if table not in self.tables:
+            with self.lock:
+                self.connection.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{table}" ('
+                    "_id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                    f'{", ".join(f"{column} TEXT" for column in INDEXED_COLUMNS)}, '
+                    "document TEXT NOT NULL)"
+                )
+                self.tables.add(table)
+        return table
+
+    @staticmethod
+    def __get_document_filter(key):
+        key = key.split("::")
+        if len(key) <= 2:
+            raise GGBotCacheClientException(
+                "No hash provided in key. Cannot identify the document to update"
+            )
+        return {"hash": key[2]}
+
+    @staticmethod
+    def _column(field):
+        if field in INDEXED_COLUMNS or field == "_id":
+            return field
+        if not _FIELD_PATTERN.match(field):
+            raise GGBotCacheClientException(
+                f"Invalid field `{field}` provided in query"
+            )
+        return f"json_extract(document, '$.{field}')"
+
+    @staticmethod
+    def _to_sql_value(value):
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        return json.dumps(value, default=str)
+
+    def _translate_filter(self, filter):
+        """
+        Translates the mongo style `filter` to a sql where clause and its parameters
+        """
+        if filter is None or len(filter) == 0:
+            return "1", []
+        clauses, params = [], []
+        for field, condition in filter.items():
+            if field in ["$and", "$or"]:
+                sub_clauses = []
+                for sub_filter in condition:
+                    sub_clause, sub_params = self._translate_filter(sub_filter)
+                    sub_clauses.append(f"({sub_clause})")
+                    params.extend(sub_params)
+                joiner = " AND " if field == "$and" else " OR "
+                clauses.append(
+                    f"({joiner.join(sub_clauses)})"
+                    if len(sub_clauses) > 0
+                    else "1"
+                )
+            elif isinstance(condition, dict):
+                column = self._column(field)
+                for operator, value in condition.items():
+                    if operator in ["$in", "$nin"]:
+                        if len(value) == 0:
+                            clauses.append("0" if operator == "$in" else "1")
+                            continue
+                        placeholders = ", ".join("?" * len(value))
+                        negation = "NOT " if operator == "$nin" else ""
+                        clauses.append(
+                            f"{column} {negation}IN ({placeholders})"
+                        )
+                        params.extend(self._to_sql_value(v) for v in value)
+                    elif operator == "$ne":
+                        if value is None:
+                            clauses.append(f"{column} IS NOT NULL")
+                        else:
+                            # documents without the field also matches $ne
+                            clauses.append(
+                                f"({column} IS NULL OR {column} != ?)"
+                            )
+                            params.append(self._to_sql_value(value))
+                    elif operator in _COMPARISON_OPERATORS:
+                        clauses.append(
+                            f"{column} {_COMPARISON_OPERATORS[operator]} ?"
+                        )
+                        params.append(self._to_sql_value(value))
+                    elif operator == "$regex":
+                        clauses.append(f"{column} REGEXP ?")
+                        params.append(value)
+                    elif operator == "$exists":
+                        clauses.append(
+                            f"{column} IS {'NOT ' if value else ''}NULL"
+                        )
+                    else:
+                        raise GGBotCacheClientException(
+                            f"Unsupported operator `{operator}` provided in query"
+                        )
+            elif condition is None:
+                clauses.append(f"{self._column(field)} IS NULL")
+            else:
+                clauses.append(f"{self._column(field)} = ?")
+                params.append(self._to_sql_value(condition))
+        return " AND ".join(clauses), params
+
+    @staticmethod
+    def _to_document(row, fields=None):
+        document = json.loads(row["document"])
+        if fields is not None:
+            document = {
+                field: document[field] for field in fields if field in document
+            }
+        return {"_id": row["_id"], **document}
+
+    def _indexed_values(self, document):
+        return [
+            self._to_sql_value(document.get(column))
+            for column in INDEXED_COLUMNS
+        ]
+
+    def _write_document(self, table, _id, document):
+        document = {
+            key: value for key, value in document.items() if key != "_id"
+        }
+        self.connection.execute(
+            f'UPDATE "{table}" SET '
+            f'{", ".join(f"{column} = ?" for column in INDEXED_COLUMNS)}, '
+            "document = ? WHERE _id = ?",
+            [
+                *self._indexed_values(document),
+                json.dumps(document, default=str),
+                _id,
+            ],
+        )
+
+    def _find(self, table, filter, fields=None, suffix="", suffix_params=None):
+        where, params = self._translate_filter(filter)
+        # similar to mongo, documents are returned in the order of insertion unless sorted
+        suffix = suffix if len(suffix) > 0 else " ORDER BY _id"
+        with self.lock:
+            rows = self.connection.execute(
+                f'SELECT _id, document FROM "{table}" WHERE {where}{suffix}',
+                [*params, *(suffix_params or [])],
+            ).fetchall()
+        return [self._to_document(row, fields) for row in rows]
+
+    def save(self, key, data):
+        table = self.__get_table(key)
+        document = {key: value for key, value in data.items() if key != "_id"}
+        with self.lock:
+            if "_id" not in data:
+                cursor = self.connection.execute(
+                    f'INSERT INTO "{table}" ({", ".join(INDEXED_COLUMNS)}, document) '
+                    f'VALUES ({", ".join("?" * (len(INDEXED_COLUMNS) + 1))})',
+                    [
+                        *self._indexed_values(document),
+                        json.dumps(document, default=str),
+                    ],
+                )
+                # similar to mongo, the generated id is added to the saved data
+                data["_id"] = cursor.lastrowid
+            else:
+                self.connection.execute(
+                    f'INSERT OR REPLACE INTO "{table}" (_id, {", ".join(INDEXED_COLUMNS)}, document) '
+                    f'VALUES ({", ".join("?" * (len(INDEXED_COLUMNS) + 2))})',
+                    [
+                        data["_id"],
+                        *self._indexed_values(document),
+                        json.dumps(document, default=str),
+                    ],
+                )
+
+    def delete(self, key, query=None):
+        """Method to delete data from the cache stored against a key."""
+        table = self.__get_table(key)
+        if len(key.split("::")) <= 2:
+            # no hash provided in key. hence we need to use the user provided query
+            # if user has not provided any query then we'll raise an exception
+            if query is None:
+                raise Exception(
+                    "No hash or query provided. Cannot delete document"
+                )
+            where, params = self._translate_filter(query)
+            with self.lock:
+                # returns the number of documents deleted
+                return self.connection.execute(
+                    f'DELETE FROM "{table}" WHERE {where}', params
+                ).rowcount
+        else:
+            with self.lock:
+                self.connection.execute(
+                    f'DELETE FROM "{table}" WHERE _id = '
+                    f'(SELECT _id FROM "{table}" WHERE hash = ? LIMIT 1)',
+                    [key.split("::")[2]],
+                )
+            return 1
+
+    def get(self, key, filter=None):
+        table = self.__get_table(key)
+        # <=2 because keys are in the form of GROUP::COLLECTION::KEY
+        filter = (
+            ({} if filter is None else filter)
+            if len(key.split("::")) <= 2
+            else {"hash": key.split("::")[2]}
+        )
+        return self._find(table, filter)
+
+    def get_by_hashes(self, key, hashes, fields=None):
+        """
+        Method to fetch the documents of multiple hashes from a collection in a single query.
+        When `fields` are provided, only those fields are returned for the documents.
+        """
+        table = self.__get_table(key)
+        return self._find(table, {"hash": {"$in": list(hashes)}}, fields)
+
+    def advanced_get(self, key, limit, page_number, sort_field, filter=None):
+        table = self.__get_table(key)
+        order_by = (
+            f" ORDER BY {self._column(sort_field)} DESC"
+            if sort_field is not None
+            else ""
+        )
+        return self._find(
+            table,
+            filter,
+            suffix=f"{order_by} LIMIT ? OFFSET ?",
+            suffix_params=[limit, (page_number - 1) * limit],
+        )
+
+    def count(self, key, filter=None):
+        table = self.__get_table(key)
+        where, params = self._translate_filter(filter)
+        with self.lock:
+            return self.connection.execute(
+                f'SELECT COUNT(*) FROM "{table}" WHERE {where}', params
+            ).fetchone()[0]
+
+    def _find_one_and_modify(self, key, filter, modify):
+        """
+        Finds the first document matching the filter and updates it with the `modify` callback.
+        The read and the write are done in a single write transaction, making the update atomic across processes.
+        Returns the updated document or None if no document matched the filter.
+        """
+        table = self.__get_table(key)
+        where, params = self._translate_filter(filter)
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.connection.execute(
+                    f'SELECT _id, document FROM "{table}" WHERE {where} LIMIT 1',
+                    params,
+                ).fetchone()
+                if row is None:
+                    self.connection.execute("COMMIT")
+                    return None
+                document = self._to_document(row)
+                modify(document)
+                self._write_document(table, row["_id"], document)
+                self.connection.execute("COMMIT")
+                return document
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+
+    def update_fields(self, key, fields):
+        """
+        Method to update only the provided fields of the document identified by the key.
+        Returns True if a document was found for the key.
+        """
+        return (
+            self._find_one_and_modify(
+                key,
+                self.__get_document_filter(key),
+                lambda document: document.update(fields),
+            )
+            is not None
+        )
+
+    def increment(self, key, field, amount=1):
+        """
+        Method to atomically increment a numeric field of the document identified by the key.
+        Returns the value of the field after the increment or None if there are no documents for the key.
+        """
+
+        def _increment(document):
+            document[field] = document.get(field, 0) + amount
+
+        document = self._find_one_and_modify(
+            key, self.__get_document_filter(key), _increment
+        )
+        return document[field] if document is not None else None
+
+    def set_if_status(self, key, statuses, fields):
+        """
+        Method to update the fields of the document identified by the key, only if the current `status` of the
+        document is one among `statuses`. The check and the update are performed atomically.
+        Returns True if the document was updated.
+        """
+        return (
+            self._find_one_and_modify(
+                key,
+                {
+                    **self.__get_document_filter(key),
+                    "status": {"$in": statuses},
+                },
+                lambda document: document.update(fields),
+            )
+            is not None
+        )
+
+    def update_fields_if(self, key, condition, fields):
+        """
+        Method to update the fields of the document identified by the key, only if the document also matches the
+        `condition` filter. The check and the update are performed atomically.
+        Returns the updated document or None if the document didn't match the condition.
+        """
+        return self._find_one_and_modify(
+            key,
+            {"$and": [self.__get_document_filter(key), condition]},
+            lambda document: document.update(fields),
+        )
+
+    def insert_if_absent(self, key, data):
+        """
+        Method to insert the document identified by the key, only if there is no document for the key yet.
+        Returns True if the document was inserted.
+        """
+        table = self.__get_table(key)
+        where, params = self._translate_filter(self.__get_document_filter(key))
+        document = {
+            field: value for field, value in data.items() if field != "_id"
+        }
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                if (
+                    self.connection.execute(
+                        f'SELECT 1 FROM "{table}" WHERE {where} LIMIT 1', params
+                    ).fetchone()
+                    is not None
+                ):
+                    self.connection.execute("COMMIT")
+                    return False
+                cursor = self.connection.execute(
+                    f'INSERT INTO "{table}" ({", ".join(INDEXED_COLUMNS)}, document) '
+                    f'VALUES ({", ".join("?" * (len(INDEXED_COLUMNS) + 1))})',
+                    [
+                        *self._indexed_values(document),
+                        json.dumps(document, default=str),
+                    ],
+                )
+                self.connection.execute("COMMIT")
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+        data["_id"] = cursor.lastrowid
+        return True
+
+    def ensure_indexes(self):
+        """
+        Method to create the indexes declared in `CACHE_INDEXES`, if they are not already present.
+        Failure to create an index is not fatal, the queries will continue to work without it.
+        """
+        for key, indexes in CACHE_INDEXES.items():
+            table = self.__get_table(key)
+            for index in indexes:
+                columns = ", ".join(
+                    f"{self._column(field)} {'DESC' if direction < 0 else 'ASC'}"
+                    for field, direction in index["fields"]
+                )
+                try:
+                    with self.lock:
+                        self.connection.execute(
+                            f"CREATE {'UNIQUE ' if index['unique'] else ''}INDEX IF NOT EXISTS "
+                            f'"{table}_{index["name"]}" ON "{table}" ({columns})'
+                        )
+                except sqlite3.DatabaseError as ex:
+                    # unique indexes cannot be created when the table already has duplicate documents
+                    logging.error(
+                        f"[Cache] Failed to create index `{index['name']}` on `{table}`. Error: {ex}"
+                    )
+        logging.info("[Cache] Ensured indexes for sqlite tables")
+
+    def index_usage(self):
+        """
+        Method to report the indexes present in the tables used by the uploader.
+        Sqlite doesn't track the usage of indexes, hence only the index definitions are reported.
+        """
+        usage = {}
+        for key in CACHE_INDEXES.keys():
+            table = self.__get_table(key)
+            with self.lock:
+                indexes = self.connection.execute(
+                    "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ?",
+                    [table],
+                ).fetchall()
+            usage[table] = [
+                {"name": index["name"], "key": index["sql"]}
+                for index in indexes
+            ]
+        return usage
+
+    def close(self):
+        """
+        Method to close the connection to the sqlite database
+        """
+        if not self.is_sqlite_initialized:
+            raise GGBotCacheNotInitializedException()
+        with self.lock:
+            self.connection.close()
+        self.is_sqlite_initialized = False
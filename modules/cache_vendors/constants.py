@@ -22,3 +22,49 @@ class TorrentActions(Enum):
 
 
 available_actions = [TorrentActions.UPDATE_TMDB.value]
+
+
+# Indexes that are needed by the cache keys for which the queries are performed.
+# The indexes are declared against the cache key (GROUP::COLLECTION) and each index contains
+#   name: name of the index
+#   fields: list of tuples of (field, direction). direction is 1 for ascending and -1 for descending
+#   unique: whether the values of the fields must be unique across the collection
+CACHE_INDEXES = {
+    "ReUpload::Torrent": [
+        # lookups of torrents by hash. Bulk status lookups of the reuploader
+        {"name": "hash_unique", "fields": [("hash", 1)], "unique": True},
+        # lookups of torrents by id from visor
+        {"name": "id", "fields": [("id", 1)], "unique": False},
+        # visor pages are sorted by id or date_created and filtered by status
+        {
+            "name": "status_id",
+            "fields": [("status", 1), ("id", -1)],
+            "unique": False,
+        },
+        {
+            "name": "status_date_created",
+            "fields": [("status", 1), ("date_created", -1)],
+            "unique": False,
+        },
+        {
+            "name": "date_created",
+            "fields": [("date_created", -1)],
+            "unique": False,
+        },
+    ],
+    "ReUpload::JobRepository": [
+        {
+            "name": "hash_tracker",
+            "fields": [("hash", 1), ("tracker", 1)],
+            "unique": False,
+        },
+    ],
+    "MetaData::TMDB": [
+        # cached tmdb metadata are looked up with type + title and optionally year
+        {
+            "name": "type_title_year",
+            "fields": [("type", 1), ("title", 1), ("year", 1)],
+            "unique": False,
+        },
+    ],
+}
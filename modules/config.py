@@ -18,6 +18,7 @@ import binascii
 import os
 from abc import ABC, abstractmethod, ABCMeta
 from functools import cached_property
+from typing import Optional
 
 from modules.exceptions.exception import GGBotUploaderException
 
@@ -110,10 +111,75 @@ class UploaderConfig(GGBotConfig):
     def NO_OF_SCREENSHOTS(self) -> int:
         return int(self._get_property("num_of_screenshots", 0))
 
+    @property
+    def SCREENSHOT_WORKERS(self) -> int:
+        # 0 => number of cpu cores
+        return max(int(self._get_property("screenshot_workers", 0)), 0)
+
+    @property
+    def NETWORK_STORAGE_SCREENSHOT_WORKERS(self) -> int:
+        return max(
+            int(self._get_property("network_storage_screenshot_workers", 2)), 1
+        )
+
+    @property
+    def SCREENSHOT_SEEK_MODE(self) -> str:
+        # accurate: screenshots are taken at the exact timestamps
+        # fast: screenshots are taken from the keyframes nearest to the timestamps
+        seek_mode = str(self._get_property("screenshot_seek_mode", "accurate"))
+        return "fast" if seek_mode.lower() == "fast" else "accurate"
+
+    @property
+    def SCREENSHOT_FRAME_REJECTION(self) -> bool:
+        return self._get_property_as_boolean("screenshot_frame_rejection", True)
+
+    @property
+    def SCREENSHOT_NUDGE_SECONDS(self) -> int:
+        return max(int(self._get_property("screenshot_nudge_seconds", 10)), 1)
+
+    @property
+    def SCREENSHOT_NUDGE_ATTEMPTS(self) -> int:
+        return max(int(self._get_property("screenshot_nudge_attempts", 3)), 0)
+
+    @property
+    def SCREENSHOT_OPTIMIZATION(self) -> bool:
+        return self._get_property_as_boolean("screenshot_optimization", False)
+
+    @property
+    def SCREENSHOT_LOSSY_FALLBACK(self) -> bool:
+        return self._get_property_as_boolean("screenshot_lossy_fallback", False)
+
+    @property
+    def TORRENT_HASH_WORKERS(self) -> int:
+        # 0 => number of cpu cores
+        return max(int(self._get_property("torrent_hash_workers", 0)), 0)
+
+    @property
+    def TORRENT_HASHING_ENGINE(self) -> str:
+        # ggbot: pieces are hashed by GGBotPieceHasher. torf: pieces are hashed by torf
+        engine = str(self._get_property("torrent_hashing_engine", "ggbot"))
+        return "torf" if engine.lower() == "torf" else "ggbot"
+
+    @property
+    def PIECE_HASH_CACHE(self) -> bool:
+        return self._get_property_as_boolean("piece_hash_cache", True)
+
+    @property
+    def PIECE_HASH_CACHE_MAX_MB(self) -> float:
+        return float(self._get_property("piece_hash_cache_max_mb", 64))
+
     @property
     def BHD_LIVE(self):
         return self._get_property_as_boolean("live")
 
+    @property
+    def TRACKER_UPLOAD_WORKERS(self) -> int:
+        return max(int(self._get_property("tracker_upload_workers", 1)), 1)
+
+    @property
+    def TRACKER_REQUESTS_PER_MINUTE(self) -> float:
+        return float(self._get_property("tracker_requests_per_minute", 0))
+
 
 class UploadAssistantConfig(UploaderConfig):
     @cached_property
@@ -186,6 +252,42 @@ class ReUploaderConfig(UploaderConfig):
     def SOURCE_LABEL(self):
         return self._get_property("source_seed_label", "GGBotCrossSeed_Source")
 
+    @cached_property
+    def CLIENT_CHANGE_FEED(self):
+        return self._get_property_as_boolean("client_change_feed")
+
+    @property
+    def REUPLOAD_WORKERS(self):
+        return max(int(self._get_property("reupload_workers", 1)), 1)
+
+    @property
+    def PARALLEL_PROCESSING_STAGES(self):
+        return self._get_property_as_boolean("parallel_processing_stages")
+
+    @property
+    def REUSE_CLIENT_TORRENT(self) -> bool:
+        return self._get_property_as_boolean("reuse_client_torrent", True)
+
+    @property
+    def UPLOAD_RETRY_LIMIT(self) -> int:
+        return int(self._get_property("upload_retry_limit", 3))
+
+    @property
+    def RETRY_BACKOFF_BASE_SECONDS(self) -> int:
+        return int(self._get_property("retry_backoff_base_seconds", 60))
+
+    @property
+    def RETRY_BACKOFF_MAX_SECONDS(self) -> int:
+        return int(self._get_property("retry_backoff_max_seconds", 3600))
+
+    @property
+    def REUPLOADER_INSTANCE_ID(self):
+        return self._get_property("reuploader_instance_id")
+
+    @property
+    def LEASE_DURATION_SECONDS(self) -> int:
+        return max(int(self._get_property("lease_duration_seconds", 300)), 30)
+
 
 class ClientConfig(GGBotConfig):
     @property
@@ -234,6 +336,10 @@ class CacheConfig(GGBotConfig):
     def CACHE_PASSWORD(self):
         return self._get_property("cache_username")
 
+    @property
+    def CACHE_PATH(self):
+        return self._get_property("cache_path")
+
 
 class APIKeyConfig(GGBotConfig, ABC):
     @property
@@ -259,6 +365,78 @@ class ImageHostConfig(GGBotConfig, metaclass=ABCMeta):
     def IMAGE_HOST_BY_API_KEY(cls, image_host):
         return cls._get_property(f"{image_host}_api_key")
 
+    @property
+    def SCREENSHOT_UPLOAD_CACHE(self) -> bool:
+        return self._get_property_as_boolean("screenshot_upload_cache", True)
+
+    @property
+    def SCREENSHOT_UPLOAD_CACHE_TTL_DAYS(self) -> float:
+        return float(self._get_property("screenshot_upload_cache_ttl_days", 30))
+
+    @property
+    def SCREENSHOT_UPLOAD_CACHE_MAX_ENTRIES(self) -> int:
+        return int(
+            self._get_property("screenshot_upload_cache_max_entries", 10000)
+        )
+
+    def IMAGE_HOST_CACHE_VALIDITY_DAYS(self, image_host) -> float:
+        # images uploaded to some hosts are removed after a while, hence the validity can be limited per host
+        return float(
+            self._get_property(
+                f"{image_host}_cache_validity_days",
+                self.SCREENSHOT_UPLOAD_CACHE_TTL_DAYS,
+            )
+        )
+
+    @property
+    def SCREENSHOT_UPLOAD_WORKERS(self) -> int:
+        return max(int(self._get_property("screenshot_upload_workers", 4)), 1)
+
+    @classmethod
+    def IMAGE_HOST_MAX_CONCURRENT_UPLOADS(cls, image_host) -> int:
+        return max(
+            int(cls._get_property(f"{image_host}_max_concurrent_uploads", 2)),
+            1,
+        )
+
+    @classmethod
+    def IMAGE_HOST_MAX_IMAGE_SIZE_MB(cls, image_host) -> Optional[float]:
+        # size limits of the image hosts that are known to reject larger images
+        default_size_limits = {"imgbox": 10}
+        size_limit = cls._get_property(
+            f"{image_host}_max_image_size_mb",
+            default_size_limits.get(image_host),
+        )
+        return float(size_limit) if size_limit else None
+
+    @property
+    def IMAGE_HOST_CONNECT_TIMEOUT(self) -> float:
+        return float(self._get_property("image_host_connect_timeout", 10))
+
+    @property
+    def IMAGE_HOST_READ_TIMEOUT(self) -> float:
+        return float(self._get_property("image_host_read_timeout", 120))
+
+    @property
+    def IMAGE_HOST_ORDERING(self) -> str:
+        # static: image hosts are used in the configured order
+        # adaptive: image hosts are ordered by their measured latency and failure rate
+        ordering = str(self._get_property("image_host_ordering", "static"))
+        return "adaptive" if ordering.lower() == "adaptive" else "static"
+
+    @property
+    def IMAGE_HOST_CIRCUIT_BREAKER_FAILURES(self) -> int:
+        return max(
+            int(self._get_property("image_host_circuit_breaker_failures", 3)),
+            1,
+        )
+
+    @property
+    def IMAGE_HOST_REPROBE_SECONDS(self) -> int:
+        return max(
+            int(self._get_property("image_host_reprobe_seconds", 900)), 0
+        )
+
 
 class PTPImgConfig(ImageHostApiConfig):
     @property
@@ -288,6 +466,18 @@ class TrackerConfig(APIKeyConfig):
     def ANNOUNCE_URL(self):
         return self._get_property(f"{self.tracker}_ANNOUNCE_URL", None)
 
+    @property
+    def MAX_CONCURRENT_REQUESTS(self) -> int:
+        return int(
+            self._get_property(f"{self.tracker}_MAX_CONCURRENT_REQUESTS", 0)
+        )
+
+    @property
+    def REQUESTS_PER_MINUTE(self) -> float:
+        return float(
+            self._get_property(f"{self.tracker}_REQUESTS_PER_MINUTE", 0)
+        )
+
 
 # caching the generated api key in memory to prevent key generation
 # every time the `get_visor_api_key` method is invoked
@@ -19,6 +19,7 @@ __MEDIAINFO_FILE = "{sub_folder}mediainfo.txt"
 __URL_IMAGES_FILE = "{sub_folder}url_images.txt"
 __SCREENSHOTS_DIR = "{sub_folder}screenshots/"
 __DESCRIPTION_FILE = "{sub_folder}description.txt"
+__TRACKER_DESCRIPTION_FILE = "{sub_folder}{tracker}_description.txt"
 __BBCODE_IMAGES_FILE = "{sub_folder}bbcode_images.txt"
 __SCREENSHOTS_RESULT_FILE = "{sub_folder}screenshots/screenshots_data.json"
 __UPLOADS_COMPLETE_MARKER_FILE = "{sub_folder}screenshots/uploads_complete.mark"
@@ -28,6 +29,7 @@ SCREENSHOTS_PATH = f"{WORKING_DIR}{__SCREENSHOTS_DIR}"
 MEDIAINFO_FILE_PATH = f"{WORKING_DIR}{__MEDIAINFO_FILE}"
 BB_CODE_IMAGES_PATH = f"{WORKING_DIR}{__BBCODE_IMAGES_FILE}"
 DESCRIPTION_FILE_PATH = f"{WORKING_DIR}{__DESCRIPTION_FILE}"
+TRACKER_DESCRIPTION_FILE_PATH = f"{WORKING_DIR}{__TRACKER_DESCRIPTION_FILE}"
 SCREENSHOTS_RESULT_FILE_PATH = f"{WORKING_DIR}{__SCREENSHOTS_RESULT_FILE}"
 UPLOADS_COMPLETE_MARKER_PATH = f"{WORKING_DIR}{__UPLOADS_COMPLETE_MARKER_FILE}"
 
@@ -40,6 +42,13 @@ ASSISTANT_SAMPLE_CONFIG = "{base_path}/samples/assistant/config.env"
 REUPLOADER_LOG = "{base_path}/reuploader.log"
 REUPLOADER_CONFIG = "{base_path}/reupload.config.env"
 REUPLOADER_SAMPLE_CONFIG = "{base_path}/samples/reuploader/reupload.config.env"
+REUPLOADER_SQLITE_CACHE = "{base_path}/reuploader.cache.sqlite"
+
+# Screenshots
+SCREENSHOT_UPLOAD_CACHE = "{base_path}/screenshots.cache.sqlite"
+
+# Torrents
+PIECE_HASH_CACHE = "{base_path}/piece_hashes.cache.sqlite"
 
 # Reference Data
 TAG_GROUPINGS = "{base_path}/parameters/tag_grouping.json"
@@ -14,3 +14,7 @@ class GGBotCacheClientException(GGBotUploaderException):
 class GGBotCacheNotInitializedException(GGBotCacheClientException):
     def __init__(self):
         super().__init__("Connection to cache not established")
+
+
+class GGBotTorrentGenerationException(GGBotUploaderException):
+    pass
@@ -15,18 +15,25 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 from abc import abstractmethod, ABC
+from typing import List, Set
 
 from modules.image_hosts.image_upload_status import GGBotImageUploadStatus
 from modules.config import ImageHostConfig
 
 
 class GGBotImageHostBase(ABC):
+    # image hosts that can upload all the screenshots of a release together (single gallery / session) sets this
+    # to True and overrides `upload_batch`. The image host manager uses the batch upload for such hosts.
+    supports_batch_upload: bool = False
+
     def __init__(self, image_path: str):
         self.thumb_size = ImageHostConfig().THUMB_SIZE
         self.upload_status: GGBotImageUploadStatus = GGBotImageUploadStatus(
             status=False
         )
         self.image_path = image_path
+        # images rejected by the host due to their size. tracked separately since these are not host failures
+        self.size_rejected_images: Set[str] = set()
 
     @property
     def status(self) -> GGBotImageUploadStatus:
@@ -40,3 +47,18 @@ class GGBotImageHostBase(ABC):
     @abstractmethod
     def upload(self):
         raise NotImplementedError
+
+    def upload_batch(
+        self, image_paths: List[str]
+    ) -> List[GGBotImageUploadStatus]:
+        """
+        Uploads all the images and returns the upload status of each image, in the order of `image_paths`.
+        By default, the images are uploaded one after another using `upload`.
+        """
+        upload_statuses = []
+        for image_path in image_paths:
+            self.image_path = image_path
+            self.upload_status = GGBotImageUploadStatus(status=False)
+            self.upload()
+            upload_statuses.append(self.status)
+        return upload_statuses
@@ -15,11 +15,17 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import logging
-from typing import List
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
 
 from rich.console import Console
+from rich.progress import track
 
 from modules.image_hosts.image_host_base import GGBotImageHostBase
+from modules.image_hosts.image_host_stats import GGBotImageHostStats
+from modules.image_hosts.image_upload_cache import GGBotImageUploadCache
 from modules.image_hosts.image_upload_status import GGBotImageUploadStatus
 from modules.image_hosts.vendor.chevereto.freeimage import FreeImageImageHost
 from modules.image_hosts.vendor.chevereto.imgbb import ImgbbImageHost
@@ -38,11 +44,26 @@ console = Console()
 
 
 class GGBotImageHostManager:
-    def __init__(self, torrent_title):
+    def __init__(
+        self,
+        torrent_title,
+        upload_cache: Optional[GGBotImageUploadCache] = None,
+        host_stats: Optional[GGBotImageHostStats] = None,
+    ):
         self.config = ImageHostConfig()
+        self.upload_cache = upload_cache
+        self.host_stats = host_stats
         self.image_hosts: List = self._get_valid_configured_image_hosts()
         self.thumb_size = self.config.THUMB_SIZE
         self.torrent_title = torrent_title
+        self.upload_workers: int = self.config.SCREENSHOT_UPLOAD_WORKERS
+        # limits the number of uploads made to each image host at the same time
+        self.host_semaphores: Dict[str, threading.BoundedSemaphore] = {
+            image_host: threading.BoundedSemaphore(
+                ImageHostConfig.IMAGE_HOST_MAX_CONCURRENT_UPLOADS(image_host)
+            )
+            for image_host in self.image_hosts
+        }
 
     @property
     def no_of_image_hosts(self) -> int:
@@ -92,23 +113,207 @@ class GGBotImageHostManager:
             )
         return valid_image_hosts
 
+    def _get_ordered_image_hosts(self) -> List[str]:
+        if self.host_stats is None:
+            return self.image_hosts
+        return self.host_stats.order(self.image_hosts)
+
+    def _record_upload(
+        self,
+        *,
+        image_host: str,
+        image_host_manager: GGBotImageHostBase,
+        image_paths: List[str],
+        upload_statuses: List[GGBotImageUploadStatus],
+        duration: float,
+    ) -> None:
+        if self.host_stats is None:
+            return
+        # uploads in a batch are measured together, hence each upload is attributed an equal share of the duration
+        latency = duration / max(len(image_paths), 1)
+        for image_path, status in zip(image_paths, upload_statuses):
+            self.host_stats.record_upload(
+                image_host,
+                success=bool(status.status),
+                latency=latency,
+                size_rejected=image_path
+                in image_host_manager.size_rejected_images,
+            )
+
     def upload_screenshots(self, image_path: str) -> GGBotImageUploadStatus:
-        for image_host in self.image_hosts:
-            image_host_manager: GGBotImageHostBase = (
-                self._create_image_host_uploader(
-                    image_path=image_path, image_host=image_host
-                )
+        for image_host in self._get_ordered_image_hosts():
+            status = self._upload_screenshot_to_image_host(
+                image_host=image_host, image_path=image_path
             )
-            assert image_host_manager is not None
-            image_host_manager.upload()
-            status: GGBotImageUploadStatus = image_host_manager.status
             if status.status:
-                logging.debug(
-                    f"[Screenshots] Response from image host: {status}"
-                )
                 return status
         return GGBotImageUploadStatus(status=False)
 
+    def _upload_screenshot_to_image_host(
+        self, *, image_host: str, image_path: str
+    ) -> GGBotImageUploadStatus:
+        image_host_manager: GGBotImageHostBase = (
+            self._create_image_host_uploader(
+                image_path=image_path, image_host=image_host
+            )
+        )
+        assert image_host_manager is not None
+        with self.host_semaphores[image_host]:
+            start_time = time.perf_counter()
+            image_host_manager.upload()
+            duration = time.perf_counter() - start_time
+        status: GGBotImageUploadStatus = image_host_manager.status
+        self._record_upload(
+            image_host=image_host,
+            image_host_manager=image_host_manager,
+            image_paths=[image_path],
+            upload_statuses=[status],
+            duration=duration,
+        )
+        if status.status:
+            logging.debug(f"[Screenshots] Response from image host: {status}")
+        return status
+
+    def upload_all_screenshots(
+        self,
+        image_paths: List[str],
+        prepare_for_image_host: Optional[
+            Callable[[str, List[str]], List[str]]
+        ] = None,
+    ) -> List[GGBotImageUploadStatus]:
+        """
+        Uploads the screenshots and returns the upload status of each screenshot, in the order of `image_paths`
+        irrespective of the order in which the uploads completes.
+        The screenshots are uploaded to the image hosts in the configured order (or ordered by their health, when
+        `image_host_ordering` is adaptive). Screenshots that failed to upload to an image host are tried with the
+        next image host.
+        `prepare_for_image_host` is invoked with (image host, screenshots) before uploading to each image host, and
+        returns the screenshots to be uploaded to it (e.g. converted to fit the size limit of the image host).
+        """
+        upload_statuses: List[GGBotImageUploadStatus] = [
+            GGBotImageUploadStatus(status=False) for _ in image_paths
+        ]
+        pending_indices = self._use_cached_uploads(image_paths, upload_statuses)
+        for image_host in self._get_ordered_image_hosts():
+            if len(pending_indices) == 0:
+                break
+            host_image_paths = [image_paths[index] for index in pending_indices]
+            if prepare_for_image_host is not None:
+                host_image_paths = prepare_for_image_host(
+                    image_host, host_image_paths
+                )
+            host_upload_statuses = self._upload_screenshots_to_image_host(
+                image_host=image_host, image_paths=host_image_paths
+            )
+            for index, status in zip(pending_indices, host_upload_statuses):
+                upload_statuses[index] = status
+                if self.upload_cache is not None:
+                    self.upload_cache.put(
+                        image_paths[index], image_host, status
+                    )
+            pending_indices = [
+                index
+                for index in pending_indices
+                if not upload_statuses[index].status
+            ]
+        return upload_statuses
+
+    def _use_cached_uploads(
+        self,
+        image_paths: List[str],
+        upload_statuses: List[GGBotImageUploadStatus],
+    ) -> List[int]:
+        """
+        Fills the statuses of the screenshots that have been uploaded to any of the image hosts previously.
+        Returns the indices of the screenshots that still needs to be uploaded.
+        """
+        pending_indices = []
+        for index, image_path in enumerate(image_paths):
+            cached_upload = None
+            if self.upload_cache is not None:
+                cached_upload = next(
+                    filter(
+                        None,
+                        (
+                            self.upload_cache.get(image_path, image_host)
+                            for image_host in self.image_hosts
+                        ),
+                    ),
+                    None,
+                )
+            if cached_upload is None:
+                pending_indices.append(index)
+            else:
+                upload_statuses[index] = cached_upload
+        if len(pending_indices) < len(image_paths):
+            logging.info(
+                f"[GGBotImageHostManager::upload_all_screenshots] Reusing previous uploads of "
+                f"{len(image_paths) - len(pending_indices)} screenshots"
+            )
+        return pending_indices
+
+    def _upload_screenshots_to_image_host(
+        self, *, image_host: str, image_paths: List[str]
+    ) -> List[GGBotImageUploadStatus]:
+        image_host_manager: GGBotImageHostBase = (
+            self._create_image_host_uploader(
+                image_path=image_paths[0], image_host=image_host
+            )
+        )
+        if image_host_manager.supports_batch_upload and len(image_paths) > 1:
+            logging.info(
+                f"[GGBotImageHostManager::upload_all_screenshots] Uploading {len(image_paths)} screenshots to "
+                f"{image_host} in a single batch"
+            )
+            with console.status(
+                f"Uploading {len(image_paths)} screenshots to {image_host}..."
+            ):
+                start_time = time.perf_counter()
+                upload_statuses = image_host_manager.upload_batch(image_paths)
+            self._record_upload(
+                image_host=image_host,
+                image_host_manager=image_host_manager,
+                image_paths=image_paths,
+                upload_statuses=upload_statuses,
+                duration=time.perf_counter() - start_time,
+            )
+            return upload_statuses
+
+        workers = min(self.upload_workers, len(image_paths))
+        if workers <= 1:
+            return [
+                self._upload_screenshot_to_image_host(
+                    image_host=image_host, image_path=image_path
+                )
+                for image_path in track(
+                    image_paths, description="Uploading screenshots..."
+                )
+            ]
+
+        logging.info(
+            f"[GGBotImageHostManager::upload_all_screenshots] Uploading {len(image_paths)} screenshots to "
+            f"{image_host} with {workers} workers"
+        )
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ScreenshotUpload"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._upload_screenshot_to_image_host,
+                    image_host=image_host,
+                    image_path=image_path,
+                )
+                for image_path in image_paths
+            ]
+            # progress is reported as the uploads completes, while results are collected in the original order
+            for _ in track(
+                as_completed(futures),
+                total=len(futures),
+                description="Uploading screenshots...",
+            ):
+                pass
+            return [future.result() for future in futures]
+
     def _create_image_host_uploader(
         self, *, image_host: str, image_path: str
     ) -> GGBotImageHostBase:
@@ -0,0 +1,87 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+import threading
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.config import ImageHostConfig
+
+
+class GGBotTimeoutHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout to the requests made without one"""
+
+    def __init__(self, *, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+class GGBotImageHostSessions:
+    """
+    Registry of the http sessions used to upload images, one session per image host.
+    Sessions keeps the connections alive, hence the screenshots uploaded to an image host (from any thread) reuse the
+    pooled connections instead of making a new connection (and tls handshake) for every image.
+    The connection pool of a host is sized to the number of uploads made to the host at the same time.
+    """
+
+    _sessions: Dict[str, requests.Session] = {}
+    _lock = threading.Lock()
+
+    @staticmethod
+    def _create_session(image_host: str) -> requests.Session:
+        config = ImageHostConfig()
+        pool_size = ImageHostConfig.IMAGE_HOST_MAX_CONCURRENT_UPLOADS(
+            image_host
+        )
+        # failed connection attempts are retried, requests that reached the image host are never retried
+        adapter = GGBotTimeoutHTTPAdapter(
+            timeout=(
+                config.IMAGE_HOST_CONNECT_TIMEOUT,
+                config.IMAGE_HOST_READ_TIMEOUT,
+            ),
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=2,
+        )
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        logging.debug(
+            f"[GGBotImageHostSessions] Created http session for {image_host} with a pool of {pool_size} connections"
+        )
+        return session
+
+    @classmethod
+    def get(cls, image_host: str) -> requests.Session:
+        with cls._lock:
+            if image_host not in cls._sessions:
+                cls._sessions[image_host] = cls._create_session(image_host)
+            return cls._sessions[image_host]
+
+    @classmethod
+    def close_all(cls) -> None:
+        with cls._lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions.clear()
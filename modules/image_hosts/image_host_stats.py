@@ -0,0 +1,213 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from modules.config import ImageHostConfig
+
+# weight of the latest upload in the moving averages
+EWMA_WEIGHT = 0.3
+# circuit of a failing host is kept open for at most a day, irrespective of the number of failed probes
+MAX_CIRCUIT_OPEN_SECONDS = 24 * 60 * 60
+
+
+def _default_stats() -> Dict:
+    return {
+        "uploads": 0,
+        "failures": 0,
+        "size_rejections": 0,
+        "latency_ewma": 0.0,
+        "success_ewma": 1.0,
+        "consecutive_failures": 0,
+        "circuit_opens": 0,
+        "circuit_open_until": None,
+    }
+
+
+class GGBotImageHostStats:
+    """
+    Persistent statistics (latency, failure rate and size rejections) of the uploads made to each image host.
+
+    Hosts that fail `image_host_circuit_breaker_failures` times in a row are demoted (circuit opened) for
+    `image_host_reprobe_seconds`. Once the time has elapsed, the host is tried (re-probed) again. A failed probe opens
+    the circuit again for twice the previous duration, while a successful one restores the host.
+    Uploads rejected due to the size of the image are not considered as failures of the host for the circuit.
+    """
+
+    def __init__(self, stats_path: str):
+        self.config = ImageHostConfig()
+        self.stats_path = stats_path
+        self.lock = threading.RLock()
+        self.connection: Optional[sqlite3.Connection] = None
+        self.is_stats_available = True
+        self._stats: Dict[str, Dict] = {}
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        with self.lock:
+            if self.connection is None and self.is_stats_available:
+                try:
+                    self.connection = sqlite3.connect(
+                        self.stats_path,
+                        check_same_thread=False,
+                        isolation_level=None,
+                    )
+                    self.connection.execute("PRAGMA busy_timeout=5000")
+                    self.connection.execute(
+                        "CREATE TABLE IF NOT EXISTS image_host_stats ("
+                        "image_host TEXT PRIMARY KEY, stats TEXT NOT NULL)"
+                    )
+                except sqlite3.Error as ex:
+                    # stats are kept only in memory when they cannot be persisted
+                    logging.error(
+                        f"[GGBotImageHostStats] Failed to open image host stats at {self.stats_path}. Error: {ex}"
+                    )
+                    self.connection = None
+                    self.is_stats_available = False
+            return self.connection
+
+    def get(self, image_host: str) -> Dict:
+        with self.lock:
+            if image_host not in self._stats:
+                stats = _default_stats()
+                connection = self._get_connection()
+                if connection is not None:
+                    row = connection.execute(
+                        "SELECT stats FROM image_host_stats WHERE image_host = ?",
+                        [image_host],
+                    ).fetchone()
+                    if row is not None:
+                        stats.update(json.loads(row[0]))
+                self._stats[image_host] = stats
+            return self._stats[image_host]
+
+    def record_upload(
+        self,
+        image_host: str,
+        *,
+        success: bool,
+        latency: float,
+        size_rejected: bool = False,
+    ) -> None:
+        with self.lock:
+            stats = self.get(image_host)
+            stats["uploads"] += 1
+            stats["success_ewma"] = (
+                EWMA_WEIGHT * (1.0 if success else 0.0)
+                + (1 - EWMA_WEIGHT) * stats["success_ewma"]
+            )
+            if success:
+                # latency of failed uploads (timeouts, quick rejections) doesn't reflect the speed of the host
+                stats["latency_ewma"] = (
+                    latency
+                    if stats["uploads"] - stats["failures"] == 1
+                    else EWMA_WEIGHT * latency
+                    + (1 - EWMA_WEIGHT) * stats["latency_ewma"]
+                )
+                stats["consecutive_failures"] = 0
+                stats["circuit_opens"] = 0
+                stats["circuit_open_until"] = None
+            elif size_rejected:
+                stats["failures"] += 1
+                stats["size_rejections"] += 1
+            else:
+                stats["failures"] += 1
+                stats["consecutive_failures"] += 1
+                if (
+                    stats["consecutive_failures"]
+                    >= self.config.IMAGE_HOST_CIRCUIT_BREAKER_FAILURES
+                ):
+                    self._open_circuit(image_host, stats)
+            self._save(image_host, stats)
+
+    def _open_circuit(self, image_host: str, stats: Dict) -> None:
+        open_seconds = min(
+            self.config.IMAGE_HOST_REPROBE_SECONDS
+            * 2 ** stats["circuit_opens"],
+            MAX_CIRCUIT_OPEN_SECONDS,
+        )
+        stats["circuit_opens"] += 1
+        stats["circuit_open_until"] = time.time() + open_seconds
+        logging.info(
+            f"[GGBotImageHostStats] Demoting image host {image_host} for {open_seconds} seconds after "
+            f"{stats['consecutive_failures']} consecutive failures"
+        )
+
+    def _save(self, image_host: str, stats: Dict) -> None:
+        connection = self._get_connection()
+        if connection is None:
+            return
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO image_host_stats (image_host, stats) VALUES (?, ?)",
+                [image_host, json.dumps(stats)],
+            )
+        except sqlite3.Error as ex:
+            logging.error(
+                f"[GGBotImageHostStats] Failed to save stats of image host {image_host}. Error: {ex}"
+            )
+
+    def is_circuit_open(self, image_host: str) -> bool:
+        circuit_open_until = self.get(image_host)["circuit_open_until"]
+        return (
+            circuit_open_until is not None and circuit_open_until > time.time()
+        )
+
+    def _get_score(self, image_host: str) -> float:
+        stats = self.get(image_host)
+        if stats["uploads"] == 0:
+            # hosts that are yet to be measured are tried first, so that they get measured
+            return 0.0
+        if stats["uploads"] == stats["failures"]:
+            # hosts that never succeeded (failures or size rejections) have no latency to rank them with
+            return float("inf")
+        # expected time to upload a screenshot, considering the failures
+        return stats["latency_ewma"] / max(stats["success_ewma"], 0.05)
+
+    def order(self, image_hosts: List[str]) -> List[str]:
+        """
+        Orders the image hosts based on their health. Hosts yet to be measured are tried first, healthy hosts are
+        ordered by their latency and success rate, followed by the hosts without a successful upload. Demoted hosts
+        are moved to the end (still available as the last resort).
+        Hosts with the same score retains the configured order.
+        """
+        with self.lock:
+            ordered_image_hosts = [
+                image_host
+                for _, image_host in sorted(
+                    enumerate(image_hosts),
+                    key=lambda indexed_host: (
+                        self.is_circuit_open(indexed_host[1]),
+                        self._get_score(indexed_host[1]),
+                        indexed_host[0],
+                    ),
+                )
+            ]
+        if ordered_image_hosts != image_hosts:
+            logging.info(
+                f"[GGBotImageHostStats] Image hosts reordered from {image_hosts} to {ordered_image_hosts}"
+            )
+        return ordered_image_hosts
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
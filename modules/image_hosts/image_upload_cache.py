@@ -0,0 +1,181 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from modules.config import ImageHostConfig
+from modules.image_hosts.image_upload_status import GGBotImageUploadStatus
+
+SECONDS_IN_DAY = 24 * 60 * 60
+
+
+class GGBotImageUploadCache:
+    """
+    Persistent cache of the screenshots uploaded to the image hosts.
+
+    Uploads are identified by the sha256 of the image and the image host, hence the same screenshot taken again
+    (e.g: retries of a torrent) is not uploaded again to the same image host.
+    - Cached uploads older than `screenshot_upload_cache_ttl_days` are evicted
+    - When there are more than `screenshot_upload_cache_max_entries` uploads, the least recently used are evicted
+    - A cached upload is reused for an image host only within its `<image_host>_cache_validity_days`
+    """
+
+    def __init__(self, cache_path: str):
+        self.config = ImageHostConfig()
+        self.cache_path = cache_path
+        self.lock = threading.RLock()
+        self.connection: Optional[sqlite3.Connection] = None
+        self.is_cache_available = True
+        self._image_hashes: Dict[str, str] = {}
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        # the database is opened only when screenshots are uploaded
+        with self.lock:
+            if self.connection is None and self.is_cache_available:
+                try:
+                    self.connection = sqlite3.connect(
+                        self.cache_path,
+                        check_same_thread=False,
+                        isolation_level=None,
+                    )
+                    self.connection.execute("PRAGMA busy_timeout=5000")
+                    self.connection.execute(
+                        "CREATE TABLE IF NOT EXISTS screenshot_uploads ("
+                        "image_hash TEXT NOT NULL, "
+                        "image_host TEXT NOT NULL, "
+                        "upload_status TEXT NOT NULL, "
+                        "uploaded_at REAL NOT NULL, "
+                        "last_used_at REAL NOT NULL, "
+                        "PRIMARY KEY (image_hash, image_host))"
+                    )
+                    self.evict()
+                except sqlite3.Error as ex:
+                    # screenshots can be uploaded without the cache
+                    logging.error(
+                        f"[GGBotImageUploadCache] Failed to open screenshot upload cache at {self.cache_path}. "
+                        f"Error: {ex}"
+                    )
+                    self.connection = None
+                    self.is_cache_available = False
+            return self.connection
+
+    def _get_image_hash(self, image_path: str) -> str:
+        if image_path not in self._image_hashes:
+            sha256 = hashlib.sha256()
+            with open(image_path, "rb") as image:
+                for chunk in iter(lambda: image.read(1024 * 1024), b""):
+                    sha256.update(chunk)
+            self._image_hashes[image_path] = sha256.hexdigest()
+        return self._image_hashes[image_path]
+
+    def get(
+        self, image_path: str, image_host: str
+    ) -> Optional[GGBotImageUploadStatus]:
+        """Returns the cached upload of the image to the image host, if it is still valid for the host"""
+        image_hash = self._get_image_hash(image_path)
+        valid_after = (
+            time.time()
+            - self.config.IMAGE_HOST_CACHE_VALIDITY_DAYS(image_host)
+            * SECONDS_IN_DAY
+        )
+        with self.lock:
+            connection = self._get_connection()
+            if connection is None:
+                return None
+            row = connection.execute(
+                "SELECT upload_status FROM screenshot_uploads "
+                "WHERE image_hash = ? AND image_host = ? AND uploaded_at >= ?",
+                [image_hash, image_host, valid_after],
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE screenshot_uploads SET last_used_at = ? WHERE image_hash = ? AND image_host = ?",
+                [time.time(), image_hash, image_host],
+            )
+        logging.debug(
+            f"[GGBotImageUploadCache::get] Using cached upload of {image_path} to {image_host}"
+        )
+        return GGBotImageUploadStatus(status=True, **json.loads(row[0]))
+
+    def put(
+        self,
+        image_path: str,
+        image_host: str,
+        upload_status: GGBotImageUploadStatus,
+    ) -> None:
+        if not upload_status.status:
+            return
+        now = time.time()
+        with self.lock:
+            connection = self._get_connection()
+            if connection is None:
+                return
+            connection.execute(
+                "INSERT OR REPLACE INTO screenshot_uploads "
+                "(image_hash, image_host, upload_status, uploaded_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    self._get_image_hash(image_path),
+                    image_host,
+                    json.dumps(
+                        {
+                            "bb_code_medium_thumb": upload_status.bb_code_medium_thumb,
+                            "bb_code_medium": upload_status.bb_code_medium,
+                            "bb_code_thumb": upload_status.bb_code_thumb,
+                            "image_url": upload_status.image_url,
+                        }
+                    ),
+                    now,
+                    now,
+                ],
+            )
+
+    def evict(self) -> int:
+        """Removes the expired uploads and the least recently used uploads over the limit"""
+        expired_before = (
+            time.time()
+            - self.config.SCREENSHOT_UPLOAD_CACHE_TTL_DAYS * SECONDS_IN_DAY
+        )
+        with self.lock:
+            connection = self._get_connection()
+            if connection is None:
+                return 0
+            evicted = connection.execute(
+                "DELETE FROM screenshot_uploads WHERE uploaded_at < ?",
+                [expired_before],
+            ).rowcount
+            evicted += connection.execute(
+                "DELETE FROM screenshot_uploads WHERE rowid IN ("
+                "SELECT rowid FROM screenshot_uploads ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                [max(self.config.SCREENSHOT_UPLOAD_CACHE_MAX_ENTRIES, 0)],
+            ).rowcount
+        if evicted > 0:
+            logging.info(
+                f"[GGBotImageUploadCache::evict] Evicted {evicted} cached screenshot uploads"
+            )
+        return evicted
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
@@ -15,7 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import enum
-from typing import Union
+from typing import Optional, Union
 from modules.torrent_clients.client_rtorrent import Rutorrent
 from modules.torrent_clients.client_qbittorrent import Qbittorrent
 
@@ -50,6 +50,13 @@ class TorrentClient:
     def list_torrents(self):
         return self.client.list_torrents()
 
+    @property
+    def supports_change_feed(self) -> bool:
+        return hasattr(self.client, "list_torrent_changes")
+
+    def list_torrent_changes(self):
+        return self.client.list_torrent_changes()
+
     def upload_torrent(
         self,
         torrent,
@@ -73,3 +80,13 @@ class TorrentClient:
 
     def get_dynamic_trackers(self, torrent):
         return self.client.get_dynamic_trackers(torrent)
+
+    @property
+    def supports_torrent_export(self) -> bool:
+        return hasattr(self.client, "export_torrent")
+
+    def export_torrent(self, info_hash) -> Optional[bytes]:
+        """Returns the .torrent (metainfo) of the torrent from the client, or None when it cannot be exported"""
+        if not self.supports_torrent_export:
+            return None
+        return self.client.export_torrent(info_hash)
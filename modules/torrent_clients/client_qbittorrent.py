@@ -16,8 +16,10 @@
 
 import logging
 from datetime import datetime
+from typing import Dict, Optional
 
 import qbittorrentapi
+from qbittorrentapi.definitions import APINames
 
 from modules.config import ClientConfig, ReUploaderConfig
 
@@ -64,6 +66,12 @@ class Qbittorrent:
         # `source_label` is the label which will be added to the original torrent in the client
         self.source_label = f"{self.seed_label}_Source"
 
+        # state of the `sync/maindata` change feed.
+        # `rid` is the response id of the last sync and `torrents_snapshot` is the view of the torrents in the client
+        # built by applying the deltas. With rid 0 qbittorrent will always respond with a full update.
+        self.rid = 0
+        self.torrents_snapshot: Dict[str, Dict] = {}
+
         try:
             logging.info(
                 "[Qbittorrent] Authenticating with the qbittorrent instance..."
@@ -96,16 +104,16 @@ class Qbittorrent:
 
     def __match_label(self, torrent):
         # we don't want to consider cross-seeded torrents uploaded by the bot
-        if self.seed_label == torrent.category:
+        if self.seed_label == torrent["category"]:
             return False
         # user wants to ignore labels, hence we'll consider all the torrents
         if self.target_label == "IGNORE_LABEL":
             return True
         # if dynamic tracker selection is enabled, then labels will follow the pattern GGBOT::TR1::TR2::TR3
         if self.dynamic_tracker_selection:
-            return torrent.category.startswith(self.target_label)
+            return torrent["category"].startswith(self.target_label)
         else:
-            return torrent.category == self.target_label
+            return torrent["category"] == self.target_label
 
     @staticmethod
     def __extract_necessary_keys(torrent):
@@ -132,6 +140,89 @@ class Qbittorrent:
             )
         )
 
+    def resync(self):
+        """
+        Discards the current state of the change feed.
+        The next call to `list_torrent_changes` will receive a full update from the client.
+        """
+        logging.info("[Qbittorrent] Resetting the torrent change feed")
+        self.rid = 0
+        self.torrents_snapshot = {}
+
+    def list_torrent_changes(self):
+        """
+        Lists the torrents that have been added or changed in the client since the previous call,
+        using the rid based deltas from `sync/maindata`.
+
+        Response format
+        {
+            "full_update": True if the client sent its entire state. Torrents that are not present in `torrents`
+                            needs to be considered as removed.
+            "torrents": list of added / changed torrents that matches the reupload label
+            "removed": hashes of torrents that were removed from the client or no longer matches the reupload label
+        }
+        """
+        logging.debug(
+            f"[Qbittorrent] Listing torrent changes since rid {self.rid} at {datetime.now()}"
+        )
+        try:
+            maindata = self.qbt_client.sync_maindata(rid=self.rid)
+        except qbittorrentapi.APIError as err:
+            # we cannot be sure which deltas have been applied. Starting from scratch on the next poll
+            logging.error(
+                f"[Qbittorrent] Failed to sync torrent changes from qbittorrent: {err}"
+            )
+            self.resync()
+            raise err
+
+        full_update = bool(maindata.get("full_update", False))
+        previous_snapshot = {}
+        if full_update:
+            logging.info(
+                f"[Qbittorrent] Received full update from qbittorrent with rid {maindata.get('rid')}"
+            )
+            previous_snapshot = self.torrents_snapshot
+            self.torrents_snapshot = {}
+
+        changed_hashes = []
+        for info_hash, delta in (maindata.get("torrents") or {}).items():
+            # deltas only contain the properties that have changed since the last sync
+            torrent = self.torrents_snapshot.setdefault(info_hash, {})
+            torrent.update(self.__extract_necessary_keys(delta))
+            torrent["hash"] = info_hash
+            changed_hashes.append(info_hash)
+
+        removed = []
+        for info_hash in maindata.get("torrents_removed") or []:
+            if self.torrents_snapshot.pop(info_hash, None) is not None:
+                removed.append(info_hash)
+        if full_update:
+            removed.extend(
+                info_hash
+                for info_hash in previous_snapshot
+                if info_hash not in self.torrents_snapshot
+            )
+
+        torrents = []
+        for info_hash in changed_hashes:
+            torrent = self.torrents_snapshot.get(info_hash)
+            if torrent is None:
+                continue  # torrent was removed in the same sync
+            if self.__match_label(torrent):
+                torrents.append(dict(torrent))
+            elif not full_update:
+                removed.append(info_hash)
+
+        self.rid = maindata.get("rid", 0)
+        logging.debug(
+            f"[Qbittorrent] Torrent changes: {len(torrents)} added / changed and {len(removed)} removed"
+        )
+        return {
+            "full_update": full_update,
+            "torrents": torrents,
+            "removed": removed,
+        }
+
     def upload_torrent(
         self,
         torrent_path,
@@ -159,3 +250,19 @@ class Qbittorrent:
         self.qbt_client.torrents_set_category(
             category=category_name, torrent_hashes=info_hash
         )
+
+    def export_torrent(self, info_hash) -> Optional[bytes]:
+        # torrents can be exported from qbittorrent 4.5.0 (web api 2.8.11) onwards
+        try:
+            if hasattr(self.qbt_client, "torrents_export"):
+                return self.qbt_client.torrents_export(torrent_hash=info_hash)
+            return self.qbt_client._get(
+                _name=APINames.Torrents,
+                _method="export",
+                params={"hash": info_hash},
+            ).content
+        except qbittorrentapi.APIError as err:
+            logging.error(
+                f"[Qbittorrent] Failed to export torrent with hash {info_hash} from qbittorrent: {err}"
+            )
+            return None
@@ -16,6 +16,7 @@
 
 import base64
 import logging
+from typing import Optional
 
 import requests
 
@@ -44,6 +45,7 @@ class Rutorrent:
     __disk_size_path = "/plugins/diskspace/action.php"
     __default_path = "/plugins/httprpc/action.php"
     __upload_torrent_path = "/php/addtorrent.php"
+    __export_torrent_path = "/plugins/source/action.php"
 
     def __call_server(self, url, data=None, files=None, header=None):
         response = requests.post(
@@ -279,3 +281,26 @@ class Rutorrent:
             logging.error(
                 f"[RuTorrent] Failed to update category of torrent with hash {info_hash} to {category_name}"
             )
+
+    def export_torrent(self, info_hash) -> Optional[bytes]:
+        # the session .torrent of rtorrent is served by the `source` plugin of rutorrent
+        try:
+            response = self.__call_server(
+                f"{self.base_url}{self.__export_torrent_path}",
+                data={"hash": info_hash},
+            )
+        except Exception as err:
+            logging.error(
+                f"[Rutorrent] Failed to export torrent with hash {info_hash} from rutorrent. Error: {err}"
+            )
+            return None
+        if (
+            not isinstance(response, requests.Response)
+            or response.status_code != 200
+            or not response.content.startswith(b"d")
+        ):
+            logging.error(
+                f"[Rutorrent] Failed to export torrent with hash {info_hash}. Is the source plugin enabled?"
+            )
+            return None
+        return response.content
@@ -0,0 +1,132 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import io
+import logging
+from datetime import datetime
+from typing import List, Sequence, Tuple
+
+from torf import TorfError
+
+from modules.torrent_generator.generator_base import (
+    CREATED_BY,
+    DEFAULT_COMMENT,
+    DEFAULT_EXCLUDE_GLOBS,
+)
+from modules.torrent_generator.piece_hash_cache import PIECE_HASH_LENGTH
+from modules.torrent_generator.piece_size_policy import GGBotPieceSizePolicy
+from modules.torrent_generator.torf_generator import GGBOTTorrent
+
+# keys of the info dict that decide the pieces and the files. Everything else is specific to the original tracker
+INFO_KEYS = ("name", "piece length", "pieces", "length", "files")
+FILE_KEYS = ("length", "path")
+
+
+class GGBotClientTorrentImporter:
+    """
+    Reuses the metainfo of a torrent exported from the torrent client, instead of hashing the media again.
+
+    The torrent client has verified the pieces of a complete torrent already, hence the metainfo can be reused as long
+    as it describes exactly the files that GG-Bot would have put in the torrent (same name, files, sizes and order)
+    and its piece size is one that GG-Bot could have chosen, which is accepted by all the trackers. The tracker specific data of the original torrent
+    (trackers, source, comment, web seeds etc.) is removed, and the announce urls and source of the target tracker
+    are then added by `GGBotTorrentEditor`.
+    """
+
+    def __init__(
+        self,
+        media: str,
+        piece_size_policies: Sequence[GGBotPieceSizePolicy] = (),
+    ):
+        self.media = media
+        self.piece_size_policies = piece_size_policies
+
+    def _get_expected_files(self) -> Tuple[str, List[Tuple[str, int]]]:
+        # torf only lists the files here, the media is not read
+        torrent = GGBOTTorrent(
+            path=self.media, exclude_globs=list(DEFAULT_EXCLUDE_GLOBS)
+        )
+        return torrent.name, [(str(file), file.size) for file in torrent.files]
+
+    def _is_reusable(self, client_torrent: GGBOTTorrent) -> bool:
+        piece_size = client_torrent.piece_size
+        if not (
+            GGBOTTorrent.piece_size_min
+            <= piece_size
+            <= GGBOTTorrent.piece_size_max
+        ):
+            logging.info(
+                f"[GGBotClientTorrentImporter] Piece size {piece_size} of the client torrent is not supported"
+            )
+            return False
+        if not all(
+            policy.allows(piece_size, client_torrent.size)
+            for policy in self.piece_size_policies
+        ):
+            logging.info(
+                f"[GGBotClientTorrentImporter] Piece size {piece_size} of the client torrent is not accepted by all "
+                f"the trackers"
+            )
+            return False
+        expected_name, expected_files = self._get_expected_files()
+        client_files = [(str(file), file.size) for file in client_torrent.files]
+        if (
+            client_torrent.name != expected_name
+            or client_files != expected_files
+        ):
+            logging.info(
+                "[GGBotClientTorrentImporter] Files of the client torrent doesn't match the files of the media"
+            )
+            return False
+        return True
+
+    @staticmethod
+    def _remove_tracker_data(client_torrent: GGBOTTorrent) -> None:
+        metainfo = client_torrent.metainfo
+        for key in [key for key in metainfo if key != "info"]:
+            del metainfo[key]
+        info = metainfo["info"]
+        for key in [key for key in info if key not in INFO_KEYS]:
+            del info[key]
+        for file in info.get("files", []):
+            for key in [key for key in file if key not in FILE_KEYS]:
+                del file[key]
+        client_torrent.private = True
+        client_torrent.comment = DEFAULT_COMMENT
+        client_torrent.created_by = CREATED_BY
+        client_torrent.creation_date = datetime.now()
+
+    def import_torrent(self, metainfo: bytes, torrent_path: str) -> bool:
+        """
+        Writes the client torrent to `torrent_path` when it can be reused for the media.
+        Returns False when the media has to be hashed instead.
+        """
+        try:
+            client_torrent = GGBOTTorrent.read_stream(io.BytesIO(metainfo))
+            if not self._is_reusable(client_torrent):
+                return False
+            self._remove_tracker_data(client_torrent)
+            client_torrent.write(torrent_path, overwrite=True)
+        except (TorfError, OSError) as ex:
+            logging.error(
+                f"[GGBotClientTorrentImporter] Failed to reuse the torrent exported from the client. Error: {ex}"
+            )
+            return False
+        logging.info(
+            f"[GGBotClientTorrentImporter] Reusing the {len(client_torrent.metainfo['info']['pieces']) // PIECE_HASH_LENGTH} pieces "
+            f"of {client_torrent.piece_size} bytes of the client torrent"
+        )
+        return True
@@ -14,38 +14,171 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import os
 from abc import ABC, abstractmethod
 from datetime import datetime
 from functools import cached_property
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from modules.config import UploaderConfig
+from modules.torrent_generator.piece_hash_cache import (
+    GGBotPieceHashCache,
+    PIECE_HASH_LENGTH,
+)
+from modules.torrent_generator.piece_hasher import GGBotPieceHasher
+from modules.torrent_generator.piece_size_policy import (
+    GGBotPieceSizePolicy,
+    choose_piece_sizes,
+)
+
+DEFAULT_COMMENT = "Torrent created by GG-Bot Upload Assistant"
+CREATED_BY = "GG-Bot Upload Assistant"
+DEFAULT_EXCLUDE_GLOBS = (
+    "*.txt",
+    "*.jpg",
+    "*.png",
+    "*.nfo",
+    "*.svf",
+    "*.rar",
+    "*.screens",
+    "*.sfv",
+)
+# torrents of the other piece sizes are kept in a sub folder of the working folder, so that the post processing
+# (which moves every `*.torrent` of the working folder) never picks them up
+EXTRA_TORRENTS_FOLDER = "piece_sizes"
 
 
 class GGBotTorrentGeneratorBase(ABC):
     def __init__(
-        self, *, media, announce, source, torrent_title, torrent_path_prefix
+        self,
+        *,
+        media,
+        announce,
+        source,
+        torrent_title,
+        torrent_path_prefix,
+        piece_hash_cache: Optional[GGBotPieceHashCache] = None,
+        piece_size_policies: Sequence[GGBotPieceSizePolicy] = (),
     ):
         self.media = media
         self.announce = announce
         self.source = source
         self.private = True
-        self.comment = "Torrent created by GG-Bot Upload Assistant"
-        self.created_by = "GG-Bot Upload Assistant"
+        self.comment = DEFAULT_COMMENT
+        self.created_by = CREATED_BY
         self.created_at = datetime.now()
         self.torrent_title = torrent_title
+        self.torrent_path_prefix = torrent_path_prefix
         self.torrent_path = f"{torrent_path_prefix}-{torrent_title}.torrent"
+        self.hash_workers = (
+            UploaderConfig().TORRENT_HASH_WORKERS or os.cpu_count() or 1
+        )
+        self.piece_hash_cache = piece_hash_cache
+        # piece size constraints of all the trackers the torrent is created for. First one is of this tracker
+        self.piece_size_policies = list(piece_size_policies)
+
+    def get_piece_sizes(self, default_piece_size: int) -> List[int]:
+        """
+        Returns the piece sizes to be hashed, such that every tracker accepts one of them. The first one is the piece
+        size of this torrent, while the others are hashed for the trackers whose constraints conflict with it.
+        """
+        if len(self.piece_size_policies) == 0:
+            return [default_piece_size]
+        return choose_piece_sizes(
+            default_piece_size=default_piece_size,
+            total_size=self.size,
+            policies=self.piece_size_policies,
+        )
+
+    def get_extra_torrent_path(self, piece_size: int) -> str:
+        # not named as `<tracker>-<title>.torrent`, so that it is never mistaken for the torrent of the tracker
+        return os.path.join(
+            os.path.dirname(self.torrent_path_prefix),
+            EXTRA_TORRENTS_FOLDER,
+            f"{os.path.basename(self.torrent_path_prefix)}_{piece_size}-{self.torrent_title}.torrent",
+        )
+
+    def hash_pieces(
+        self,
+        *,
+        filepaths: List[str],
+        piece_size: int,
+        callback: Optional[Callable[[str, int, int], Any]] = None,
+    ) -> Optional[bytes]:
+        """
+        Hashes the pieces of the files (in the order of the torrent) using all the cores, unless the pieces of the
+        unchanged files are cached already.
+        Returns the concatenated piece hashes, or None when the hashing was stopped by the callback.
+        """
+        hashes = self.hash_pieces_for_sizes(
+            filepaths=filepaths, piece_sizes=[piece_size], callback=callback
+        )
+        return None if hashes is None else hashes[piece_size]
+
+    def hash_pieces_for_sizes(
+        self,
+        *,
+        filepaths: List[str],
+        piece_sizes: List[int],
+        callback: Optional[Callable[[str, int, int], Any]] = None,
+    ) -> Optional[Dict[int, bytes]]:
+        """
+        Returns the concatenated piece hashes of every piece size, keyed by the piece size.
+        The piece sizes that are not cached are hashed together, reading the files only once.
+        """
+        hashes = {
+            piece_size: self.get_cached_pieces(
+                filepaths=filepaths, piece_size=piece_size
+            )
+            for piece_size in piece_sizes
+        }
+        uncached_piece_sizes = [
+            piece_size
+            for piece_size, pieces in hashes.items()
+            if pieces is None
+        ]
+        if len(uncached_piece_sizes) == 0:
+            if callback is not None:
+                pieces_total = len(hashes[piece_sizes[0]]) // PIECE_HASH_LENGTH
+                callback(filepaths[-1], pieces_total, pieces_total)
+            return hashes
+        hashed_pieces = GGBotPieceHasher(
+            filepaths=filepaths,
+            piece_size=uncached_piece_sizes[0],
+            workers=self.hash_workers,
+            extra_piece_sizes=uncached_piece_sizes[1:],
+        ).hash_all_pieces(callback)
+        if hashed_pieces is None:
+            return None
+        for piece_size, pieces in hashed_pieces.items():
+            self.cache_pieces(
+                filepaths=filepaths, piece_size=piece_size, pieces=pieces
+            )
+        hashes.update(hashed_pieces)
+        return hashes
+
+    def get_cached_pieces(
+        self, *, filepaths: List[str], piece_size: int
+    ) -> Optional[bytes]:
+        if self.piece_hash_cache is None:
+            return None
+        return self.piece_hash_cache.get(
+            filepaths=filepaths, piece_size=piece_size
+        )
+
+    def cache_pieces(
+        self, *, filepaths: List[str], piece_size: int, pieces: Optional[bytes]
+    ) -> None:
+        # pieces are not available when the hashing was stopped
+        if self.piece_hash_cache is None or pieces is None:
+            return
+        self.piece_hash_cache.put(
+            filepaths=filepaths, piece_size=piece_size, pieces=pieces
+        )
 
     @cached_property
     def default_exclude_globs(self) -> List:
-        return [
-            "*.txt",
-            "*.jpg",
-            "*.png",
-            "*.nfo",
-            "*.svf",
-            "*.rar",
-            "*.screens",
-            "*.sfv",
-        ]
+        return list(DEFAULT_EXCLUDE_GLOBS)
 
     @cached_property
     @abstractmethod
@@ -14,26 +14,57 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import glob
 import logging
 import os
-from functools import cached_property
+import re
+import subprocess
+from collections import deque
+from functools import cached_property, lru_cache
 from pathlib import Path
+from typing import Callable, List, Optional, Sequence
 
+import flatbencode
+
+from modules.exceptions.exception import GGBotTorrentGenerationException
 from modules.torrent_generator.generator_base import GGBotTorrentGeneratorBase
+from modules.torrent_generator.piece_size_policy import GGBotPieceSizePolicy
 from modules.torrent_generator.torf_generator import GGBOTTorrent
 
+MKTORRENT = "mktorrent"
+# mktorrent reports the progress as `Hashed <done> of <total> pieces.` terminated by a carriage return
+PROGRESS_PATTERN = re.compile(rb"Hashed (\d+) of (\d+) pieces")
+# number of lines of the mktorrent output included in the error, when mktorrent fails
+OUTPUT_LINES_IN_ERROR = 5
+# range of the piece size exponents (`-l`) accepted by mktorrent
+MIN_PIECE_SIZE_EXPONENT = 15
+MAX_PIECE_SIZE_EXPONENT = 28
+
+
+@lru_cache(maxsize=None)
+def _supports_threads() -> bool:
+    # `-t` is available only when mktorrent is built with pthreads
+    try:
+        usage = subprocess.run(
+            [MKTORRENT, "-h"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            check=False,
+        ).stdout
+    except OSError:
+        return False
+    return re.search(rb"^\s*-t[, ]", usage, re.MULTILINE) is not None
+
 
 class GGBotMkTorrentGenerator(GGBotTorrentGeneratorBase):
     """
     mktorrent options
-        -v => Be verbose.
         -p => Set the private flag.
         -a => Specify the full announce URLs.  Additional -a adds backup trackers.
         -o => Set the path and filename of the created file.  Default is <name>.torrent.
         -c => Add a comment to the metainfo.
         -s => Add source string embedded in infohash.
         -l => piece size (potency of 2)
+        -t => Number of threads used for hashing (only when mktorrent is built with pthreads)
 
         -e *.txt,*.jpg,*.png,*.nfo,*.svf,*.rar,*.screens,*.sfv
         # TODO to be added when supported mktorrent is available in alpine
@@ -42,7 +73,15 @@ class GGBotMkTorrentGenerator(GGBotTorrentGeneratorBase):
     """
 
     def __init__(
-        self, *, media, announce, source, torrent_title, torrent_path_prefix
+        self,
+        *,
+        media,
+        announce,
+        source,
+        torrent_title,
+        torrent_path_prefix,
+        progress_callback: Optional[Callable] = None,
+        piece_size_policies: Sequence[GGBotPieceSizePolicy] = (),
     ):
         super().__init__(
             media=media,
@@ -50,6 +89,7 @@ class GGBotMkTorrentGenerator(GGBotTorrentGeneratorBase):
             source=source,
             torrent_title=torrent_title,
             torrent_path_prefix=torrent_path_prefix,
+            piece_size_policies=piece_size_policies,
         )
         self.torrent = GGBOTTorrent(
             path=self.media,
@@ -61,6 +101,7 @@ class GGBotMkTorrentGenerator(GGBotTorrentGeneratorBase):
             private=self.private,
             creation_date=self.created_at,
         )
+        self.progress_callback = progress_callback
 
     @cached_property
     def size(self):
@@ -104,17 +145,97 @@ class GGBotMkTorrentGenerator(GGBotTorrentGeneratorBase):
         else:  # anything > 64 GiB
             return 25
 
+    @cached_property
+    def piece_size_exponent(self) -> int:
+        # mktorrent creates a torrent of only one piece size. Trackers whose constraints conflicts with it will
+        # generate their own torrent
+        piece_size = self.get_piece_sizes(2 ** self.get_piece_size())[0]
+        return min(
+            max(piece_size.bit_length() - 1, MIN_PIECE_SIZE_EXPONENT),
+            MAX_PIECE_SIZE_EXPONENT,
+        )
+
+    def _get_arguments(self) -> List[str]:
+        arguments = [
+            MKTORRENT,
+            "-p",
+            "-l",
+            str(self.piece_size_exponent),
+            "-c",
+            self.comment,
+            "-s",
+            self.source,
+            "-a",
+            self.announce[0],
+            "-o",
+            self.torrent_path,
+        ]
+        if _supports_threads():
+            arguments.extend(["-t", str(self.hash_workers)])
+        arguments.append(self.media)
+        return arguments
+
+    def _report_progress(self, line: bytes) -> bool:
+        """Returns True when the hashing needs to be stopped"""
+        progress = PROGRESS_PATTERN.search(line)
+        if progress is None or self.progress_callback is None:
+            return False
+        pieces_done, pieces_total = map(int, progress.groups())
+        return (
+            self.progress_callback(
+                self.torrent, self.media, pieces_done, max(pieces_total, 1)
+            )
+            is not None
+        )
+
     def generate_torrent(self) -> None:
         logging.info(
             f"[GGBotMkTorrentGenerator] Size of the torrent: {self.size}"
         )
         logging.info(
-            f"[GGBotMkTorrentGenerator] Piece Size of the torrent: {self.get_piece_size()}"
-        )
-        os.system(
-            f"mktorrent -v -p -l {self.get_piece_size()} -c \"{self.comment}\" -s '{self.source}' "
-            f'-a \'{self.announce[0]}\' -o "{self.torrent_path}" "{self.media}"'
+            f"[GGBotMkTorrentGenerator] Piece Size of the torrent: {self.piece_size_exponent}"
         )
+        arguments = self._get_arguments()
+        logging.debug(f"[GGBotMkTorrentGenerator] Running {arguments}")
+        output_lines = deque(maxlen=OUTPUT_LINES_IN_ERROR)
+        stopped = False
+        with subprocess.Popen(
+            arguments,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+        ) as process:
+            pending = b""
+            # progress lines are terminated by a carriage return, hence the output is not read line by line
+            for chunk in iter(lambda: process.stdout.read(4096), b""):
+                *lines, pending = re.split(rb"[\r\n]", pending + chunk)
+                for line in filter(None, lines):
+                    output_lines.append(line)
+                    if self._report_progress(line):
+                        stopped = True
+                        process.terminate()
+                        break
+                if stopped:
+                    break
+            if pending:
+                output_lines.append(pending)
+            return_code = process.wait()
+
+        if stopped:
+            Path(self.torrent_path).unlink(missing_ok=True)
+            logging.info(
+                "[GGBotMkTorrentGenerator] Torrent generation stopped before all pieces were hashed"
+            )
+            return
+        if return_code != 0:
+            output = b"\n".join(output_lines).decode(errors="replace")
+            logging.error(
+                f"[GGBotMkTorrentGenerator] mktorrent failed with exit code {return_code}. Output: {output}"
+            )
+            raise GGBotTorrentGenerationException(
+                f"mktorrent failed with exit code {return_code}: {output}"
+            )
         logging.info(
             "[GGBotMkTorrentGenerator] Mktorrent .torrent write into {}".format(
                 "[" + self.source + "]" + self.torrent_title + ".torrent"
@@ -122,20 +243,20 @@ class GGBotMkTorrentGenerator(GGBotTorrentGeneratorBase):
         )
 
     def do_post_generation_task(self) -> None:
+        # only the keys outside the info dict are changed and the torrent is written once, hence the info hash
+        # computed by mktorrent is kept as is
         logging.info(
-            "[GGBotMkTorrentGenerator] Using torf to do some cleanup on the created torrent"
+            "[GGBotMkTorrentGenerator] Updating the metainfo of the created torrent"
         )
-        edit_torrent: GGBOTTorrent = GGBOTTorrent.read(
-            glob.glob(self.torrent_path)[0]
-        )
-        edit_torrent.created_by = self.created_by
-        edit_torrent.metainfo["created by"] = self.created_by
+        metainfo = flatbencode.decode(Path(self.torrent_path).read_bytes())
+        metainfo[b"created by"] = self.created_by.encode()
         if len(self.announce) > 1:
             # multiple announce urls
-            edit_torrent.metainfo["announce-list"] = []
-            for announce_url in self.announce:
-                edit_torrent.metainfo["announce-list"].append([announce_url])
-        GGBOTTorrent.copy(edit_torrent).write(
-            filepath=self.torrent_path,
-            overwrite=True,
-        )
+            metainfo[b"announce-list"] = [
+                [announce_url.encode()] for announce_url in self.announce
+            ]
+        else:
+            metainfo.pop(b"announce-list", None)
+        temp_torrent_path = f"{self.torrent_path}.tmp"
+        Path(temp_torrent_path).write_bytes(flatbencode.encode(metainfo))
+        os.replace(temp_torrent_path, self.torrent_path)
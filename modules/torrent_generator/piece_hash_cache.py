@@ -0,0 +1,186 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+from modules.config import UploaderConfig
+
+BYTES_IN_MB = 1024 * 1024
+# length of a SHA-1 piece hash
+PIECE_HASH_LENGTH = 20
+
+
+def _get_file_identity(filepath: str) -> List:
+    stat = os.stat(filepath)
+    return [
+        os.path.abspath(filepath),
+        stat.st_size,
+        stat.st_mtime_ns,
+        stat.st_ino,
+    ]
+
+
+class GGBotPieceHashCache:
+    """
+    Persistent cache of the piece hashes of the media for which torrents were generated.
+
+    The pieces are identified by the (path, size, modification time, inode) of every file of the torrent, in order,
+    and the piece size. Hence a media that hasn't changed since its torrent was generated (e.g: retries, or uploads
+    to more trackers later) is not read again, while any change to the files makes the cached pieces unusable.
+    - When the cached pieces take more than `piece_hash_cache_max_mb`, the least recently used are evicted
+    """
+
+    def __init__(self, cache_path: str):
+        self.config = UploaderConfig()
+        self.cache_path = cache_path
+        self.lock = threading.RLock()
+        self.connection: Optional[sqlite3.Connection] = None
+        self.is_cache_available = True
+
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        with self.lock:
+            if self.connection is None and self.is_cache_available:
+                try:
+                    self.connection = sqlite3.connect(
+                        self.cache_path,
+                        check_same_thread=False,
+                        isolation_level=None,
+                    )
+                    self.connection.execute("PRAGMA busy_timeout=5000")
+                    self.connection.execute(
+                        "CREATE TABLE IF NOT EXISTS piece_hashes ("
+                        "cache_key TEXT PRIMARY KEY, "
+                        "files TEXT NOT NULL, "
+                        "piece_size INTEGER NOT NULL, "
+                        "pieces BLOB NOT NULL, "
+                        "pieces_size INTEGER NOT NULL, "
+                        "last_used_at REAL NOT NULL)"
+                    )
+                except sqlite3.Error as ex:
+                    # pieces can be hashed without the cache
+                    logging.error(
+                        f"[GGBotPieceHashCache] Failed to open piece hash cache at {self.cache_path}. Error: {ex}"
+                    )
+                    self.connection = None
+                    self.is_cache_available = False
+            return self.connection
+
+    @staticmethod
+    def _get_cache_key(filepaths: List[str], piece_size: int) -> Optional[str]:
+        try:
+            files = [_get_file_identity(filepath) for filepath in filepaths]
+        except OSError:
+            return None
+        return hashlib.sha256(
+            json.dumps([files, piece_size]).encode()
+        ).hexdigest()
+
+    @staticmethod
+    def _get_pieces_count(filepaths: List[str], piece_size: int) -> int:
+        total_size = sum(os.path.getsize(filepath) for filepath in filepaths)
+        return -(-total_size // piece_size)
+
+    def get(self, *, filepaths: List[str], piece_size: int) -> Optional[bytes]:
+        """Returns the cached piece hashes of the files, if none of the files have changed since they were hashed"""
+        cache_key = self._get_cache_key(filepaths, piece_size)
+        if cache_key is None:
+            return None
+        with self.lock:
+            connection = self._get_connection()
+            if connection is None:
+                return None
+            row = connection.execute(
+                "SELECT pieces FROM piece_hashes WHERE cache_key = ?",
+                [cache_key],
+            ).fetchone()
+            if row is None:
+                return None
+            pieces = bytes(row[0])
+            if (
+                len(pieces)
+                != self._get_pieces_count(filepaths, piece_size)
+                * PIECE_HASH_LENGTH
+            ):
+                connection.execute(
+                    "DELETE FROM piece_hashes WHERE cache_key = ?", [cache_key]
+                )
+                return None
+            connection.execute(
+                "UPDATE piece_hashes SET last_used_at = ? WHERE cache_key = ?",
+                [time.time(), cache_key],
+            )
+        logging.info(
+            f"[GGBotPieceHashCache::get] Using cached hashes of {len(pieces) // PIECE_HASH_LENGTH} pieces of "
+            f"{piece_size} bytes"
+        )
+        return pieces
+
+    def put(
+        self, *, filepaths: List[str], piece_size: int, pieces: bytes
+    ) -> None:
+        cache_key = self._get_cache_key(filepaths, piece_size)
+        if cache_key is None:
+            return
+        with self.lock:
+            connection = self._get_connection()
+            if connection is None:
+                return
+            connection.execute(
+                "INSERT OR REPLACE INTO piece_hashes "
+                "(cache_key, files, piece_size, pieces, pieces_size, last_used_at) VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    cache_key,
+                    json.dumps([str(filepath) for filepath in filepaths]),
+                    piece_size,
+                    pieces,
+                    len(pieces),
+                    time.time(),
+                ],
+            )
+            self.evict()
+
+    def evict(self) -> int:
+        """Removes the least recently used pieces over the size limit"""
+        max_size = max(self.config.PIECE_HASH_CACHE_MAX_MB, 0) * BYTES_IN_MB
+        with self.lock:
+            connection = self._get_connection()
+            if connection is None:
+                return 0
+            evicted = connection.execute(
+                "DELETE FROM piece_hashes WHERE cache_key IN ("
+                "SELECT cache_key FROM ("
+                "SELECT cache_key, SUM(pieces_size) OVER (ORDER BY last_used_at DESC, rowid DESC) AS cached_size "
+                "FROM piece_hashes) WHERE cached_size > ?)",
+                [max_size],
+            ).rowcount
+        if evicted > 0:
+            logging.info(
+                f"[GGBotPieceHashCache::evict] Evicted the cached pieces of {evicted} torrents"
+            )
+        return evicted
+
+    def close(self) -> None:
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
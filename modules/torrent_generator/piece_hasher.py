@@ -0,0 +1,220 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import hashlib
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# files are read in blocks of at least this size (rounded up to a multiple of the piece size)
+MIN_READ_SIZE = 8 * 1024 * 1024
+# upper limit for the memory used by the pieces read, but not hashed yet
+MAX_BUFFERED_BYTES = 256 * 1024 * 1024
+# progress callback is invoked at most once in this many seconds (and always after the last piece)
+CALLBACK_INTERVAL_SECONDS = 0.5
+
+
+def _sha1(piece) -> bytes:
+    # hashlib releases the GIL while hashing large buffers, hence the pieces are hashed in parallel by threads
+    return hashlib.sha1(piece).digest()
+
+
+def _advise_sequential_read(file) -> None:
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+class GGBotPieceHasher:
+    """
+    Calculates the SHA-1 hashes of the pieces of a torrent.
+
+    Files are read sequentially (in the order of the torrent) with large reads, by a single thread, so that the disk
+    (or network storage) sees one sequential stream. The pieces read are hashed in parallel by `workers` threads.
+    Files are treated as one continuous stream, hence pieces spanning multiple files (season packs) are hashed from
+    the end of one file and the start of the next one.
+    When `extra_piece_sizes` are provided, the pieces of all the piece sizes are hashed from the same reads. Piece sizes
+    are powers of 2, hence the pieces of the smaller sizes are slices of the pieces of the largest size.
+    """
+
+    def __init__(
+        self,
+        *,
+        filepaths: List[str],
+        piece_size: int,
+        workers: int,
+        extra_piece_sizes: Sequence[int] = (),
+    ):
+        self.filepaths = [str(filepath) for filepath in filepaths]
+        self.piece_size = piece_size
+        self.piece_sizes = [piece_size] + [
+            size
+            for size in dict.fromkeys(extra_piece_sizes)
+            if size != piece_size
+        ]
+        # files are read in pieces of the largest size, which are then sliced into the pieces of every size
+        self.chunk_size = max(self.piece_sizes)
+        if any(self.chunk_size % size != 0 for size in self.piece_sizes):
+            raise ValueError(
+                f"Piece sizes {self.piece_sizes} must be powers of 2"
+            )
+        self.workers = max(workers, 1)
+        self.read_size = self.chunk_size * max(
+            1, -(-MIN_READ_SIZE // self.chunk_size)
+        )
+        pieces_per_chunk = sum(
+            self.chunk_size // size for size in self.piece_sizes
+        )
+        self.max_pieces_in_flight = pieces_per_chunk * max(
+            self.workers + 1,
+            min(self.workers * 4, MAX_BUFFERED_BYTES // self.chunk_size),
+        )
+
+    @property
+    def total_size(self) -> int:
+        return sum(os.path.getsize(filepath) for filepath in self.filepaths)
+
+    @property
+    def pieces_total(self) -> int:
+        return -(-self.total_size // self.piece_size)
+
+    def _iter_chunks(self) -> Iterator[Tuple[str, Any]]:
+        """Yields (file path, chunk) for every chunk, in order. The file path is the file in which the chunk ends"""
+        carry = bytearray()
+        for filepath in self.filepaths:
+            with open(filepath, "rb") as file:
+                _advise_sequential_read(file)
+                while True:
+                    block = file.read(self.read_size)
+                    if not block:
+                        break
+                    view = memoryview(block)
+                    if len(carry) > 0:
+                        # piece started in the previous block (or the previous file)
+                        needed = self.chunk_size - len(carry)
+                        carry += view[:needed]
+                        view = view[needed:]
+                        if len(carry) < self.chunk_size:
+                            continue
+                        yield filepath, bytes(carry)
+                        carry = bytearray()
+                    complete = len(view) - len(view) % self.chunk_size
+                    for offset in range(0, complete, self.chunk_size):
+                        yield filepath, view[offset : offset + self.chunk_size]
+                    carry += view[complete:]
+        if len(carry) > 0:
+            yield self.filepaths[-1], bytes(carry)
+
+    def _iter_pieces(self) -> Iterator[Tuple[str, int, Any]]:
+        """Yields (file path, piece size, piece) for the pieces of every piece size"""
+        for filepath, chunk in self._iter_chunks():
+            for piece_size in self.piece_sizes:
+                for offset in range(0, len(chunk), piece_size):
+                    yield filepath, piece_size, chunk[
+                        offset : offset + piece_size
+                    ]
+
+    def hash_pieces(
+        self, callback: Optional[Callable[[str, int, int], Any]] = None
+    ) -> Optional[bytes]:
+        """
+        Returns the concatenated piece hashes. `callback` is invoked with (file path, pieces done, pieces total) as
+        the hashing progresses. Returning anything other than None from the callback stops the hashing, in which
+        case None is returned.
+        """
+        hashes = self.hash_all_pieces(callback)
+        return None if hashes is None else hashes[self.piece_size]
+
+    def hash_all_pieces(
+        self, callback: Optional[Callable[[str, int, int], Any]] = None
+    ) -> Optional[Dict[int, bytes]]:
+        """
+        Returns the concatenated piece hashes of every piece size, keyed by the piece size.
+        The progress reported to the `callback` is that of `piece_size`.
+        """
+        start_time = time.perf_counter()
+        pieces_total = self.pieces_total
+        hashes: Dict[int, bytearray] = {
+            piece_size: bytearray() for piece_size in self.piece_sizes
+        }
+        in_flight = deque()
+        last_callback = 0.0
+
+        def _collect_next_hash() -> bool:
+            nonlocal last_callback
+            filepath, piece_size, future = in_flight.popleft()
+            hashes[piece_size].extend(future.result())
+            if piece_size != self.piece_size:
+                return False
+            pieces_done = len(hashes[self.piece_size]) // 20
+            now = time.monotonic()
+            if callback is None or (
+                now - last_callback < CALLBACK_INTERVAL_SECONDS
+                and pieces_done < pieces_total
+            ):
+                return False
+            last_callback = now
+            return callback(filepath, pieces_done, pieces_total) is not None
+
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="PieceHasher"
+        ) as executor:
+            stopped = False
+            for filepath, piece_size, piece in self._iter_pieces():
+                in_flight.append(
+                    (filepath, piece_size, executor.submit(_sha1, piece))
+                )
+                # hashes are collected in the order of the pieces, and the number of pieces read ahead is limited
+                while not stopped and (
+                    len(in_flight) >= self.max_pieces_in_flight
+                    or (len(in_flight) > 0 and in_flight[0][2].done())
+                ):
+                    stopped = _collect_next_hash()
+                if stopped:
+                    break
+            while not stopped and len(in_flight) > 0:
+                stopped = _collect_next_hash()
+            if stopped:
+                for _, _, future in in_flight:
+                    future.cancel()
+                logging.info(
+                    f"[GGBotPieceHasher] Hashing stopped after {len(hashes[self.piece_size]) // 20}/{pieces_total} "
+                    f"pieces"
+                )
+                return None
+
+        logging.info(
+            f"[GGBotPieceHasher] Hashed {pieces_total} pieces of piece sizes {self.piece_sizes} bytes with "
+            f"{self.workers} workers in {time.perf_counter() - start_time:.2f} seconds"
+        )
+        return {
+            piece_size: bytes(piece_hashes)
+            for piece_size, piece_hashes in hashes.items()
+        }
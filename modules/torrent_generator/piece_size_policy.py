@@ -0,0 +1,130 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+import math
+from typing import Dict, List, Optional, Sequence
+
+# piece sizes that GG-Bot can create torrents with (powers of 2 from 16 KiB to 32 MiB)
+MIN_PIECE_SIZE = 16 * 1024
+MAX_PIECE_SIZE = 32 * 1024 * 1024
+PIECE_SIZES = [
+    2**exponent
+    for exponent in range(
+        MIN_PIECE_SIZE.bit_length() - 1, MAX_PIECE_SIZE.bit_length()
+    )
+]
+
+
+class GGBotPieceSizePolicy:
+    """
+    Piece size constraints of a tracker, declared in the `torrent_piece_size` of the site template.
+        {"min": <bytes>, "max": <bytes>, "max_pieces": <number of pieces>}
+    All the constraints are optional. A tracker without constraints accepts any piece size.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_piece_size: Optional[int] = None,
+        max_piece_size: Optional[int] = None,
+        max_pieces: Optional[int] = None,
+    ):
+        self.min_piece_size = min_piece_size
+        self.max_piece_size = max_piece_size
+        self.max_pieces = max_pieces
+
+    @staticmethod
+    def from_template(config: Dict) -> "GGBotPieceSizePolicy":
+        constraints = config.get("torrent_piece_size", {})
+        return GGBotPieceSizePolicy(
+            min_piece_size=constraints.get("min"),
+            max_piece_size=constraints.get("max"),
+            max_pieces=constraints.get("max_pieces"),
+        )
+
+    def allows(self, piece_size: int, total_size: int) -> bool:
+        if self.min_piece_size is not None and piece_size < self.min_piece_size:
+            return False
+        if self.max_piece_size is not None and piece_size > self.max_piece_size:
+            return False
+        if (
+            self.max_pieces is not None
+            and math.ceil(total_size / piece_size) > self.max_pieces
+        ):
+            return False
+        return True
+
+    def __repr__(self):
+        return (
+            f"GGBotPieceSizePolicy(min={self.min_piece_size}, max={self.max_piece_size}, "
+            f"max_pieces={self.max_pieces})"
+        )
+
+
+def choose_piece_sizes(
+    *,
+    default_piece_size: int,
+    total_size: int,
+    policies: Sequence[GGBotPieceSizePolicy],
+) -> List[int]:
+    """
+    Returns the piece sizes to be hashed for the trackers. The first one is for `policies[0]`.
+
+    When there are piece sizes accepted by all the trackers, only the one closest to `default_piece_size` is returned.
+    Otherwise, the piece sizes are picked such that every tracker accepts at least one of them, preferring the ones
+    accepted by the most trackers and then the ones closest to `default_piece_size`.
+    """
+
+    def _distance(piece_size: int) -> float:
+        return abs(math.log2(piece_size) - math.log2(default_piece_size))
+
+    piece_sizes: List[int] = []
+    remaining = list(policies)
+    while len(remaining) > 0:
+        accepted = [
+            piece_size
+            for piece_size in PIECE_SIZES
+            if remaining[0].allows(piece_size, total_size)
+        ]
+        if len(accepted) == 0:
+            # the media cannot satisfy the constraints of this tracker
+            logging.error(
+                f"[GGBotPieceSizePolicy] No piece size satisfies {remaining[0]} for a torrent of {total_size} bytes. "
+                f"Using the default piece size {default_piece_size}"
+            )
+            accepted = [default_piece_size]
+        piece_size = max(
+            accepted,
+            key=lambda size: (
+                sum(policy.allows(size, total_size) for policy in remaining),
+                -_distance(size),
+                size,
+            ),
+        )
+        if piece_size not in piece_sizes:
+            piece_sizes.append(piece_size)
+        remaining = [
+            policy
+            for policy in remaining[1:]
+            if not policy.allows(piece_size, total_size)
+        ]
+    if len(piece_sizes) > 1:
+        logging.info(
+            f"[GGBotPieceSizePolicy] Piece size constraints of the trackers conflict. Piece sizes {piece_sizes} "
+            f"will be hashed"
+        )
+    return piece_sizes or [default_piece_size]
@@ -17,11 +17,15 @@
 import logging
 import math
 from functools import cached_property
-from typing import Callable
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
 
 from torf import Torrent
 
+from modules.config import UploaderConfig
 from modules.torrent_generator.generator_base import GGBotTorrentGeneratorBase
+from modules.torrent_generator.piece_hash_cache import GGBotPieceHashCache
+from modules.torrent_generator.piece_size_policy import GGBotPieceSizePolicy
 
 
 class GGBOTTorrent(Torrent):
@@ -38,6 +42,8 @@ class GGBotTorfTorrentGenerator(GGBotTorrentGeneratorBase):
         torrent_title,
         torrent_path_prefix,
         progress_callback: Callable,
+        piece_hash_cache: Optional[GGBotPieceHashCache] = None,
+        piece_size_policies: Sequence[GGBotPieceSizePolicy] = (),
     ):
         super().__init__(
             media=media,
@@ -45,6 +51,8 @@ class GGBotTorfTorrentGenerator(GGBotTorrentGeneratorBase):
             source=source,
             torrent_title=torrent_title,
             torrent_path_prefix=torrent_path_prefix,
+            piece_hash_cache=piece_hash_cache,
+            piece_size_policies=piece_size_policies,
         )
         self.torrent = GGBOTTorrent(
             path=self.media,
@@ -57,6 +65,9 @@ class GGBotTorfTorrentGenerator(GGBotTorrentGeneratorBase):
             creation_date=self.created_at,
         )
         self.progress_callback = progress_callback
+        self.hashing_engine = UploaderConfig().TORRENT_HASHING_ENGINE
+        # pieces of the other piece sizes, keyed by the piece size
+        self.extra_pieces: Dict[int, bytes] = {}
 
     @cached_property
     def size(self):
@@ -105,14 +116,86 @@ class GGBotTorfTorrentGenerator(GGBotTorrentGeneratorBase):
 
     def generate_torrent(self) -> None:
         print("Using python torf to generate the torrent")
+        piece_sizes = self.get_piece_sizes(self.torrent.piece_size)
+        self.torrent.piece_size = piece_sizes[0]
         logging.info(
             f"[GGBotTorfTorrentGenerator] Size of the torrent: {self.torrent.size}"
         )
         logging.info(
             f"[GGBotTorfTorrentGenerator] Piece Size of the torrent: {self.torrent.piece_size}"
         )
-        self.torrent.generate(callback=self.progress_callback)
+        if not self._generate_pieces(piece_sizes):
+            # hashing was stopped by the progress callback
+            logging.info(
+                "[GGBotTorfTorrentGenerator] Torrent generation stopped before all pieces were hashed"
+            )
+            return
         self.torrent.write(self.torrent_path)
+        self._write_extra_torrents()
+
+    def _progress_callback(self, filepath, pieces_done, pieces_total):
+        return self.progress_callback(
+            self.torrent, filepath, pieces_done, pieces_total
+        )
+
+    def _generate_pieces(self, piece_sizes: List[int]) -> bool:
+        filepaths = list(self.torrent.filepaths)
+        if self.hashing_engine == "torf":
+            if not self._generate_pieces_with_torf():
+                return False
+            # torf hashes only one piece size, hence the other piece sizes are hashed by GG-Bot
+            extra_piece_sizes = piece_sizes[1:]
+        else:
+            # torf decides the files (and their order), while the pieces are hashed by GG-Bot
+            extra_piece_sizes = piece_sizes
+        if len(extra_piece_sizes) == 0:
+            return True
+        hashes = self.hash_pieces_for_sizes(
+            filepaths=filepaths,
+            piece_sizes=extra_piece_sizes,
+            callback=self._progress_callback,
+        )
+        if hashes is None:
+            return False
+        if self.torrent.piece_size in hashes:
+            self.torrent.metainfo["info"]["pieces"] = hashes.pop(
+                self.torrent.piece_size
+            )
+        self.extra_pieces = hashes
+        return True
+
+    def _generate_pieces_with_torf(self) -> bool:
+        filepaths = list(self.torrent.filepaths)
+        piece_size = self.torrent.piece_size
+        pieces = self.get_cached_pieces(
+            filepaths=filepaths, piece_size=piece_size
+        )
+        if pieces is not None:
+            self.torrent.metainfo["info"]["pieces"] = pieces
+            return True
+        if not self.torrent.generate(
+            callback=self.progress_callback, threads=self.hash_workers
+        ):
+            return False
+        self.cache_pieces(
+            filepaths=filepaths,
+            piece_size=piece_size,
+            pieces=self.torrent.metainfo["info"]["pieces"],
+        )
+        return True
+
+    def _write_extra_torrents(self) -> None:
+        # torrents of the piece sizes required by the trackers whose constraints conflict with this torrent
+        for piece_size, pieces in self.extra_pieces.items():
+            extra_torrent = GGBOTTorrent.copy(self.torrent)
+            extra_torrent.metainfo["info"]["piece length"] = piece_size
+            extra_torrent.metainfo["info"]["pieces"] = pieces
+            extra_torrent_path = self.get_extra_torrent_path(piece_size)
+            Path(extra_torrent_path).parent.mkdir(exist_ok=True)
+            extra_torrent.write(extra_torrent_path, overwrite=True)
+            logging.info(
+                f"[GGBotTorfTorrentGenerator] Created torrent with piece size {piece_size} for the other trackers"
+            )
 
     def do_post_generation_task(self) -> None:
         self.torrent.verify_filesize(self.media)
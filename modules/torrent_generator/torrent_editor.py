@@ -16,7 +16,7 @@
 
 import glob
 import logging
-from typing import List
+from typing import List, Optional
 
 from modules.torrent_generator.torf_generator import GGBOTTorrent
 
@@ -26,11 +26,18 @@ class GGBotTorrentEditor:
         self.torrent_prefix = torrent_prefix
 
     def edit_torrent(
-        self, *, announce: List, tracker: str, source: str, torrent_title: str
+        self,
+        *,
+        announce: List,
+        tracker: str,
+        source: str,
+        torrent_title: str,
+        torrent_path: Optional[str] = None,
     ):
-        # just choose whichever, doesn't really matter since we replace the same info anyway
+        # when the torrent to be edited is not provided, just choose whichever. doesn't really matter since we replace
+        # the same info anyway
         edit_torrent = GGBOTTorrent.read(
-            glob.glob(f"{self.torrent_prefix}*.torrent")[0]
+            torrent_path or glob.glob(f"{self.torrent_prefix}*.torrent")[0]
         )
 
         if len(announce) == 1:
@@ -48,6 +55,7 @@ class GGBotTorrentEditor:
 
         edit_torrent.metainfo["announce"] = announce[0]
         edit_torrent.metainfo["info"]["source"] = source
+        edit_torrent.private = True
         # Edit the previous .torrent and save it as a new copy
         GGBOTTorrent.copy(edit_torrent).write(
             filepath=f"{self.torrent_prefix}{tracker}-{torrent_title}.torrent",
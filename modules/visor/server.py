@@ -23,7 +23,7 @@ from threading import Thread
 from flask import Flask, request
 
 from modules.cache import CacheFactory, CacheVendor
-from modules.config import VisorConfig
+from modules.config import VisorConfig, CacheConfig
 from modules.visor.schema import GGBotTorrentSchema
 from utilities.utils_visor_server import (
     VisorServerManager,
@@ -149,6 +149,13 @@ class Server:
             methods=["POST"],
         )
 
+        # usage statistics of the indexes in cache
+        self.add_endpoint(
+            endpoint="/cache/indexes",
+            endpoint_name="Cache Index Usage",
+            handler=self.cache_index_usage,
+        )
+
     def run(self, host, port, threaded=False, use_reloader=False, debug=False):
         print(
             f" * Visor server started and listening for connection on {host}:{port}"
@@ -201,6 +208,11 @@ class Server:
     def torrent_statistics(self):  # YES
         return self.visor_server_manager.get_torrent_statistics()
 
+    @api_required
+    @gg_bot_response
+    def cache_index_usage(self):
+        return self.visor_server_manager.get_cache_index_usage()
+
     @api_required
     @gg_bot_response
     def failed_torrents_statistics(self):  # YES
@@ -291,4 +303,8 @@ class Server:
 
 
 if __name__ == "__main__":
-    Server(cache=CacheFactory().create(cache_type=CacheVendor.Mongo)).start()
+    Server(
+        cache=CacheFactory().create(
+            cache_type=CacheVendor[CacheConfig().CACHE_TYPE]
+        )
+    ).start()
@@ -0,0 +1,265 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import datetime
+
+import mongomock
+import pytest
+from pymongo.errors import OperationFailure
+
+from modules.cache import CacheFactory, CacheVendor
+from modules.exceptions.exception import GGBotCacheClientException
+
+
+class TestMongoCache:
+    @pytest.fixture()
+    def cache(self, mocker):
+        mocker.patch(
+            "modules.cache_vendors.cache_mongo.Mongo._get_mongo_client",
+            return_value=mongomock.MongoClient(),
+        )
+        cache = CacheFactory().create(CacheVendor.Mongo)
+        for info_hash, status in [
+            ("hash1", "SUCCESS"),
+            ("hash2", "PENDING"),
+            ("hash3", "FAILED"),
+        ]:
+            cache.save(
+                f"ReUpload::Torrent::{info_hash}",
+                {
+                    "hash": info_hash,
+                    "status": status,
+                    "torrent": "{}",
+                    "upload_attempt": 1,
+                },
+            )
+        yield cache
+
+    def test_get_by_hashes(self, cache):
+        documents = cache.get_by_hashes(
+            "ReUpload::Torrent", ["hash1", "hash3", "hash4"]
+        )
+        assert sorted(document["hash"] for document in documents) == [
+            "hash1",
+            "hash3",
+        ]
+        assert all("torrent" in document for document in documents)
+
+    def test_get_by_hashes_with_projection(self, cache):
+        documents = cache.get_by_hashes(
+            "ReUpload::Torrent", ["hash1", "hash2"], fields=["hash", "status"]
+        )
+        assert sorted(
+            (document["hash"], document["status"]) for document in documents
+        ) == [("hash1", "SUCCESS"), ("hash2", "PENDING")]
+        assert all(
+            set(document.keys()) == {"_id", "hash", "status"}
+            for document in documents
+        )
+
+    def test_update_fields(self, cache):
+        assert (
+            cache.update_fields(
+                "ReUpload::Torrent::hash2",
+                {"status": "SUCCESS", "movie_db": "{}"},
+            )
+            == True
+        )
+        document = cache.get("ReUpload::Torrent::hash2")[0]
+        assert document["status"] == "SUCCESS"
+        assert document["movie_db"] == "{}"
+        # fields that were not provided are left untouched
+        assert document["torrent"] == "{}"
+        assert document["upload_attempt"] == 1
+
+    def test_update_fields_for_missing_document(self, cache):
+        assert (
+            cache.update_fields("ReUpload::Torrent::hash4", {"status": "A"})
+            == False
+        )
+
+    def test_update_fields_without_hash(self, cache):
+        with pytest.raises(GGBotCacheClientException):
+            cache.update_fields("ReUpload::Torrent", {"status": "SUCCESS"})
+
+    def test_increment(self, cache):
+        assert (
+            cache.increment("ReUpload::Torrent::hash1", "upload_attempt") == 2
+        )
+        assert (
+            cache.increment("ReUpload::Torrent::hash1", "upload_attempt", 3)
+            == 5
+        )
+        assert (
+            cache.increment("ReUpload::Torrent::hash4", "upload_attempt")
+            is None
+        )
+
+    @pytest.mark.parametrize(
+        ("info_hash", "statuses", "expected", "expected_status"),
+        [
+            pytest.param(
+                "hash2",
+                ["PENDING", "READY_FOR_PROCESSING"],
+                True,
+                "SUCCESS",
+                id="status_matches",
+            ),
+            pytest.param(
+                "hash3",
+                ["PENDING", "READY_FOR_PROCESSING"],
+                False,
+                "FAILED",
+                id="status_does_not_match",
+            ),
+        ],
+    )
+    def test_set_if_status(
+        self, info_hash, statuses, expected, expected_status, cache
+    ):
+        assert (
+            cache.set_if_status(
+                f"ReUpload::Torrent::{info_hash}",
+                statuses,
+                {"status": "SUCCESS"},
+            )
+            == expected
+        )
+        assert (
+            cache.get(f"ReUpload::Torrent::{info_hash}")[0]["status"]
+            == expected_status
+        )
+
+    def test_update_fields_if(self, cache):
+        condition = {
+            "status": "PENDING",
+            "$or": [{"lease_owner": None}, {"lease_owner": "instance1"}],
+        }
+        document = cache.update_fields_if(
+            "ReUpload::Torrent::hash2", condition, {"lease_owner": "instance1"}
+        )
+        assert document["lease_owner"] == "instance1"
+        assert document["torrent"] == "{}"
+        # lease held by instance1 cannot be taken by another instance
+        assert (
+            cache.update_fields_if(
+                "ReUpload::Torrent::hash2",
+                {"lease_owner": None},
+                {"lease_owner": "instance2"},
+            )
+            is None
+        )
+        # condition doesn't match the status of the document
+        assert (
+            cache.update_fields_if(
+                "ReUpload::Torrent::hash3", condition, {"lease_owner": "a"}
+            )
+            is None
+        )
+        assert (
+            cache.get("ReUpload::Torrent::hash2")[0]["lease_owner"]
+            == "instance1"
+        )
+
+    def test_insert_if_absent(self, cache):
+        data = {"hash": "hash4", "status": "PENDING"}
+        assert cache.insert_if_absent("ReUpload::Torrent::hash4", data) == True
+        assert data["_id"] is not None
+        assert (
+            cache.insert_if_absent(
+                "ReUpload::Torrent::hash4", {"hash": "hash4", "status": "A"}
+            )
+            == False
+        )
+        assert (
+            cache.insert_if_absent(
+                "ReUpload::Torrent::hash1", {"hash": "hash1", "status": "A"}
+            )
+            == False
+        )
+        assert cache.get("ReUpload::Torrent::hash4")[0]["status"] == "PENDING"
+        assert cache.get("ReUpload::Torrent::hash1")[0]["status"] == "SUCCESS"
+
+    def test_indexes_created_on_startup(self, cache):
+        indexes = cache.cache_client.database[
+            "ReUpload_Torrent"
+        ].index_information()
+        assert indexes["hash_unique"]["unique"] == True
+        assert indexes["hash_unique"]["key"] == [("hash", 1)]
+        assert indexes["status_date_created"]["key"] == [
+            ("status", 1),
+            ("date_created", -1),
+        ]
+        assert (
+            "type_title_year"
+            in cache.cache_client.database["MetaData_TMDB"].index_information()
+        )
+        assert (
+            "hash_tracker"
+            in cache.cache_client.database[
+                "ReUpload_JobRepository"
+            ].index_information()
+        )
+
+    def test_unique_index_failure_is_not_fatal(self, mocker):
+        mongo_client = mongomock.MongoClient()
+        for _ in range(2):
+            mongo_client["gg-bot-auto-uploader"]["ReUpload_Torrent"].insert_one(
+                {"hash": "duplicate"}
+            )
+        mocker.patch(
+            "modules.cache_vendors.cache_mongo.Mongo._get_mongo_client",
+            return_value=mongo_client,
+        )
+        cache = CacheFactory().create(CacheVendor.Mongo)
+
+        indexes = cache.cache_client.database[
+            "ReUpload_Torrent"
+        ].index_information()
+        assert "hash_unique" not in indexes
+        assert "status_id" in indexes
+
+    def test_index_usage(self, cache, mocker):
+        since = datetime.datetime(2022, 1, 1)
+        mocker.patch(
+            "mongomock.collection.Collection.aggregate",
+            return_value=[
+                {
+                    "name": "hash_unique",
+                    "key": {"hash": 1},
+                    "accesses": {"ops": 10, "since": since},
+                }
+            ],
+        )
+        usage = cache.index_usage()
+        assert usage["ReUpload_Torrent"] == [
+            {
+                "name": "hash_unique",
+                "key": {"hash": 1},
+                "ops": 10,
+                "since": since.isoformat(),
+            }
+        ]
+
+    def test_index_usage_not_supported(self, cache, mocker):
+        mocker.patch(
+            "mongomock.collection.Collection.aggregate",
+            side_effect=OperationFailure("$indexStats not supported"),
+        )
+        usage = cache.index_usage()
+        assert {"name": "hash_unique", "key": {"hash": 1}} in usage[
+            "ReUpload_Torrent"
+        ]
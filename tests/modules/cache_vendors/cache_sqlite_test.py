@@ -0,0 +1,295 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pytest
+
+from modules.cache import CacheFactory, CacheVendor
+from modules.exceptions.exception import GGBotCacheClientException
+
+
+class TestSqliteCache:
+    @pytest.fixture()
+    def database_path(self, tmp_path, monkeypatch):
+        database_path = f"{tmp_path}/cache/reuploader.cache.sqlite"
+        monkeypatch.setenv("cache_path", database_path)
+        yield database_path
+
+    @pytest.fixture()
+    def cache(self, database_path):
+        cache = CacheFactory().create(CacheVendor.Sqlite)
+        for index, (info_hash, status) in enumerate(
+            [
+                ("hash1", "SUCCESS"),
+                ("hash2", "PENDING"),
+                ("hash3", "FAILED"),
+                ("abcd4", "FAILED"),
+            ]
+        ):
+            cache.save(
+                f"ReUpload::Torrent::{info_hash}",
+                {
+                    "id": f"id{index}",
+                    "hash": info_hash,
+                    "name": f"name{index}",
+                    "status": status,
+                    "torrent": "{}",
+                    "upload_attempt": index,
+                    "date_created": f"2022-01-0{index + 1}T00:00:00",
+                },
+            )
+        yield cache
+        if cache.cache_client.is_sqlite_initialized:
+            cache.close()
+
+    def test_hello(self, cache):
+        assert cache.hello() == True
+
+    def test_save_adds_id(self, cache):
+        data = {"hash": "hash5", "status": "PENDING"}
+        cache.save("ReUpload::Torrent", data)
+        assert "_id" in data
+        assert cache.get("ReUpload::Torrent::hash5") == [data]
+
+    def test_save_replaces_document_with_id(self, cache):
+        document = cache.get("ReUpload::Torrent::hash2")[0]
+        document["status"] = "SUCCESS"
+        document.pop("torrent")
+        cache.save("ReUpload::Torrent", document)
+
+        assert cache.get("ReUpload::Torrent::hash2") == [document]
+        assert cache.count("ReUpload::Torrent") == 4
+
+    def test_data_persisted_across_connections(self, cache):
+        cache.close()
+        new_cache = CacheFactory().create(CacheVendor.Sqlite)
+        assert new_cache.count("ReUpload::Torrent") == 4
+        assert (
+            new_cache.get("ReUpload::Torrent::hash1")[0]["status"] == "SUCCESS"
+        )
+        new_cache.close()
+
+    @pytest.mark.parametrize(
+        ("filter", "expected"),
+        [
+            pytest.param(None, ["hash1", "hash2", "hash3", "abcd4"], id="all"),
+            pytest.param({"status": "FAILED"}, ["hash3", "abcd4"], id="eq"),
+            pytest.param(
+                {"status": {"$in": ["SUCCESS", "PENDING"]}},
+                ["hash1", "hash2"],
+                id="in",
+            ),
+            pytest.param(
+                {"status": {"$nin": ["SUCCESS", "PENDING"]}},
+                ["hash3", "abcd4"],
+                id="not_in",
+            ),
+            pytest.param(
+                {"status": {"$ne": "FAILED"}}, ["hash1", "hash2"], id="ne"
+            ),
+            pytest.param({"hash": {"$regex": "^abc"}}, ["abcd4"], id="regex"),
+            pytest.param({"id": "id1"}, ["hash2"], id="indexed_column"),
+            pytest.param(
+                {"upload_attempt": {"$gte": 2}},
+                ["hash3", "abcd4"],
+                id="json_field_comparison",
+            ),
+            pytest.param(
+                {"name": "name0"}, ["hash1"], id="json_field_equality"
+            ),
+            pytest.param(
+                {"movie_db": {"$exists": False}},
+                ["hash1", "hash2", "hash3", "abcd4"],
+                id="exists",
+            ),
+            pytest.param(
+                {
+                    "$or": [
+                        {"$and": [{"status": "FAILED"}, {"name": "name2"}]},
+                        {"$and": [{"status": "SUCCESS"}]},
+                    ]
+                },
+                ["hash1", "hash3"],
+                id="or_and",
+            ),
+        ],
+    )
+    def test_get_with_filter(self, filter, expected, cache):
+        assert [
+            document["hash"]
+            for document in cache.get("ReUpload::Torrent", filter)
+        ] == expected
+        assert cache.count("ReUpload::Torrent", filter) == len(expected)
+
+    def test_get_with_unsupported_operator(self, cache):
+        with pytest.raises(GGBotCacheClientException):
+            cache.get("ReUpload::Torrent", {"status": {"$elemMatch": {}}})
+
+    def test_advanced_get(self, cache):
+        assert [
+            document["hash"]
+            for document in cache.advanced_get(
+                "ReUpload::Torrent", 3, 1, "date_created"
+            )
+        ] == ["abcd4", "hash3", "hash2"]
+        assert [
+            document["hash"]
+            for document in cache.advanced_get(
+                "ReUpload::Torrent", 3, 2, "date_created"
+            )
+        ] == ["hash1"]
+        assert [
+            document["hash"]
+            for document in cache.advanced_get(
+                "ReUpload::Torrent", 10, 1, "name", {"status": "FAILED"}
+            )
+        ] == ["abcd4", "hash3"]
+
+    def test_delete(self, cache):
+        assert cache.delete("ReUpload::Torrent::hash1") == 1
+        assert cache.delete("ReUpload::Torrent", {"status": "FAILED"}) == 2
+        assert [
+            document["hash"] for document in cache.get("ReUpload::Torrent")
+        ] == ["hash2"]
+        with pytest.raises(Exception):
+            cache.delete("ReUpload::Torrent")
+
+    def test_get_by_hashes_with_projection(self, cache):
+        documents = cache.get_by_hashes(
+            "ReUpload::Torrent", ["hash1", "hash3", "hash9"], ["hash", "status"]
+        )
+        assert [
+            {key: value for key, value in document.items() if key != "_id"}
+            for document in documents
+        ] == [
+            {"hash": "hash1", "status": "SUCCESS"},
+            {"hash": "hash3", "status": "FAILED"},
+        ]
+
+    def test_update_fields(self, cache):
+        assert (
+            cache.update_fields(
+                "ReUpload::Torrent::hash2", {"status": "SUCCESS"}
+            )
+            == True
+        )
+        assert cache.count("ReUpload::Torrent", {"status": "SUCCESS"}) == 2
+        document = cache.get("ReUpload::Torrent::hash2")[0]
+        assert document["status"] == "SUCCESS"
+        assert document["torrent"] == "{}"
+        assert (
+            cache.update_fields("ReUpload::Torrent::hash9", {"status": "A"})
+            == False
+        )
+
+    def test_increment(self, cache):
+        assert (
+            cache.increment("ReUpload::Torrent::hash2", "upload_attempt") == 2
+        )
+        assert (
+            cache.increment("ReUpload::Torrent::hash9", "upload_attempt")
+            is None
+        )
+
+    def test_set_if_status(self, cache):
+        assert (
+            cache.set_if_status(
+                "ReUpload::Torrent::hash2", ["PENDING"], {"status": "SUCCESS"}
+            )
+            == True
+        )
+        assert (
+            cache.set_if_status(
+                "ReUpload::Torrent::hash3", ["PENDING"], {"status": "SUCCESS"}
+            )
+            == False
+        )
+        assert cache.get("ReUpload::Torrent::hash3")[0]["status"] == "FAILED"
+
+    def test_update_fields_if(self, cache):
+        condition = {
+            "status": "PENDING",
+            "$or": [{"lease_owner": None}, {"lease_owner": "instance1"}],
+        }
+        document = cache.update_fields_if(
+            "ReUpload::Torrent::hash2", condition, {"lease_owner": "instance1"}
+        )
+        assert document["lease_owner"] == "instance1"
+        assert document["torrent"] == "{}"
+        # lease held by instance1 cannot be taken by another instance
+        assert (
+            cache.update_fields_if(
+                "ReUpload::Torrent::hash2",
+                {"lease_owner": None},
+                {"lease_owner": "instance2"},
+            )
+            is None
+        )
+        # condition doesn't match the status of the document
+        assert (
+            cache.update_fields_if(
+                "ReUpload::Torrent::hash3", condition, {"lease_owner": "a"}
+            )
+            is None
+        )
+        assert (
+            cache.get("ReUpload::Torrent::hash2")[0]["lease_owner"]
+            == "instance1"
+        )
+
+    def test_insert_if_absent(self, cache):
+        data = {"hash": "hash4", "status": "PENDING"}
+        assert cache.insert_if_absent("ReUpload::Torrent::hash4", data) == True
+        assert data["_id"] is not None
+        assert (
+            cache.insert_if_absent(
+                "ReUpload::Torrent::hash4", {"hash": "hash4", "status": "A"}
+            )
+            == False
+        )
+        assert (
+            cache.insert_if_absent(
+                "ReUpload::Torrent::hash1", {"hash": "hash1", "status": "A"}
+            )
+            == False
+        )
+        assert cache.get("ReUpload::Torrent::hash4")[0]["status"] == "PENDING"
+        assert cache.get("ReUpload::Torrent::hash1")[0]["status"] == "SUCCESS"
+
+    def test_indexes_used_for_queries(self, cache):
+        usage = cache.index_usage()
+        assert "ReUpload_Torrent_hash_unique" in [
+            index["name"] for index in usage["ReUpload_Torrent"]
+        ]
+        assert "MetaData_TMDB_type_title_year" in [
+            index["name"] for index in usage["MetaData_TMDB"]
+        ]
+        query_plan = cache.cache_client.connection.execute(
+            'EXPLAIN QUERY PLAN SELECT _id FROM "ReUpload_Torrent" WHERE hash IN (?, ?)',
+            ["hash1", "hash2"],
+        ).fetchall()
+        assert "hash_unique" in " ".join(row["detail"] for row in query_plan)
+
+    def test_duplicate_hash_not_allowed(self, cache):
+        with pytest.raises(Exception):
+            cache.save("ReUpload::Torrent", {"hash": "hash1"})
+
+    def test_wal_mode(self, cache):
+        assert (
+            cache.cache_client.connection.execute(
+                "PRAGMA journal_mode"
+            ).fetchone()[0]
+            == "wal"
+        )
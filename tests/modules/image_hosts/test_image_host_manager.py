@@ -1,3 +1,5 @@
+import threading
+import time
 from unittest import mock
 
 import pytest
@@ -73,3 +75,213 @@ class TestGGBotImageHostManager:
             ""
         )
         assert status.status
+
+    def test_upload_all_screenshots_preserves_order(
+        self, image_host_manager, mocker
+    ):
+        def _upload(image_path):
+            # first screenshot completes last
+            if image_path == "first.png":
+                time.sleep(0.1)
+            return GGBotImageUploadStatus(status=True, image_url=image_path)
+
+        mocker.patch.object(
+            image_host_manager,
+            "_upload_screenshot_to_image_host",
+            side_effect=lambda image_host, image_path: _upload(image_path),
+        )
+        statuses = image_host_manager.upload_all_screenshots(
+            ["first.png", "second.png", "third.png"]
+        )
+        assert [status.image_url for status in statuses] == [
+            "first.png",
+            "second.png",
+            "third.png",
+        ]
+
+    def test_upload_all_screenshots_falls_back_per_image(
+        self, image_host_manager, mocker
+    ):
+        def _create_uploader(*, image_host, image_path):
+            uploader = mocker.MagicMock()
+            uploader.supports_batch_upload = False
+            # ptpimg fails only for the second screenshot
+            uploader.status = GGBotImageUploadStatus(
+                status=image_host != "ptpimg" or image_path != "second.png",
+                image_url=f"{image_host}/{image_path}",
+            )
+            return uploader
+
+        mocker.patch.object(
+            image_host_manager,
+            "_create_image_host_uploader",
+            side_effect=_create_uploader,
+        )
+        statuses = image_host_manager.upload_all_screenshots(
+            ["first.png", "second.png", "third.png"]
+        )
+        assert [status.image_url for status in statuses] == [
+            "ptpimg/first.png",
+            "imgbox/second.png",
+            "ptpimg/third.png",
+        ]
+
+    def test_screenshots_prepared_for_each_image_host(
+        self, image_host_manager, mocker
+    ):
+        uploaded_images = []
+
+        def _create_uploader(*, image_host, image_path):
+            uploaded_images.append((image_host, image_path))
+            uploader = mocker.MagicMock()
+            uploader.supports_batch_upload = False
+            uploader.status = GGBotImageUploadStatus(
+                status=image_host == "imgbox",
+                image_url=f"{image_host}/{image_path}",
+            )
+            return uploader
+
+        mocker.patch.object(
+            image_host_manager,
+            "_create_image_host_uploader",
+            side_effect=_create_uploader,
+        )
+        statuses = image_host_manager.upload_all_screenshots(
+            ["large.png"],
+            prepare_for_image_host=lambda image_host, image_paths: [
+                path.replace(".png", ".jpg") if image_host == "imgbox" else path
+                for path in image_paths
+            ],
+        )
+        assert list(dict.fromkeys(uploaded_images)) == [
+            ("ptpimg", "large.png"),
+            ("imgbox", "large.jpg"),
+        ]
+        assert statuses[0].image_url == "imgbox/large.jpg"
+
+    def test_concurrent_uploads_limited_per_host(self, mocker):
+        mocker.patch(
+            "os.getenv",
+            side_effect=lambda key, default=None: {
+                "img_host_1": "ptpimg",
+                "ptpimg_api_key": "API_KEY",
+                "ptpimg_max_concurrent_uploads": "2",
+                "screenshot_upload_workers": "6",
+            }.get(key, default),
+        )
+        image_host_manager = GGBotImageHostManager("torrent_title")
+        lock = threading.Lock()
+        uploads_in_progress = []
+        max_uploads_in_progress = []
+
+        def _upload():
+            with lock:
+                uploads_in_progress.append(1)
+                max_uploads_in_progress.append(len(uploads_in_progress))
+            time.sleep(0.05)
+            with lock:
+                uploads_in_progress.pop()
+
+        uploader = mocker.MagicMock()
+        uploader.supports_batch_upload = False
+        uploader.upload.side_effect = _upload
+        uploader.status = GGBotImageUploadStatus(status=True)
+        mocker.patch.object(
+            image_host_manager,
+            "_create_image_host_uploader",
+            return_value=uploader,
+        )
+        statuses = image_host_manager.upload_all_screenshots(
+            [f"{index}.png" for index in range(6)]
+        )
+        assert all(status.status for status in statuses)
+        assert uploader.upload.call_count == 6
+        assert max(max_uploads_in_progress) == 2
+
+    def test_batch_upload_used_when_supported(self, image_host_manager, mocker):
+        mocker.patch("modules.image_hosts.vendor.ptpimg.PTPImgImageHost.upload")
+        upload_batch = mocker.patch(
+            "modules.image_hosts.vendor.imgbox.ImgboxImageHost.upload_batch",
+            return_value=[
+                GGBotImageUploadStatus(status=True, image_url="imgbox/1"),
+                GGBotImageUploadStatus(status=False),
+            ],
+        )
+
+        def _freeimage_upload(uploader):
+            uploader.upload_status = GGBotImageUploadStatus(
+                status=True, image_url=f"freeimage/{uploader.image_path}"
+            )
+
+        mocker.patch(
+            "modules.image_hosts.vendor.chevereto.freeimage.FreeImageImageHost.upload",
+            autospec=True,
+            side_effect=_freeimage_upload,
+        )
+        statuses = image_host_manager.upload_all_screenshots(["1.png", "2.png"])
+        # all the screenshots that failed with ptpimg are sent to imgbox together
+        upload_batch.assert_called_once_with(["1.png", "2.png"])
+        # only the screenshot that failed with imgbox is sent to the next host
+        assert [status.image_url for status in statuses] == [
+            "imgbox/1",
+            "freeimage/2.png",
+        ]
+
+    def test_previously_uploaded_screenshots_are_not_uploaded(
+        self, torrent_title, mocker
+    ):
+        mocker.patch("os.getenv", side_effect=_image_host_env_side_effects)
+        upload_cache = mocker.MagicMock()
+        upload_cache.get.side_effect = lambda image_path, image_host: (
+            GGBotImageUploadStatus(status=True, image_url="cached/1")
+            if image_path == "1.png" and image_host == "imgbox"
+            else None
+        )
+        image_host_manager = GGBotImageHostManager(
+            torrent_title, upload_cache=upload_cache
+        )
+        uploaded = GGBotImageUploadStatus(status=True, image_url="ptpimg/2")
+        upload = mocker.patch.object(
+            image_host_manager,
+            "_upload_screenshot_to_image_host",
+            return_value=uploaded,
+        )
+        statuses = image_host_manager.upload_all_screenshots(["1.png", "2.png"])
+        assert [status.image_url for status in statuses] == [
+            "cached/1",
+            "ptpimg/2",
+        ]
+        upload.assert_called_once_with(image_host="ptpimg", image_path="2.png")
+        upload_cache.put.assert_called_once_with("2.png", "ptpimg", uploaded)
+
+    def test_adaptive_ordering_of_image_hosts(self, torrent_title, mocker):
+        mocker.patch("os.getenv", side_effect=_image_host_env_side_effects)
+        host_stats = mocker.MagicMock()
+        host_stats.order.return_value = ["freeimage", "ptpimg", "imgbox"]
+        image_host_manager = GGBotImageHostManager(
+            torrent_title, host_stats=host_stats
+        )
+
+        def _create_uploader(*, image_host, image_path):
+            uploader = mocker.MagicMock()
+            uploader.supports_batch_upload = False
+            uploader.size_rejected_images = (
+                {image_path} if image_host == "freeimage" else set()
+            )
+            uploader.status = GGBotImageUploadStatus(
+                status=image_host != "freeimage",
+                image_url=f"{image_host}/{image_path}",
+            )
+            return uploader
+
+        mocker.patch.object(
+            image_host_manager,
+            "_create_image_host_uploader",
+            side_effect=_create_uploader,
+        )
+        status = image_host_manager.upload_screenshots("1.png")
+        assert status.image_url == "ptpimg/1.png"
+        assert [
+            (call.args[0], call.kwargs["success"], call.kwargs["size_rejected"])
+            for call in host_stats.record_upload.call_args_list
+        ] == [("freeimage", False, True), ("ptpimg", True, False)]
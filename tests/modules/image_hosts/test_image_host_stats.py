@@ -0,0 +1,112 @@
+import pytest
+
+from modules.image_hosts.image_host_stats import GGBotImageHostStats
+
+
+def _stats_env_side_effects(param, default=None):
+    if param == "image_host_circuit_breaker_failures":
+        return "2"
+    if param == "image_host_reprobe_seconds":
+        return "60"
+    return default
+
+
+class TestGGBotImageHostStats:
+    @pytest.fixture
+    def current_time(self, mocker):
+        current_time = mocker.patch("time.time", return_value=1000.0)
+        yield current_time
+
+    @pytest.fixture
+    def host_stats(self, tmp_path, mocker, current_time):
+        mocker.patch("os.getenv", side_effect=_stats_env_side_effects)
+        host_stats = GGBotImageHostStats(str(tmp_path / "stats.sqlite"))
+        yield host_stats
+        host_stats.close()
+
+    def test_configured_order_without_measurements(self, host_stats):
+        assert host_stats.order(["ptpimg", "imgbox", "freeimage"]) == [
+            "ptpimg",
+            "imgbox",
+            "freeimage",
+        ]
+
+    def test_faster_host_is_preferred(self, host_stats):
+        host_stats.record_upload("ptpimg", success=True, latency=4.0)
+        host_stats.record_upload("imgbox", success=True, latency=1.0)
+        assert host_stats.order(["ptpimg", "imgbox"]) == ["imgbox", "ptpimg"]
+
+    def test_unreliable_host_is_demoted(self, host_stats):
+        host_stats.record_upload("ptpimg", success=True, latency=1.0)
+        host_stats.record_upload("ptpimg", success=False, latency=1.0)
+        host_stats.record_upload("imgbox", success=True, latency=1.3)
+        # ptpimg is faster, but fails often enough to be slower on average
+        assert host_stats.order(["ptpimg", "imgbox"]) == ["imgbox", "ptpimg"]
+
+    def test_hosts_without_successful_uploads_are_ranked_last(self, host_stats):
+        for _ in range(3):
+            host_stats.record_upload("good", success=True, latency=5.0)
+        # failures below the circuit breaker threshold
+        host_stats.record_upload("bad", success=False, latency=1.0)
+        for _ in range(5):
+            host_stats.record_upload(
+                "big", success=False, latency=1.0, size_rejected=True
+            )
+        assert host_stats.is_circuit_open("bad") is False
+        assert host_stats.is_circuit_open("big") is False
+        assert host_stats.order(["bad", "big", "good", "new"]) == [
+            "new",
+            "good",
+            "bad",
+            "big",
+        ]
+
+    def test_circuit_opens_after_consecutive_failures(
+        self, host_stats, current_time
+    ):
+        host_stats.record_upload("ptpimg", success=False, latency=1.0)
+        assert host_stats.is_circuit_open("ptpimg") is False
+        host_stats.record_upload("ptpimg", success=False, latency=1.0)
+        assert host_stats.is_circuit_open("ptpimg") is True
+        # demoted host is still available as the last resort
+        assert host_stats.order(["ptpimg", "imgbox"]) == ["imgbox", "ptpimg"]
+
+        # host is probed again once the reprobe time has elapsed
+        current_time.return_value = 1061.0
+        assert host_stats.is_circuit_open("ptpimg") is False
+        # failed probe opens the circuit for twice the duration
+        host_stats.record_upload("ptpimg", success=False, latency=1.0)
+        assert host_stats.get("ptpimg")["circuit_open_until"] == 1181.0
+
+        # successful probe restores the host
+        current_time.return_value = 1200.0
+        host_stats.record_upload("ptpimg", success=True, latency=1.0)
+        assert host_stats.is_circuit_open("ptpimg") is False
+        assert host_stats.get("ptpimg")["circuit_opens"] == 0
+
+    def test_size_rejections_does_not_open_circuit(self, host_stats):
+        for _ in range(3):
+            host_stats.record_upload(
+                "imgbox", success=False, latency=1.0, size_rejected=True
+            )
+        assert host_stats.is_circuit_open("imgbox") is False
+        assert host_stats.get("imgbox")["size_rejections"] == 3
+        assert host_stats.get("imgbox")["failures"] == 3
+
+    def test_stats_are_persisted(self, host_stats, tmp_path):
+        host_stats.record_upload("ptpimg", success=True, latency=2.0)
+        host_stats.record_upload("ptpimg", success=False, latency=9.0)
+        stats = GGBotImageHostStats(str(tmp_path / "stats.sqlite"))
+        assert stats.get("ptpimg")["uploads"] == 2
+        assert stats.get("ptpimg")["failures"] == 1
+        # latency of failed uploads are not considered
+        assert stats.get("ptpimg")["latency_ewma"] == 2.0
+        stats.close()
+
+    def test_stats_without_database(self, tmp_path, current_time):
+        host_stats = GGBotImageHostStats(
+            str(tmp_path / "missing" / "stats.sqlite")
+        )
+        host_stats.record_upload("ptpimg", success=True, latency=2.0)
+        assert host_stats.is_stats_available is False
+        assert host_stats.get("ptpimg")["uploads"] == 1
@@ -0,0 +1,191 @@
+import pytest
+
+from modules.image_hosts.image_host_session import GGBotImageHostSessions
+from modules.image_hosts.image_upload_status import GGBotImageUploadStatus
+from modules.image_hosts.vendor.chevereto.imgbb import ImgbbImageHost
+from modules.image_hosts.vendor.imgbox import ImgboxImageHost
+from modules.image_hosts.vendor.imgur import ImgurImageHost
+from modules.image_hosts.vendor.pixhost import PixhostImageHost
+from modules.image_hosts.vendor.ptpimg import PTPImgImageHost
+
+
+def _image_host_env_side_effects(param, default=None):
+    if param == "imgbb_api_key":
+        return "IMGBB_API_KEY"
+    if param == "imgbb_max_concurrent_uploads":
+        return "2"
+    if param == "imgur_client_id":
+        return "IMGUR_CLIENT_ID"
+    return default
+
+
+class TestImageHostBatchUpload:
+    @pytest.fixture
+    def screenshots(self, tmp_path):
+        screenshots = []
+        for name in ["first.png", "second.png", "third.png"]:
+            screenshot = tmp_path / name
+            screenshot.write_bytes(b"PNG")
+            screenshots.append(str(screenshot))
+        yield screenshots
+
+    def test_imgbox_uploads_to_single_gallery(self, screenshots, mocker):
+        async def _imgbox_upload(_, filepaths):
+            # second screenshot failed to upload
+            return {
+                filepath: GGBotImageUploadStatus(
+                    status=True, image_url=f"imgbox/{filepath}"
+                )
+                for filepath in filepaths
+                if filepath != screenshots[1]
+            }
+
+        imgbox_upload = mocker.patch(
+            "modules.image_hosts.vendor.imgbox.ImgboxImageHost._imgbox_upload",
+            autospec=True,
+            side_effect=_imgbox_upload,
+        )
+        statuses = ImgboxImageHost(
+            image_path=screenshots[0], torrent_title="title"
+        ).upload_batch(screenshots)
+
+        imgbox_upload.assert_called_once()
+        assert [status.status for status in statuses] == [True, False, True]
+        assert statuses[2].image_url == f"imgbox/{screenshots[2]}"
+
+    def test_imgbox_skips_screenshots_over_size_limit(
+        self, screenshots, mocker
+    ):
+        mocker.patch(
+            "os.path.getsize",
+            side_effect=lambda path: 20000000 if path == screenshots[0] else 3,
+        )
+        imgbox_upload = mocker.patch(
+            "modules.image_hosts.vendor.imgbox.ImgboxImageHost._imgbox_upload",
+            return_value={},
+        )
+        ImgboxImageHost(
+            image_path=screenshots[0], torrent_title="title"
+        ).upload_batch(screenshots)
+        imgbox_upload.assert_called_once_with(filepaths=screenshots[1:])
+
+    def test_chevereto_uploads_through_single_session(
+        self, screenshots, mocker
+    ):
+        mocker.patch("os.getenv", side_effect=_image_host_env_side_effects)
+        session = mocker.patch(
+            "modules.image_hosts.image_host_session.GGBotImageHostSessions.get"
+        ).return_value
+        session.post.return_value.ok = True
+        session.post.return_value.json.return_value = {
+            "data": {"url": "https://imgbb/image.png", "url_viewer": "viewer"}
+        }
+        requests_post = mocker.patch("requests.post")
+
+        statuses = ImgbbImageHost(image_path=screenshots[0]).upload_batch(
+            screenshots
+        )
+
+        assert session.post.call_count == 3
+        requests_post.assert_not_called()
+        assert all(status.status for status in statuses)
+        assert statuses[0].image_url == "https://imgbb/image.png"
+
+
+class TestGGBotImageHostSessions:
+    @pytest.fixture(autouse=True)
+    def sessions(self):
+        GGBotImageHostSessions.close_all()
+        yield GGBotImageHostSessions
+        GGBotImageHostSessions.close_all()
+
+    def test_session_shared_per_image_host(self, sessions, mocker):
+        mocker.patch("os.getenv", side_effect=_image_host_env_side_effects)
+        session = sessions.get("imgbb")
+        assert sessions.get("imgbb") is session
+        assert sessions.get("ptpimg") is not session
+
+        adapter = session.get_adapter("https://api.imgbb.com")
+        # pool is sized to the concurrent uploads made to the host
+        assert adapter._pool_maxsize == 2
+        assert adapter.max_retries.total == 2
+        assert adapter.timeout == (10, 120)
+
+    def test_default_timeout_applied(self, sessions, mocker):
+        send = mocker.patch("requests.adapters.HTTPAdapter.send")
+        adapter = sessions.get("pixhost").get_adapter("https://api.pixhost.to")
+        request = mocker.MagicMock()
+        adapter.send(request, timeout=None)
+        assert send.call_args.kwargs["timeout"] == (10, 120)
+        adapter.send(request, timeout=5)
+        assert send.call_args.kwargs["timeout"] == 5
+
+
+class TestImageHostUploadsThroughSessions:
+    @pytest.fixture
+    def screenshot(self, tmp_path):
+        screenshot = tmp_path / "screenshot.png"
+        screenshot.write_bytes(b"PNG")
+        yield str(screenshot)
+
+    @pytest.fixture
+    def session(self, mocker):
+        mocker.patch("os.getenv", side_effect=_image_host_env_side_effects)
+        get_session = mocker.patch(
+            "modules.image_hosts.image_host_session.GGBotImageHostSessions.get"
+        )
+        mocker.patch("requests.post", side_effect=AssertionError)
+        yield get_session.return_value
+
+    def test_ptpimg_upload(self, screenshot, session):
+        session.post.return_value.json.return_value = [
+            {"code": "abc123", "ext": "png"}
+        ]
+        uploader = PTPImgImageHost(image_path=screenshot)
+        uploader.upload()
+        assert uploader.status.status is True
+        assert uploader.status.image_url == "https://ptpimg.me/abc123.png"
+        assert session.post.call_args.kwargs["files"]["file-upload[]"][2] == (
+            "image/png"
+        )
+
+    def test_pixhost_upload(self, screenshot, session):
+        session.post.return_value.ok = True
+        session.post.return_value.json.return_value = {
+            "show_url": "https://pixhost.to/show/1/image.png",
+            "th_url": "https://t77.pixhost.to/thumbs/1/image.png",
+        }
+        uploader = PixhostImageHost(image_path=screenshot)
+        uploader.upload()
+        assert uploader.status.status is True
+        assert (
+            uploader.status.image_url
+            == "https://img77.pixhost.to/images/1/image.png"
+        )
+
+    @pytest.mark.parametrize(
+        ("status_code", "response", "expected_status"),
+        [
+            pytest.param(
+                200,
+                {"data": {"link": "https://i.imgur.com/abc.png"}},
+                True,
+                id="uploaded",
+            ),
+            pytest.param(
+                400, {"data": {"error": "Bad image"}}, False, id="error"
+            ),
+            pytest.param(429, {}, False, id="rate_limited"),
+        ],
+    )
+    def test_imgur_upload(
+        self, screenshot, session, status_code, response, expected_status
+    ):
+        session.post.return_value.status_code = status_code
+        session.post.return_value.json.return_value = response
+        uploader = ImgurImageHost(image_path=screenshot)
+        uploader.upload()
+        assert uploader.status.status is expected_status
+        assert session.post.call_args.kwargs["headers"] == {
+            "Authorization": "Client-ID IMGUR_CLIENT_ID"
+        }
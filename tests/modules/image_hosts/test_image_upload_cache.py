@@ -0,0 +1,106 @@
+import time
+
+import pytest
+
+from modules.image_hosts.image_upload_cache import (
+    GGBotImageUploadCache,
+    SECONDS_IN_DAY,
+)
+from modules.image_hosts.image_upload_status import GGBotImageUploadStatus
+
+
+def _cache_env_side_effects(param, default=None):
+    if param == "imgbox_cache_validity_days":
+        return "7"
+    if param == "screenshot_upload_cache_max_entries":
+        return "3"
+    return default
+
+
+class TestGGBotImageUploadCache:
+    @pytest.fixture
+    def upload_cache(self, tmp_path, mocker):
+        mocker.patch("os.getenv", side_effect=_cache_env_side_effects)
+        upload_cache = GGBotImageUploadCache(str(tmp_path / "cache.sqlite"))
+        yield upload_cache
+        upload_cache.close()
+
+    @pytest.fixture
+    def screenshot(self, tmp_path):
+        screenshot = tmp_path / "screenshot.png"
+        screenshot.write_bytes(b"PNG_BYTES")
+        yield str(screenshot)
+
+    @staticmethod
+    def _status(image_url):
+        return GGBotImageUploadStatus(
+            status=True,
+            bb_code_medium_thumb="[img]thumb[/img]",
+            bb_code_medium="[img]medium[/img]",
+            bb_code_thumb="[img]thumb[/img]",
+            image_url=image_url,
+        )
+
+    @staticmethod
+    def _age_uploads(upload_cache, days):
+        upload_cache.connection.execute(
+            "UPDATE screenshot_uploads SET uploaded_at = uploaded_at - ?",
+            [days * SECONDS_IN_DAY],
+        )
+
+    def test_cached_upload(self, upload_cache, screenshot, tmp_path):
+        upload_cache.put(screenshot, "ptpimg", self._status("ptpimg/1"))
+        cached_upload = upload_cache.get(screenshot, "ptpimg")
+        assert cached_upload.status is True
+        assert cached_upload.image_url == "ptpimg/1"
+        assert cached_upload.bb_code_medium == "[img]medium[/img]"
+        # uploads are cached per image host
+        assert upload_cache.get(screenshot, "imgbox") is None
+        # same screenshot taken again in another working folder
+        same_screenshot = tmp_path / "copy.png"
+        same_screenshot.write_bytes(b"PNG_BYTES")
+        assert (
+            GGBotImageUploadCache(upload_cache.cache_path)
+            .get(str(same_screenshot), "ptpimg")
+            .image_url
+            == "ptpimg/1"
+        )
+
+    def test_failed_uploads_are_not_cached(self, upload_cache, screenshot):
+        upload_cache.put(
+            screenshot, "ptpimg", GGBotImageUploadStatus(status=False)
+        )
+        assert upload_cache.get(screenshot, "ptpimg") is None
+
+    def test_validity_per_image_host(self, upload_cache, screenshot):
+        upload_cache.put(screenshot, "ptpimg", self._status("ptpimg/1"))
+        upload_cache.put(screenshot, "imgbox", self._status("imgbox/1"))
+        self._age_uploads(upload_cache, 10)
+        assert upload_cache.get(screenshot, "ptpimg") is not None
+        assert upload_cache.get(screenshot, "imgbox") is None
+
+    def test_expired_uploads_are_evicted(self, upload_cache, screenshot):
+        upload_cache.put(screenshot, "ptpimg", self._status("ptpimg/1"))
+        self._age_uploads(upload_cache, 31)
+        assert upload_cache.evict() == 1
+        assert upload_cache.get(screenshot, "ptpimg") is None
+
+    def test_least_recently_used_uploads_are_evicted(
+        self, upload_cache, screenshot
+    ):
+        for image_host in ["host1", "host2", "host3", "host4"]:
+            upload_cache.put(screenshot, image_host, self._status(image_host))
+            time.sleep(0.01)
+        # host1 is used recently, hence host2 is the least recently used
+        assert upload_cache.get(screenshot, "host1") is not None
+        assert upload_cache.evict() == 1
+        assert upload_cache.get(screenshot, "host2") is None
+        assert upload_cache.get(screenshot, "host1") is not None
+
+    def test_uploads_without_cache_database(self, tmp_path, screenshot):
+        upload_cache = GGBotImageUploadCache(
+            str(tmp_path / "missing" / "cache.sqlite")
+        )
+        upload_cache.put(screenshot, "ptpimg", self._status("ptpimg/1"))
+        assert upload_cache.get(screenshot, "ptpimg") is None
+        assert upload_cache.is_cache_available is False
@@ -15,6 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import pytest
+import qbittorrentapi
 
 from modules.torrent_clients.client_qbittorrent import Qbittorrent
 
@@ -113,3 +114,126 @@ def test_get_dynamic_trackers_when_disabled(torrent, expected, mocker):
     mocker.patch("os.getenv", side_effect=__reuploader_default_mode)
     qbit = Qbittorrent()
     assert qbit.get_dynamic_trackers(torrent) == expected
+
+
+def __torrent_delta(category, completed=100, size=100):
+    return {
+        "category": category,
+        "completed": completed,
+        "content_path": "/data/torrent",
+        "name": "torrent",
+        "save_path": "/data",
+        "size": size,
+        "tracker": "https://tracker",
+        "num_seeds": 10,
+    }
+
+
+def test_list_torrent_changes_full_update(mocker):
+    mock_qbt_client = mocker.patch("qbittorrentapi.Client")
+    mocker.patch("os.getenv", side_effect=__reuploader_default_mode)
+    mock_qbt_client.return_value.sync_maindata.return_value = {
+        "rid": 1,
+        "full_update": True,
+        "torrents": {
+            "hash1": __torrent_delta("GG_BOT_TEST_LABEL"),
+            "hash2": __torrent_delta("SomeOtherLabel"),
+        },
+    }
+    qbit = Qbittorrent()
+
+    changes = qbit.list_torrent_changes()
+
+    mock_qbt_client.return_value.sync_maindata.assert_called_once_with(rid=0)
+    assert qbit.rid == 1
+    assert changes["full_update"] == True
+    assert changes["removed"] == []
+    assert changes["torrents"] == [
+        {
+            "category": "GG_BOT_TEST_LABEL",
+            "completed": 100,
+            "content_path": "/data/torrent",
+            "hash": "hash1",
+            "name": "torrent",
+            "save_path": "/data",
+            "size": 100,
+            "tracker": "https://tracker",
+        }
+    ]
+
+
+def test_list_torrent_changes_applies_deltas(mocker):
+    mock_qbt_client = mocker.patch("qbittorrentapi.Client")
+    mocker.patch("os.getenv", side_effect=__reuploader_default_mode)
+    mock_qbt_client.return_value.sync_maindata.side_effect = [
+        {
+            "rid": 1,
+            "full_update": True,
+            "torrents": {
+                "hash1": __torrent_delta("GG_BOT_TEST_LABEL", completed=50),
+                "hash2": __torrent_delta("GG_BOT_TEST_LABEL"),
+                "hash3": __torrent_delta("GG_BOT_TEST_LABEL"),
+            },
+        },
+        {
+            "rid": 2,
+            "torrents": {
+                "hash1": {"completed": 100},
+                "hash2": {"category": "GG_BOT_CROSS_SEED_TEST_Source"},
+            },
+            "torrents_removed": ["hash3"],
+        },
+    ]
+    qbit = Qbittorrent()
+
+    qbit.list_torrent_changes()
+    changes = qbit.list_torrent_changes()
+
+    mock_qbt_client.return_value.sync_maindata.assert_called_with(rid=1)
+    assert qbit.rid == 2
+    assert changes["full_update"] == False
+    assert [torrent["hash"] for torrent in changes["torrents"]] == ["hash1"]
+    assert changes["torrents"][0]["completed"] == 100
+    assert changes["torrents"][0]["name"] == "torrent"
+    assert sorted(changes["removed"]) == ["hash2", "hash3"]
+    assert "hash3" not in qbit.torrents_snapshot
+
+
+def test_list_torrent_changes_resync_on_error(mocker):
+    mock_qbt_client = mocker.patch("qbittorrentapi.Client")
+    mocker.patch("os.getenv", side_effect=__reuploader_default_mode)
+    mock_qbt_client.return_value.sync_maindata.side_effect = (
+        qbittorrentapi.APIConnectionError("connection lost")
+    )
+    qbit = Qbittorrent()
+    qbit.rid = 10
+    qbit.torrents_snapshot = {"hash1": {"category": "GG_BOT_TEST_LABEL"}}
+
+    with pytest.raises(qbittorrentapi.APIConnectionError):
+        qbit.list_torrent_changes()
+
+    assert qbit.rid == 0
+    assert qbit.torrents_snapshot == {}
+
+
+def test_export_torrent(mocker):
+    mock_qbt_client = mocker.patch("qbittorrentapi.Client")
+    mocker.patch("os.getenv", side_effect=__reuploader_default_mode)
+    mock_qbt_client.return_value.torrents_export.return_value = b"d4:infode"
+    qbit = Qbittorrent()
+
+    assert qbit.export_torrent("hash1") == b"d4:infode"
+    mock_qbt_client.return_value.torrents_export.assert_called_with(
+        torrent_hash="hash1"
+    )
+
+
+def test_export_torrent_not_supported(mocker):
+    mock_qbt_client = mocker.patch("qbittorrentapi.Client")
+    mocker.patch("os.getenv", side_effect=__reuploader_default_mode)
+    mock_qbt_client.return_value.torrents_export.side_effect = (
+        qbittorrentapi.NotFound404Error("not found")
+    )
+    qbit = Qbittorrent()
+
+    assert qbit.export_torrent("hash1") is None
@@ -15,6 +15,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import pytest
+import requests
 
 from modules.torrent_clients.client_rtorrent import Rutorrent
 
@@ -117,3 +118,27 @@ def test_get_dynamic_trackers_when_disabled(torrent, expected, mocker):
     mocker.patch("os.getenv", side_effect=__reuploader_default_mode)
     rutorrent = Rutorrent()
     assert rutorrent.get_dynamic_trackers(torrent) == expected
+
+
+@pytest.mark.parametrize(
+    ("status_code", "content", "expected"),
+    [
+        pytest.param(200, b"d4:infode", b"d4:infode", id="exported"),
+        pytest.param(
+            200, b"<html>plugin missing</html>", None, id="not_a_torrent"
+        ),
+        pytest.param(404, b"", None, id="source_plugin_not_enabled"),
+    ],
+)
+def test_export_torrent(status_code, content, expected, mocker):
+    mock_api_call = mocker.patch("requests.post")
+    mocker.patch("os.getenv", side_effect=__reuploader_default_mode)
+    rutorrent = Rutorrent()
+    response = mocker.MagicMock(spec=requests.Response)
+    response.headers = {"Content-Type": "application/x-bittorrent"}
+    response.status_code = status_code
+    response.content = content
+    mock_api_call.return_value = response
+
+    assert rutorrent.export_torrent("hash1") == expected
+    assert mock_api_call.call_args.kwargs["data"] == {"hash": "hash1"}
@@ -0,0 +1,140 @@
+import os
+
+import pytest
+
+from modules.torrent_generator.client_torrent_importer import (
+    GGBotClientTorrentImporter,
+)
+from modules.torrent_generator.torf_generator import GGBOTTorrent
+from utilities.utils_torrent import GGBotTorrentCreator
+
+PIECE_SIZE = 16 * 1024
+
+
+def _write_file(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def _client_torrent(path, exclude_globs=()):
+    # torrent as it would have been created by the original tracker
+    torrent = GGBOTTorrent(
+        path=path,
+        trackers=["https://other.tracker/announce"],
+        webseeds=["https://seed.other.tracker/"],
+        source="OTHER",
+        comment="Uploaded to another tracker",
+        exclude_globs=list(exclude_globs),
+        private=False,
+    )
+    torrent.piece_size = PIECE_SIZE
+    torrent.generate()
+    return torrent
+
+
+@pytest.fixture
+def season_pack(tmp_path):
+    media = tmp_path / "Season.Pack"
+    _write_file(media / "Episode.1.mkv", 5 * PIECE_SIZE + 10)
+    _write_file(media / "Episode.2.mkv", 3 * PIECE_SIZE)
+    _write_file(media / "Season.Pack.nfo", 100)
+    return media
+
+
+class TestGGBotClientTorrentImporter:
+    def test_client_torrent_reused(self, season_pack, tmp_path):
+        client_torrent = _client_torrent(season_pack, exclude_globs=["*.nfo"])
+        torrent_path = str(tmp_path / "imported.torrent")
+
+        assert (
+            GGBotClientTorrentImporter(str(season_pack)).import_torrent(
+                client_torrent.dump(), torrent_path
+            )
+            is True
+        )
+
+        imported_torrent = GGBOTTorrent.read(torrent_path)
+        assert imported_torrent.private is True
+        assert imported_torrent.trackers == []
+        assert imported_torrent.webseeds == []
+        assert imported_torrent.source is None
+        assert (
+            imported_torrent.comment
+            == "Torrent created by GG-Bot Upload Assistant"
+        )
+        assert (
+            imported_torrent.metainfo["info"]["pieces"]
+            == client_torrent.metainfo["info"]["pieces"]
+        )
+
+    @pytest.mark.parametrize(
+        "client_media",
+        [
+            pytest.param(
+                lambda media: _client_torrent(media), id="with_excluded_files"
+            ),
+            pytest.param(
+                lambda media: _client_torrent(
+                    media / "Episode.1.mkv", exclude_globs=["*.nfo"]
+                ),
+                id="different_files",
+            ),
+        ],
+    )
+    def test_client_torrent_with_other_files_not_reused(
+        self, season_pack, tmp_path, client_media
+    ):
+        torrent_path = tmp_path / "imported.torrent"
+        assert (
+            GGBotClientTorrentImporter(str(season_pack)).import_torrent(
+                client_media(season_pack).dump(), str(torrent_path)
+            )
+            is False
+        )
+        assert not torrent_path.exists()
+
+    def test_invalid_client_torrent_not_reused(self, season_pack, tmp_path):
+        assert (
+            GGBotClientTorrentImporter(str(season_pack)).import_torrent(
+                b"<html>not a torrent</html>",
+                str(tmp_path / "imported.torrent"),
+            )
+            is False
+        )
+
+    def test_tracker_torrent_created_without_hashing(
+        self, season_pack, tmp_path, mocker
+    ):
+        client_torrent = _client_torrent(season_pack, exclude_globs=["*.nfo"])
+        hash_pieces = mocker.patch(
+            "modules.torrent_generator.piece_hasher.GGBotPieceHasher.hash_pieces"
+        )
+        generate = mocker.patch("torf.Torrent.generate")
+        # working folder of the torrent is created by the uploader
+        (tmp_path / "temp_upload" / "prefix").mkdir(parents=True)
+
+        GGBotTorrentCreator(
+            media=str(season_pack),
+            tracker="TRACKER",
+            working_folder=str(tmp_path),
+            hash_prefix="prefix/",
+            torrent_title="Season.Pack",
+            announce_urls=["https://tracker/announce"],
+            source="TRACKER_SOURCE",
+            use_mktorrent=False,
+            export_client_torrent=client_torrent.dump,
+        ).generate_dot_torrent()
+
+        hash_pieces.assert_not_called()
+        generate.assert_not_called()
+        tracker_torrent = GGBOTTorrent.read(
+            f"{tmp_path}/temp_upload/prefix/TRACKER-seasonpack.torrent"
+        )
+        assert tracker_torrent.trackers == [["https://tracker/announce"]]
+        assert tracker_torrent.source == "TRACKER_SOURCE"
+        assert tracker_torrent.private is True
+        assert (
+            tracker_torrent.metainfo["info"]["pieces"]
+            == client_torrent.metainfo["info"]["pieces"]
+        )
@@ -0,0 +1,179 @@
+import os
+import stat
+import sys
+import textwrap
+
+import pytest
+
+from modules.exceptions.exception import GGBotTorrentGenerationException
+from modules.torrent_generator import mktorrent_generator
+from modules.torrent_generator.mktorrent_generator import (
+    GGBotMkTorrentGenerator,
+)
+from modules.torrent_generator.piece_size_policy import GGBotPieceSizePolicy
+from modules.torrent_generator.torf_generator import GGBOTTorrent
+
+# stand-in for mktorrent, creating the torrent with torf and reporting the progress as mktorrent does
+FAKE_MKTORRENT = textwrap.dedent(
+    f"""\
+    #!{sys.executable}
+    import os, sys, time
+    from torf import Torrent
+
+    if sys.argv[1] == "-h":
+        print("-t <n> : number of threads")
+        sys.exit(0)
+    if os.getenv("FAKE_MKTORRENT_FAIL"):
+        print("mktorrent: cannot open output file", flush=True)
+        sys.exit(1)
+    with open(os.environ["FAKE_MKTORRENT_ARGS"], "w") as arguments:
+        arguments.write("\\n".join(sys.argv[1:]))
+    options = [option for option in sys.argv[1:-1] if option != "-p"]
+    options = dict(zip(options[::2], options[1::2]))
+    for done in range(1, 3):
+        print(f"Hashed {{done}} of 2 pieces.", end="\\r", flush=True)
+        time.sleep(0.2)
+    torrent = Torrent(
+        path=sys.argv[-1],
+        trackers=[options["-a"]],
+        source=options["-s"],
+        comment=options["-c"],
+        private=True,
+        created_by="mktorrent 1.1",
+    )
+    torrent.piece_size = 2 ** int(options["-l"])
+    torrent.generate()
+    torrent.write(options["-o"])
+    print("\\nWriting metainfo file... done.")
+    """
+)
+
+
+@pytest.fixture
+def mktorrent(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    executable = bin_dir / "mktorrent"
+    executable.write_text(FAKE_MKTORRENT)
+    executable.chmod(executable.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv("FAKE_MKTORRENT_ARGS", str(tmp_path / "arguments"))
+    monkeypatch.setenv("torrent_hash_workers", "3")
+    mktorrent_generator._supports_threads.cache_clear()
+    yield tmp_path / "arguments"
+    mktorrent_generator._supports_threads.cache_clear()
+
+
+def _generator(tmp_path, progress_callback, announce, policies=()):
+    media = tmp_path / "movie.mkv"
+    media.write_bytes(os.urandom(40000))
+    return GGBotMkTorrentGenerator(
+        media=str(media),
+        announce=announce,
+        source="GG",
+        torrent_title="movie",
+        torrent_path_prefix=str(tmp_path / "TRACKER"),
+        progress_callback=progress_callback,
+        piece_size_policies=policies,
+    )
+
+
+def test_torrent_generated_with_mktorrent(tmp_path, mktorrent, mocker):
+    progress_callback = mocker.MagicMock(return_value=None)
+    generator = _generator(
+        tmp_path,
+        progress_callback,
+        ["https://tracker/announce", "https://backup.tracker/announce"],
+    )
+
+    generator.generate_torrent()
+    infohash = GGBOTTorrent.read(generator.torrent_path).infohash
+    generator.do_post_generation_task()
+
+    arguments = mktorrent.read_text().split("\n")
+    assert arguments[arguments.index("-t") + 1] == "3"
+    assert arguments[-1] == generator.media
+    assert [call.args[2:] for call in progress_callback.call_args_list] == [
+        (1, 2),
+        (2, 2),
+    ]
+    torrent = GGBOTTorrent.read(generator.torrent_path)
+    assert torrent.infohash == infohash
+    assert torrent.created_by == "GG-Bot Upload Assistant"
+    assert torrent.trackers == [
+        ["https://tracker/announce"],
+        ["https://backup.tracker/announce"],
+    ]
+
+
+def test_mktorrent_failure(tmp_path, mktorrent, monkeypatch, mocker):
+    monkeypatch.setenv("FAKE_MKTORRENT_FAIL", "1")
+    generator = _generator(
+        tmp_path, mocker.MagicMock(), ["https://tracker/announce"]
+    )
+
+    with pytest.raises(GGBotTorrentGenerationException) as error:
+        generator.generate_torrent()
+
+    assert "exit code 1" in str(error.value)
+    assert "cannot open output file" in str(error.value)
+
+
+def test_mktorrent_stopped_by_progress_callback(tmp_path, mktorrent, mocker):
+    generator = _generator(
+        tmp_path,
+        mocker.MagicMock(return_value=True),
+        ["https://tracker/announce"],
+    )
+
+    generator.generate_torrent()
+
+    assert not os.path.exists(generator.torrent_path)
+
+
+@pytest.mark.parametrize(
+    ("usage", "expected"),
+    [
+        pytest.param(
+            b"-s, --source=<source>   : add source string\n"
+            b"-t, --threads=<n>       : use <n> threads for calculating hashes\n",
+            True,
+            id="long_options",
+        ),
+        pytest.param(
+            b"-s <source>   : add source string\n"
+            b"-t <n>        : use <n> threads for calculating hashes\n",
+            True,
+            id="short_options",
+        ),
+        pytest.param(
+            b"-v, --verbose           : be verbose\n"
+            b"-x, --exclude=<glob>    : exclude files, e.g. -x *-t.txt\n",
+            False,
+            id="without_threads",
+        ),
+    ],
+)
+def test_supports_threads(usage, expected, mocker):
+    mktorrent_generator._supports_threads.cache_clear()
+    mocker.patch("subprocess.run", return_value=mocker.MagicMock(stdout=usage))
+    assert mktorrent_generator._supports_threads() is expected
+    mktorrent_generator._supports_threads.cache_clear()
+
+
+@pytest.mark.parametrize(
+    ("policy", "expected"),
+    [
+        pytest.param(GGBotPieceSizePolicy(), 19, id="default"),
+        pytest.param(
+            GGBotPieceSizePolicy(max_piece_size=16 * 1024),
+            15,
+            id="below_mktorrent_minimum",
+        ),
+    ],
+)
+def test_piece_size_exponent(tmp_path, policy, expected, mocker):
+    generator = _generator(
+        tmp_path, mocker.MagicMock(), ["https://tracker/announce"], [policy]
+    )
+    assert generator.piece_size_exponent == expected
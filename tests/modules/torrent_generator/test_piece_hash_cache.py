@@ -0,0 +1,144 @@
+import os
+
+import pytest
+
+from modules.torrent_generator.piece_hash_cache import GGBotPieceHashCache
+from modules.torrent_generator.torf_generator import GGBotTorfTorrentGenerator
+
+PIECE_SIZE = 16 * 1024
+
+
+def _cache_env_side_effects(param, default=None):
+    if param == "piece_hash_cache_max_mb":
+        # room for the pieces of 2 files of 4 pieces
+        return str(160 / (1024 * 1024))
+    return default
+
+
+def _write_file(path, size):
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+def _append_to_media(media):
+    with open(media, "ab") as media_file:
+        media_file.write(b"extra")
+
+
+def _replace_media(media):
+    # same path, size and modification time, but a different file (inode)
+    os.rename(media, f"{media}.old")
+    with open(f"{media}.old", "rb") as old_media, open(
+        media, "wb"
+    ) as new_media:
+        new_media.write(old_media.read())
+    mtime_ns = os.stat(f"{media}.old").st_mtime_ns
+    os.utime(media, ns=(mtime_ns, mtime_ns))
+
+
+class TestGGBotPieceHashCache:
+    @pytest.fixture
+    def piece_hash_cache(self, tmp_path, mocker):
+        mocker.patch("os.getenv", side_effect=_cache_env_side_effects)
+        piece_hash_cache = GGBotPieceHashCache(str(tmp_path / "cache.sqlite"))
+        yield piece_hash_cache
+        piece_hash_cache.close()
+
+    def test_cached_pieces(self, piece_hash_cache, tmp_path):
+        media = _write_file(tmp_path / "movie.mkv", 4 * PIECE_SIZE)
+        piece_hash_cache.put(
+            filepaths=[media], piece_size=PIECE_SIZE, pieces=b"1" * 80
+        )
+        assert (
+            piece_hash_cache.get(filepaths=[media], piece_size=PIECE_SIZE)
+            == b"1" * 80
+        )
+        # pieces are cached per piece size
+        assert (
+            piece_hash_cache.get(filepaths=[media], piece_size=2 * PIECE_SIZE)
+            is None
+        )
+
+    @pytest.mark.parametrize(
+        "change_media",
+        [
+            pytest.param(
+                lambda media: os.utime(media, ns=(0, 1_000_000_000)),
+                id="modified",
+            ),
+            pytest.param(_append_to_media, id="resized"),
+            pytest.param(_replace_media, id="replaced"),
+            pytest.param(lambda media: os.remove(media), id="removed"),
+        ],
+    )
+    def test_changed_media_is_not_cached(
+        self, piece_hash_cache, tmp_path, change_media
+    ):
+        media = _write_file(tmp_path / "movie.mkv", 4 * PIECE_SIZE)
+        piece_hash_cache.put(
+            filepaths=[media], piece_size=PIECE_SIZE, pieces=b"1" * 80
+        )
+        change_media(media)
+        assert (
+            piece_hash_cache.get(filepaths=[media], piece_size=PIECE_SIZE)
+            is None
+        )
+
+    def test_least_recently_used_pieces_evicted(
+        self, piece_hash_cache, tmp_path
+    ):
+        medias = [
+            _write_file(tmp_path / f"movie.{index}.mkv", 4 * PIECE_SIZE)
+            for index in range(3)
+        ]
+        for index, media in enumerate(medias[:2]):
+            piece_hash_cache.put(
+                filepaths=[media], piece_size=PIECE_SIZE, pieces=b"1" * 80
+            )
+            # make sure that the first media is the least recently used
+            piece_hash_cache.connection.execute(
+                "UPDATE piece_hashes SET last_used_at = ? WHERE files = ?",
+                [index, f'["{media}"]'],
+            )
+        piece_hash_cache.put(
+            filepaths=[medias[2]], piece_size=PIECE_SIZE, pieces=b"1" * 80
+        )
+
+        cached = [
+            piece_hash_cache.get(filepaths=[media], piece_size=PIECE_SIZE)
+            is not None
+            for media in medias
+        ]
+        assert cached == [False, True, True]
+
+    def test_generator_reuses_cached_pieces(
+        self, piece_hash_cache, tmp_path, mocker
+    ):
+        media = _write_file(tmp_path / "movie.mkv", 4 * PIECE_SIZE + 10)
+
+        def _generate_torrent(title):
+            torrent_generator = GGBotTorfTorrentGenerator(
+                media=media,
+                announce=["https://tracker/announce"],
+                source="GG",
+                torrent_title=title,
+                torrent_path_prefix=str(tmp_path / "TRACKER"),
+                progress_callback=lambda *args: None,
+                piece_hash_cache=piece_hash_cache,
+            )
+            torrent_generator.torrent.piece_size = PIECE_SIZE
+            torrent_generator.generate_torrent()
+            return torrent_generator.torrent
+
+        torrent = _generate_torrent("first")
+        hash_pieces = mocker.patch(
+            "modules.torrent_generator.piece_hasher.GGBotPieceHasher.hash_pieces"
+        )
+        cached_torrent = _generate_torrent("second")
+
+        hash_pieces.assert_not_called()
+        assert (
+            cached_torrent.metainfo["info"]["pieces"]
+            == torrent.metainfo["info"]["pieces"]
+        )
+        assert os.path.isfile(tmp_path / "TRACKER-second.torrent")
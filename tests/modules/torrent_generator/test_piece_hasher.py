@@ -0,0 +1,179 @@
+import builtins
+import os
+
+import pytest
+
+from modules.torrent_generator.piece_hasher import GGBotPieceHasher
+from modules.torrent_generator.piece_size_policy import GGBotPieceSizePolicy
+from modules.torrent_generator.torf_generator import (
+    GGBOTTorrent,
+    GGBotTorfTorrentGenerator,
+)
+
+PIECE_SIZE = 16 * 1024
+
+
+def _write_file(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def _torf_pieces(media, piece_size=PIECE_SIZE):
+    torrent = GGBOTTorrent(path=media, private=True)
+    torrent.piece_size = piece_size
+    torrent.generate(threads=1)
+    return list(torrent.filepaths), torrent.metainfo["info"]["pieces"]
+
+
+@pytest.fixture
+def small_read_size(mocker):
+    # reads spanning a few pieces, so that pieces are split across reads as well
+    mocker.patch(
+        "modules.torrent_generator.piece_hasher.MIN_READ_SIZE", 3 * PIECE_SIZE
+    )
+
+
+class TestGGBotPieceHasher:
+    @pytest.mark.parametrize(
+        "file_sizes",
+        [
+            pytest.param([10 * PIECE_SIZE], id="aligned_single_file"),
+            pytest.param([10 * PIECE_SIZE + 123], id="single_file"),
+            pytest.param([100], id="file_smaller_than_piece"),
+            pytest.param(
+                [3 * PIECE_SIZE + 5, 100, 7 * PIECE_SIZE - 105, 2 * PIECE_SIZE],
+                id="pieces_spanning_files",
+            ),
+        ],
+    )
+    @pytest.mark.parametrize("workers", [1, 4])
+    def test_same_pieces_as_torf(
+        self, tmp_path, small_read_size, file_sizes, workers
+    ):
+        if len(file_sizes) == 1:
+            media = _write_file(tmp_path / "movie.mkv", file_sizes[0])
+        else:
+            media = tmp_path / "Season.Pack"
+            for index, size in enumerate(file_sizes):
+                _write_file(media / f"Episode.{index}.mkv", size)
+        filepaths, torf_pieces = _torf_pieces(str(media))
+
+        pieces = GGBotPieceHasher(
+            filepaths=filepaths, piece_size=PIECE_SIZE, workers=workers
+        ).hash_pieces()
+
+        assert pieces == torf_pieces
+
+    def test_progress_callback(self, tmp_path, small_read_size, mocker):
+        mocker.patch(
+            "modules.torrent_generator.piece_hasher.CALLBACK_INTERVAL_SECONDS",
+            0,
+        )
+        media = _write_file(tmp_path / "movie.mkv", 5 * PIECE_SIZE)
+        progress = []
+        GGBotPieceHasher(
+            filepaths=[str(media)], piece_size=PIECE_SIZE, workers=2
+        ).hash_pieces(lambda *args: progress.append(args))
+        assert progress == [(str(media), done, 5) for done in range(1, 6)]
+
+    def test_hashing_stopped_by_callback(self, tmp_path, small_read_size):
+        media = _write_file(tmp_path / "movie.mkv", 20 * PIECE_SIZE)
+        assert (
+            GGBotPieceHasher(
+                filepaths=[str(media)], piece_size=PIECE_SIZE, workers=2
+            ).hash_pieces(lambda *args: True)
+            is None
+        )
+
+    def test_multiple_piece_sizes_hashed_in_one_pass(
+        self, tmp_path, small_read_size, mocker
+    ):
+        media = tmp_path / "Season.Pack"
+        for index, size in enumerate([5 * PIECE_SIZE + 7, 9 * PIECE_SIZE - 3]):
+            _write_file(media / f"Episode.{index}.mkv", size)
+        piece_sizes = [2 * PIECE_SIZE, PIECE_SIZE, 8 * PIECE_SIZE]
+        torf_pieces = {
+            piece_size: _torf_pieces(str(media), piece_size)
+            for piece_size in piece_sizes
+        }
+        open_spy = mocker.spy(builtins, "open")
+
+        hashes = GGBotPieceHasher(
+            filepaths=torf_pieces[PIECE_SIZE][0],
+            piece_size=piece_sizes[0],
+            workers=2,
+            extra_piece_sizes=piece_sizes[1:],
+        ).hash_all_pieces()
+
+        # every file is read only once
+        assert open_spy.call_count == 2
+        for piece_size in piece_sizes:
+            assert hashes[piece_size] == torf_pieces[piece_size][1]
+
+
+@pytest.mark.parametrize("hashing_engine", ["ggbot", "torf"])
+def test_torf_generator_with_hashing_engines(tmp_path, mocker, hashing_engine):
+    mocker.patch(
+        "os.getenv",
+        side_effect=lambda key, default=None: hashing_engine
+        if key == "torrent_hashing_engine"
+        else default,
+    )
+    media = tmp_path / "Season.Pack"
+    for index in range(3):
+        _write_file(media / f"Episode.{index}.mkv", 40000 + index)
+    progress_callback = mocker.MagicMock(return_value=None)
+    generator = GGBotTorfTorrentGenerator(
+        media=str(media),
+        announce=["https://tracker/announce"],
+        source="GG",
+        torrent_title="Season.Pack",
+        torrent_path_prefix=str(tmp_path / "prefix"),
+        progress_callback=progress_callback,
+    )
+    generator.generate_torrent()
+
+    torrent = GGBOTTorrent.read(generator.torrent_path)
+    assert torrent.verify(str(media)) is True
+    # progress is reported with the torrent, as torf does
+    assert progress_callback.call_args.args[0] is generator.torrent
+    assert progress_callback.call_args.args[2:] == (
+        torrent.pieces,
+        torrent.pieces,
+    )
+
+
+@pytest.mark.parametrize("hashing_engine", ["ggbot", "torf"])
+def test_torf_generator_with_conflicting_piece_sizes(
+    tmp_path, mocker, hashing_engine
+):
+    mocker.patch(
+        "os.getenv",
+        side_effect=lambda key, default=None: hashing_engine
+        if key == "torrent_hashing_engine"
+        else default,
+    )
+    media = _write_file(tmp_path / "movie.mkv", 10 * PIECE_SIZE + 5)
+    generator = GGBotTorfTorrentGenerator(
+        media=str(media),
+        announce=["https://tracker/announce"],
+        source="GG",
+        torrent_title="movie",
+        torrent_path_prefix=str(tmp_path / "TRACKER"),
+        progress_callback=mocker.MagicMock(return_value=None),
+        piece_size_policies=[
+            GGBotPieceSizePolicy(max_piece_size=PIECE_SIZE),
+            GGBotPieceSizePolicy(min_piece_size=4 * PIECE_SIZE),
+        ],
+    )
+    generator.generate_torrent()
+
+    torrent = GGBOTTorrent.read(generator.torrent_path)
+    extra_torrent = GGBOTTorrent.read(
+        generator.get_extra_torrent_path(4 * PIECE_SIZE)
+    )
+    assert torrent.piece_size == PIECE_SIZE
+    assert extra_torrent.piece_size == 4 * PIECE_SIZE
+    assert torrent.verify(str(media)) is True
+    assert extra_torrent.verify(str(media)) is True
@@ -0,0 +1,96 @@
+import pytest
+
+from modules.torrent_generator.piece_size_policy import (
+    GGBotPieceSizePolicy,
+    choose_piece_sizes,
+)
+
+MiB = 1024 * 1024
+GiB = 1024 * MiB
+
+
+class TestGGBotPieceSizePolicy:
+    def test_policy_from_template(self):
+        policy = GGBotPieceSizePolicy.from_template(
+            {"torrent_piece_size": {"max": 8 * MiB, "max_pieces": 2000}}
+        )
+        assert policy.min_piece_size is None
+        assert policy.max_piece_size == 8 * MiB
+        assert policy.max_pieces == 2000
+
+    @pytest.mark.parametrize(
+        ("piece_size", "expected"),
+        [
+            pytest.param(1 * MiB, False, id="smaller_than_min"),
+            pytest.param(2 * MiB, False, id="too_many_pieces"),
+            pytest.param(4 * MiB, True, id="accepted"),
+            pytest.param(8 * MiB, True, id="max"),
+            pytest.param(16 * MiB, False, id="larger_than_max"),
+        ],
+    )
+    def test_allows(self, piece_size, expected):
+        policy = GGBotPieceSizePolicy(
+            min_piece_size=1 * MiB, max_piece_size=8 * MiB, max_pieces=2000
+        )
+        assert policy.allows(piece_size, 5 * GiB) is expected
+        assert GGBotPieceSizePolicy().allows(piece_size, 5 * GiB) is True
+
+
+class TestChoosePieceSizes:
+    @pytest.mark.parametrize(
+        ("policies", "expected"),
+        [
+            pytest.param([], [4 * MiB], id="no_trackers"),
+            pytest.param(
+                [GGBotPieceSizePolicy(), GGBotPieceSizePolicy()],
+                [4 * MiB],
+                id="no_constraints",
+            ),
+            pytest.param(
+                [
+                    GGBotPieceSizePolicy(),
+                    GGBotPieceSizePolicy(max_piece_size=2 * MiB),
+                    GGBotPieceSizePolicy(min_piece_size=1 * MiB),
+                ],
+                [2 * MiB],
+                id="common_piece_size_closest_to_default",
+            ),
+            pytest.param(
+                [GGBotPieceSizePolicy(max_pieces=200)],
+                [32 * MiB],
+                id="piece_count_limit",
+            ),
+            pytest.param(
+                [
+                    GGBotPieceSizePolicy(max_piece_size=1 * MiB),
+                    GGBotPieceSizePolicy(min_piece_size=8 * MiB),
+                    GGBotPieceSizePolicy(max_piece_size=2 * MiB),
+                ],
+                [1 * MiB, 8 * MiB],
+                id="conflicting_constraints",
+            ),
+            pytest.param(
+                [
+                    GGBotPieceSizePolicy(),
+                    GGBotPieceSizePolicy(min_piece_size=8 * MiB),
+                    GGBotPieceSizePolicy(max_piece_size=2 * MiB),
+                ],
+                [8 * MiB, 2 * MiB],
+                id="unconstrained_base_torrent",
+            ),
+            pytest.param(
+                [GGBotPieceSizePolicy(max_pieces=10)],
+                [4 * MiB],
+                id="constraints_cannot_be_satisfied",
+            ),
+        ],
+    )
+    def test_choose_piece_sizes(self, policies, expected):
+        assert (
+            choose_piece_sizes(
+                default_piece_size=4 * MiB,
+                total_size=5 * GiB,
+                policies=policies,
+            )
+            == expected
+        )
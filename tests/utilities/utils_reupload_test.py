@@ -12,6 +12,7 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
+import datetime
 import json
 import os
 from pathlib import Path
@@ -19,7 +20,13 @@ from pathlib import Path
 import pytest
 
 from modules.torrent_clients.client_qbittorrent import Qbittorrent
-from utilities.utils_reupload import TorrentStatus, AutoReUploaderManager
+from utilities.utils_reupload import (
+    TorrentStatus,
+    AutoReUploaderManager,
+    RetryPolicy,
+    RetryStage,
+    TrackerUploadStatus,
+)
 
 working_folder = Path(__file__).resolve().parent.parent.parent
 
@@ -71,6 +78,94 @@ class TestAutoReUploaderManager:
         assert init_data["movie_db"] == "None"
         assert init_data["possible_matches"] == "None"
         assert init_data["date_created"] is not None
+        # torrent is claimed by the instance that initialized it
+        assert init_data["lease_owner"] == reupload_manager.instance_id
+        assert (
+            init_data["lease_expires_at"]
+            > datetime.datetime.now(datetime.timezone.utc).isoformat()
+        )
+
+    def test_initialize_torrent_by_another_instance(
+        self, reupload_manager, mocker
+    ):
+        mocker.patch("modules.cache.Cache.insert_if_absent", return_value=False)
+        assert (
+            reupload_manager.initialize_torrent(
+                {"hash": "TORRENT_HASH", "name": "TORRENT_NAME"}
+            )
+            is None
+        )
+
+    @pytest.mark.parametrize(
+        ("claimed_document", "expected"),
+        [
+            pytest.param(
+                {"hash": "info_hash", "status": "PENDING"},
+                {"hash": "info_hash", "status": "PENDING"},
+                id="torrent_claimed",
+            ),
+            pytest.param(None, None, id="torrent_leased_by_another_instance"),
+        ],
+    )
+    def test_claim_torrent(
+        self, claimed_document, expected, reupload_manager, mocker
+    ):
+        update_fields_if = mocker.patch(
+            "modules.cache.Cache.update_fields_if",
+            return_value=claimed_document,
+        )
+        assert reupload_manager.claim_torrent("info_hash") == expected
+        key, condition, fields = update_fields_if.call_args[0]
+        assert key == "ReUpload::Torrent::info_hash"
+        assert condition["status"] == {
+            "$in": ["READY_FOR_PROCESSING", "PENDING", "RETRY_SCHEDULED"]
+        }
+        # free, own and expired leases can be claimed
+        assert condition["$or"][0] == {"lease_owner": None}
+        assert condition["$or"][1] == {
+            "lease_owner": reupload_manager.instance_id
+        }
+        assert "$lt" in condition["$or"][2]["lease_expires_at"]
+        assert fields["lease_owner"] == reupload_manager.instance_id
+
+    def test_instance_id_from_config(self, mocker, mock_cache, mock_client):
+        mocker.patch(
+            "os.getenv",
+            side_effect=lambda key, default=None: {
+                "reuploader_instance_id": "seedbox-1",
+                "lease_duration_seconds": "10",
+            }.get(key, default),
+        )
+        manager = AutoReUploaderManager(cache=mock_cache, client=mock_client)
+        assert manager.instance_id == "seedbox-1"
+        # very short leases would expire before the heartbeats can renew them
+        assert manager.lease_duration == 30
+
+    def test_lease_released_after_processing(self, reupload_manager, mocker):
+        update_fields_if = mocker.patch(
+            "modules.cache.Cache.update_fields_if", return_value={}
+        )
+        with reupload_manager.lease("info_hash") as torrent_lease:
+            assert reupload_manager.active_leases["info_hash"] is torrent_lease
+        assert reupload_manager.active_leases == {}
+        update_fields_if.assert_called_once_with(
+            "ReUpload::Torrent::info_hash",
+            {"lease_owner": reupload_manager.instance_id},
+            {"lease_owner": None, "lease_expires_at": None},
+        )
+
+    def test_lost_lease_is_not_released(self, reupload_manager, mocker):
+        update_fields_if = mocker.patch(
+            "modules.cache.Cache.update_fields_if", return_value=None
+        )
+        torrent_lease = reupload_manager.lease("info_hash")
+        torrent_lease.interval = 0.01
+        with torrent_lease:
+            assert torrent_lease._lost.wait(timeout=5) is True
+            assert reupload_manager.is_lease_lost("info_hash") is True
+        # only the failed renewal was attempted, the lease now belongs to another instance
+        assert update_fields_if.call_count == 1
+        assert "lease_owner" not in update_fields_if.call_args[0][2]
 
     @pytest.mark.parametrize(
         ("return_data", "expected"),
@@ -181,8 +276,20 @@ class TestAutoReUploaderManager:
     def test_should_upload_be_skipped(
         self, torrent, expected, reupload_manager, mocker
     ):
-        mocker.patch("modules.cache.Cache.save", return_value=None)
+        mocker.patch(
+            "modules.cache.Cache.increment",
+            return_value=torrent["upload_attempt"] + 1,
+        )
+        update_fields = mocker.patch(
+            "modules.cache.Cache.update_fields", return_value=True
+        )
         assert reupload_manager.skip_reupload(torrent) == expected
+        if expected:
+            update_fields.assert_called_once_with(
+                "ReUpload::Torrent::", {"status": "UNKNOWN_FAILURE"}
+            )
+        else:
+            update_fields.assert_not_called()
 
     @pytest.mark.parametrize(
         ("return_data", "expected"),
@@ -219,14 +326,18 @@ class TestAutoReUploaderManager:
     def test_update_torrent_status(
         self, return_data, new_status, expected, reupload_manager, mocker
     ):
-        mocker.patch("modules.cache.Cache.get", return_value=return_data)
-        mocker.patch("modules.cache.Cache.save", return_value=None)
+        update_fields = mocker.patch(
+            "modules.cache.Cache.update_fields", return_value=True
+        )
         assert (
             reupload_manager.update_torrent_status("info_hash", new_status)[
                 "status"
             ]
             == expected
         )
+        update_fields.assert_called_once_with(
+            "ReUpload::Torrent::info_hash", {"status": expected}
+        )
 
     @pytest.mark.parametrize(
         ("new_data", "is_json", "return_data", "expected"),
@@ -253,14 +364,18 @@ class TestAutoReUploaderManager:
     def test_update_field(
         self, new_data, is_json, return_data, expected, reupload_manager, mocker
     ):
-        mocker.patch("modules.cache.Cache.get", return_value=return_data)
-        mocker.patch("modules.cache.Cache.save", return_value=None)
+        update_fields = mocker.patch(
+            "modules.cache.Cache.update_fields", return_value=True
+        )
         assert (
             reupload_manager.update_torrent_field(
                 "info_hash", "field", new_data, is_json
             )["field"]
             == expected
         )
+        update_fields.assert_called_once_with(
+            "ReUpload::Torrent::info_hash", {"field": expected}
+        )
 
     def test_insert_into_job_repo(self, reupload_manager, mocker):
         data = {"hash": "hash", "tracker": "tracker"}
@@ -488,19 +603,35 @@ class TestAutoReUploaderManager:
         )
 
     @pytest.mark.parametrize(
-        ("cache_get_data", "list_torrents_data", "expected"),
+        (
+            "cached_statuses",
+            "cached_documents",
+            "list_torrents_data",
+            "expected",
+        ),
         [
             pytest.param(
-                [{"status": "PENDING"}],
+                [{"hash": "hash2", "status": "PENDING"}],
+                [{"hash": "hash2", "status": "PENDING", "upload_attempt": 1}],
                 [
                     {"completed": "100", "size": "200", "hash": "hash1"},
                     {"completed": "200", "size": "200", "hash": "hash2"},
                 ],
-                [{"completed": "200", "size": "200", "hash": "hash2"}],
+                [
+                    (
+                        {"completed": "200", "size": "200", "hash": "hash2"},
+                        {
+                            "hash": "hash2",
+                            "status": "PENDING",
+                            "upload_attempt": 1,
+                        },
+                    )
+                ],
                 id="processable_torrents_present",
             ),
             pytest.param(
-                [{"status": "FAILED"}],
+                [{"hash": "hash2", "status": "FAILED"}],
+                [],
                 [
                     {"completed": "100", "size": "200", "hash": "hash1"},
                     {"completed": "200", "size": "200", "hash": "hash2"},
@@ -508,24 +639,166 @@ class TestAutoReUploaderManager:
                 [],
                 id="processable_torrents_not_present",
             ),
+            pytest.param(
+                [{"hash": "hash3", "status": "SUCCESS"}],
+                [],
+                [
+                    {"completed": "200", "size": "200", "hash": "hash2"},
+                    {"completed": "200", "size": "200", "hash": "hash3"},
+                ],
+                [({"completed": "200", "size": "200", "hash": "hash2"}, None)],
+                id="new_torrent_not_present_in_cache",
+            ),
+            pytest.param(
+                [
+                    {
+                        "hash": "hash1",
+                        "status": "RETRY_SCHEDULED",
+                        "next_attempt_at": "2000-01-01T00:00:00",
+                    },
+                    {
+                        "hash": "hash2",
+                        "status": "RETRY_SCHEDULED",
+                        "next_attempt_at": "9999-01-01T00:00:00",
+                    },
+                ],
+                [{"hash": "hash1", "status": "RETRY_SCHEDULED"}],
+                [
+                    {"completed": "200", "size": "200", "hash": "hash1"},
+                    {"completed": "200", "size": "200", "hash": "hash2"},
+                ],
+                [
+                    (
+                        {"completed": "200", "size": "200", "hash": "hash1"},
+                        {"hash": "hash1", "status": "RETRY_SCHEDULED"},
+                    )
+                ],
+                id="only_due_retries_are_processable",
+            ),
+            pytest.param(
+                [
+                    {
+                        "hash": "hash1",
+                        "status": "PENDING",
+                        "lease_owner": "other-instance",
+                        "lease_expires_at": "9999-01-01T00:00:00+00:00",
+                    },
+                    {
+                        "hash": "hash2",
+                        "status": "PENDING",
+                        "lease_owner": "crashed-instance",
+                        "lease_expires_at": "2000-01-01T00:00:00+00:00",
+                    },
+                ],
+                [{"hash": "hash2", "status": "PENDING"}],
+                [
+                    {"completed": "200", "size": "200", "hash": "hash1"},
+                    {"completed": "200", "size": "200", "hash": "hash2"},
+                ],
+                [
+                    (
+                        {"completed": "200", "size": "200", "hash": "hash2"},
+                        {"hash": "hash2", "status": "PENDING"},
+                    )
+                ],
+                id="torrents_leased_by_other_instances_are_skipped",
+            ),
         ],
     )
     def test_reupload_get_processable_torrents(
         self,
-        cache_get_data,
+        cached_statuses,
+        cached_documents,
         list_torrents_data,
         expected,
         reupload_manager,
         mocker,
     ):
-        mocker.patch("modules.cache.Cache.get", return_value=cache_get_data)
-
+        get_by_hashes = mocker.patch(
+            "modules.cache.Cache.get_by_hashes",
+            side_effect=[cached_statuses, cached_documents],
+        )
         mocker.patch(
             "modules.torrent_client.TorrentClient.list_torrents",
             return_value=list_torrents_data,
         )
 
         assert reupload_manager.get_processable_torrents() == expected
+        # status of all the torrents are obtained with a single query
+        get_by_hashes.assert_any_call(
+            "ReUpload::Torrent",
+            [
+                torrent["hash"]
+                for torrent in list_torrents_data
+                if torrent["completed"] == torrent["size"]
+            ],
+            fields=[
+                "hash",
+                "status",
+                "next_attempt_at",
+                "lease_owner",
+                "lease_expires_at",
+            ],
+        )
+        assert get_by_hashes.call_count <= 2
+
+    @staticmethod
+    def __change_feed_side_effect(param, default=None):
+        if param == "client_change_feed":
+            return True
+        return default
+
+    def test_reupload_get_processable_torrents_from_change_feed(
+        self, mocker, mock_cache, mock_client
+    ):
+        mocker.patch("os.getenv", side_effect=self.__change_feed_side_effect)
+        mock_client.supports_change_feed = True
+        mock_client.list_torrent_changes.side_effect = [
+            {
+                "full_update": True,
+                "torrents": [
+                    {"completed": 100, "size": 200, "hash": "hash1"},
+                    {"completed": 200, "size": 200, "hash": "hash2"},
+                    {"completed": 200, "size": 200, "hash": "hash3"},
+                ],
+                "removed": [],
+            },
+            {
+                "full_update": False,
+                "torrents": [{"completed": 200, "size": 200, "hash": "hash1"}],
+                "removed": ["hash2"],
+            },
+        ]
+        mocker.patch(
+            "modules.cache.Cache.get_by_hashes",
+            side_effect=[
+                [
+                    {"hash": "hash2", "status": "PENDING"},
+                    {"hash": "hash3", "status": "SUCCESS"},
+                ],
+                [{"hash": "hash2", "status": "PENDING"}],
+                [],
+            ],
+        )
+        reupload_manager = AutoReUploaderManager(
+            cache=mock_cache, client=mock_client
+        )
+
+        assert reupload_manager.get_processable_torrents() == [
+            (
+                {"completed": 200, "size": 200, "hash": "hash2"},
+                {"hash": "hash2", "status": "PENDING"},
+            )
+        ]
+        assert reupload_manager.settled_torrents == {"hash3"}
+        assert reupload_manager.get_processable_torrents() == [
+            ({"completed": 200, "size": 200, "hash": "hash1"}, None)
+        ]
+        assert set(reupload_manager.tracked_torrents.keys()) == {
+            "hash1",
+            "hash3",
+        }
+        mock_client.list_torrents.assert_not_called()
 
     @staticmethod
     def __torrent_path_not_translation_side_effect(param, default=None):
@@ -715,6 +988,13 @@ class TestAutoReUploaderManager:
         self, torrent, current_status, expected, reupload_manager, mocker
     ):
         mocker.patch("modules.cache.Cache.get", return_value=current_status)
+        mocker.patch(
+            "modules.cache.Cache.set_if_status",
+            side_effect=lambda key, statuses, fields: current_status[0][
+                "status"
+            ]
+            in statuses,
+        )
 
         assert (
             reupload_manager.mark_successful_upload(torrent, "TRACKER", {})
@@ -754,8 +1034,123 @@ class TestAutoReUploaderManager:
         self, torrent, current_status, expected, reupload_manager, mocker
     ):
         mocker.patch("modules.cache.Cache.get", return_value=current_status)
+        mocker.patch(
+            "modules.cache.Cache.set_if_status",
+            side_effect=lambda key, statuses, fields: current_status[0][
+                "status"
+            ]
+            in statuses,
+        )
 
         assert (
             reupload_manager.mark_failed_upload(torrent, "TRACKER", {})
             == expected
         )
+
+    @pytest.mark.parametrize(
+        ("failure_status", "upload_attempt", "expected"),
+        [
+            pytest.param(
+                "TRACKER_UPLOAD_FAILED", 1, True, id="tracker_upload_retried"
+            ),
+            pytest.param("UNKNOWN_FAILURE", 2, True, id="unknown_retried"),
+            pytest.param(
+                "UNKNOWN_FAILURE", 3, False, id="retry_attempts_exhausted"
+            ),
+            pytest.param(
+                "DUPE_CHECK_FAILED", 1, False, id="dupes_never_retried"
+            ),
+            pytest.param(
+                "TMDB_IDENTIFICATION_FAILED",
+                1,
+                False,
+                id="tmdb_identification_never_retried",
+            ),
+        ],
+    )
+    def test_schedule_retry(
+        self, failure_status, upload_attempt, expected, reupload_manager, mocker
+    ):
+        update_fields = mocker.patch("modules.cache.Cache.update_fields")
+        assert (
+            reupload_manager.schedule_retry(
+                "info_hash",
+                failure_status,
+                upload_attempt,
+                retry_stage=RetryStage.TRACKER_UPLOAD,
+                retry_trackers=["BLU"],
+                tracker_statuses={"BLU": "FAILED", "ATH": "SUCCESS"},
+            )
+            == expected
+        )
+        if not expected:
+            update_fields.assert_not_called()
+            return
+        fields = update_fields.call_args[0][1]
+        assert fields["status"] == TorrentStatus.RETRY_SCHEDULED
+        assert fields["retry_stage"] == RetryStage.TRACKER_UPLOAD
+        assert fields["retry_failure"] == failure_status
+        assert fields["retry_trackers"] == ["BLU"]
+        assert fields["tracker_status"] == {"BLU": "FAILED", "ATH": "SUCCESS"}
+        assert fields["next_attempt_at"] > datetime.datetime.now().isoformat()
+
+    @pytest.mark.parametrize(
+        ("upload_attempt", "min_delay", "max_delay"),
+        [
+            pytest.param(1, 30, 60, id="first_attempt"),
+            pytest.param(2, 60, 120, id="second_attempt"),
+            pytest.param(3, 120, 240, id="third_attempt"),
+            pytest.param(10, 150, 300, id="delay_capped"),
+        ],
+    )
+    def test_retry_policy_exponential_backoff_with_jitter(
+        self, upload_attempt, min_delay, max_delay
+    ):
+        retry_policy = RetryPolicy(max_attempts=3, base_delay=60, max_delay=300)
+        for _ in range(20):
+            assert (
+                min_delay <= retry_policy.get_delay(upload_attempt) <= max_delay
+            )
+
+    def test_resume_scheduled_retry(self, reupload_manager, mocker):
+        update_fields = mocker.patch("modules.cache.Cache.update_fields")
+        cached_data = {
+            "hash": "info_hash",
+            "status": "RETRY_SCHEDULED",
+            "retry_stage": "TRACKER_UPLOAD",
+            "retry_trackers": ["BLU"],
+            "tracker_status": {"BLU": "FAILED", "ATH": "SUCCESS"},
+        }
+        assert reupload_manager.resume_scheduled_retry(cached_data) == {
+            "retry_stage": "TRACKER_UPLOAD",
+            "retry_trackers": ["BLU"],
+            "tracker_status": {"BLU": "FAILED", "ATH": "SUCCESS"},
+        }
+        assert cached_data["status"] == TorrentStatus.PENDING
+        update_fields.assert_called_once_with(
+            "ReUpload::Torrent::info_hash", {"status": "PENDING"}
+        )
+
+    def test_resume_without_scheduled_retry(self, reupload_manager, mocker):
+        update_fields = mocker.patch("modules.cache.Cache.update_fields")
+        assert (
+            reupload_manager.resume_scheduled_retry(
+                {"hash": "info_hash", "status": "PENDING"}
+            )
+            is None
+        )
+        update_fields.assert_not_called()
+
+    def test_torrent_status_considers_previous_attempts(
+        self, reupload_manager, mocker
+    ):
+        mocker.patch("modules.cache.Cache.save")
+        update_fields = mocker.patch("modules.cache.Cache.update_fields")
+        reupload_manager.update_jobs_and_torrent_status(
+            "info_hash",
+            {"BLU": (TrackerUploadStatus.SUCCESS, {})},
+            {"BLU": "FAILED", "ATH": "DUPE"},
+        )
+        update_fields.assert_called_once_with(
+            "ReUpload::Torrent::info_hash", {"status": "FAILED"}
+        )
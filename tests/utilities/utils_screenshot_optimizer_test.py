@@ -0,0 +1,127 @@
+from pathlib import Path
+
+import pytest
+
+from utilities.utils_screenshot_optimizer import GGBotScreenshotOptimizer
+
+
+def _optimizer_env_side_effects(
+    lossy_fallback="False", ptpimg_max_image_size_mb="0.0001"  # ~100 bytes
+):
+    def _side_effect(param, default=None):
+        if param == "screenshot_optimization":
+            return "True"
+        if param == "screenshot_lossy_fallback":
+            return lossy_fallback
+        if param == "ptpimg_max_image_size_mb":
+            return ptpimg_max_image_size_mb
+        return default
+
+    return _side_effect
+
+
+def _fake_ffmpeg(sizes):
+    """FFmpeg replacement that writes an output of the size configured for its extension"""
+
+    class _FFmpeg:
+        def __init__(self, *, global_options, inputs, outputs):
+            self.outputs = outputs
+
+        def run(self):
+            for output in self.outputs:
+                Path(output).write_bytes(b"0" * sizes[Path(output).suffix])
+
+    return _FFmpeg
+
+
+@pytest.fixture
+def screenshot(tmp_path):
+    screenshot = tmp_path / "screenshot.png"
+    screenshot.write_bytes(b"0" * 1000)
+    yield str(screenshot)
+
+
+def test_optimization_disabled(screenshot, mocker):
+    ffmpeg = mocker.patch("utilities.utils_screenshot_optimizer.FFmpeg")
+    optimizer = GGBotScreenshotOptimizer()
+    assert optimizer.optimize([screenshot]) == [screenshot]
+    ffmpeg.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("optimized_size", "expected_size"),
+    [
+        pytest.param(400, 400, id="smaller_screenshot_replaces_original"),
+        pytest.param(1200, 1000, id="larger_screenshot_is_discarded"),
+    ],
+)
+def test_lossless_recompression(
+    screenshot, mocker, optimized_size, expected_size
+):
+    mocker.patch("os.getenv", side_effect=_optimizer_env_side_effects())
+    mocker.patch("shutil.which", return_value=None)
+    mocker.patch(
+        "utilities.utils_screenshot_optimizer.FFmpeg",
+        _fake_ffmpeg({".png": optimized_size}),
+    )
+    optimizer = GGBotScreenshotOptimizer(2)
+    assert optimizer.optimize([screenshot]) == [screenshot]
+    assert Path(screenshot).stat().st_size == expected_size
+    # temporary re-encoded screenshot is always removed
+    assert not Path(f"{screenshot}.optimized.png").exists()
+
+
+def test_lossy_fallback_for_large_screenshots(screenshot, tmp_path, mocker):
+    mocker.patch(
+        "os.getenv",
+        side_effect=_optimizer_env_side_effects(lossy_fallback="True"),
+    )
+    mocker.patch("shutil.which", return_value=None)
+    mocker.patch(
+        "utilities.utils_screenshot_optimizer.FFmpeg",
+        _fake_ffmpeg({".png": 900, ".jpg": 50}),
+    )
+    small_screenshot = tmp_path / "small.png"
+    small_screenshot.write_bytes(b"0" * 50)
+    optimizer = GGBotScreenshotOptimizer()
+    assert optimizer.optimize([screenshot, str(small_screenshot)]) == [
+        screenshot,
+        str(small_screenshot),
+    ]
+    assert optimizer.fit_to_image_host(
+        "ptpimg", [screenshot, str(small_screenshot)]
+    ) == [str(tmp_path / "screenshot.jpg"), str(small_screenshot)]
+
+
+def test_lossy_fallback_only_for_image_hosts_with_size_limit(tmp_path, mocker):
+    mocker.patch(
+        "os.getenv",
+        side_effect=_optimizer_env_side_effects(
+            lossy_fallback="True", ptpimg_max_image_size_mb=None
+        ),
+    )
+    mocker.patch(
+        "utilities.utils_screenshot_optimizer.FFmpeg",
+        _fake_ffmpeg({".jpg": 1000}),
+    )
+    screenshot = tmp_path / "screenshot.png"
+    with open(screenshot, "wb") as file:
+        file.truncate(15 * 1024 * 1024)
+    optimizer = GGBotScreenshotOptimizer()
+
+    # ptpimg has no size limit, while imgbox accepts images only upto 10 MB
+    assert optimizer.fit_to_image_host("ptpimg", [str(screenshot)]) == [
+        str(screenshot)
+    ]
+    assert optimizer.fit_to_image_host("imgbox", [str(screenshot)]) == [
+        str(tmp_path / "screenshot.jpg")
+    ]
+
+
+def test_failed_optimization_uploads_original(screenshot, mocker):
+    mocker.patch("os.getenv", side_effect=_optimizer_env_side_effects())
+    mocker.patch("shutil.which", return_value="/usr/bin/oxipng")
+    run = mocker.patch("subprocess.run", side_effect=OSError("oxipng crashed"))
+    assert GGBotScreenshotOptimizer().optimize([screenshot]) == [screenshot]
+    assert run.call_args.args[0][-1] == screenshot
+    assert Path(screenshot).stat().st_size == 1000
@@ -14,11 +14,17 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import pytest
-
+import shlex
+import threading
 from pathlib import Path
 
-from utilities.utils_screenshots import GGBotScreenshotManager
+import pytest
+from ffmpy import FFRuntimeError
+
+from utilities.utils_screenshots import (
+    GGBotScreenshotManager,
+    _is_on_network_storage,
+)
 
 working_folder = Path(__file__).resolve().parent.parent.parent
 media_path = "tests/resources/media"
@@ -135,3 +141,354 @@ def screenshot_side_effect_pixhost(key, default=None):
     if key == "pixhost_api_key":
         return "leave_blank"
     return default
+
+
+def screenshot_side_effect_3(key, default=None):
+    if key == "num_of_screenshots":
+        return "3"
+    if key == "img_host_1":
+        return "DUMMY"
+    return default
+
+
+@pytest.fixture
+def screenshot_manager(mocker):
+    mocker.patch("os.getenv", side_effect=screenshot_side_effect_3)
+    yield GGBotScreenshotManager(
+        duration="600000",
+        torrent_title="GGBotUploadAssistant",
+        upload_media="/media/Some Movie.mkv",
+        skip_screenshots=False,
+        base_path=f"{working_folder}/{media_path}",
+        hash_prefix=hash_prefix,
+    )
+
+
+def _create_screenshots(timestamp_outfile_tuple):
+    for _, output_file in timestamp_outfile_tuple:
+        Path(output_file).touch()
+
+
+def test_all_screenshots_taken_with_single_ffmpeg_process(
+    screenshot_manager, mocker
+):
+    ffmpeg = mocker.patch("utilities.utils_screenshots.FFmpeg")
+    ffmpeg.return_value.run.side_effect = lambda: _create_screenshots(
+        timestamp_outfile_tuple
+    )
+    run_ffmpeg = mocker.patch.object(GGBotScreenshotManager, "_run_ffmpeg")
+    timestamp_outfile_tuple = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:01:15", "00:02:30", "00:03:45"]
+    )
+
+    screenshot_manager._generate_screenshots(timestamp_outfile_tuple)
+
+    ffmpeg.assert_called_once()
+    global_options = shlex.split(ffmpeg.call_args.kwargs["global_options"])
+    # media is opened once per timestamp, with each input seeking to its timestamp
+    assert global_options.count("/media/Some Movie.mkv") == 3
+    assert global_options[global_options.index("-ss") + 1] == "00:01:15"
+    outputs = ffmpeg.call_args.kwargs["outputs"]
+    # each screenshot is written along with the thumbnail used to score it
+    assert list(outputs.keys()) == [
+        output
+        for _, output_file in timestamp_outfile_tuple
+        for output in (output_file, f"{output_file}.thumb.gray")
+    ]
+    assert [options[1] for options in outputs.values()] == [
+        "0:v:0",
+        "0:v:0",
+        "1:v:0",
+        "1:v:0",
+        "2:v:0",
+        "2:v:0",
+    ]
+    run_ffmpeg.assert_not_called()
+
+
+def test_existing_screenshots_are_not_taken_again(screenshot_manager, mocker):
+    ffmpeg = mocker.patch("utilities.utils_screenshots.FFmpeg")
+    run_ffmpeg = mocker.patch.object(GGBotScreenshotManager, "_run_ffmpeg")
+    timestamp_outfile_tuple = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:01:15", "00:02:30"]
+    )
+    _create_screenshots(timestamp_outfile_tuple[:1])
+
+    screenshot_manager._generate_screenshots(timestamp_outfile_tuple)
+
+    # single pending screenshot doesn't need the multi input process
+    ffmpeg.assert_not_called()
+    run_ffmpeg.assert_called_once_with(
+        upload_media="/media/Some Movie.mkv",
+        timestamp="00:02:30",
+        output_file=timestamp_outfile_tuple[1][1],
+        seek_mode="accurate",
+    )
+
+
+def test_fallback_to_screenshots_one_by_one(screenshot_manager, mocker):
+    timestamp_outfile_tuple = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:01:15", "00:02:30", "00:03:45"]
+    )
+
+    def _failed_run():
+        # partially written screenshot
+        _create_screenshots(timestamp_outfile_tuple[:1])
+        raise FFRuntimeError("ffmpeg", 1, b"", b"")
+
+    ffmpeg = mocker.patch("utilities.utils_screenshots.FFmpeg")
+    ffmpeg.return_value.run.side_effect = _failed_run
+    run_ffmpeg = mocker.patch.object(GGBotScreenshotManager, "_run_ffmpeg")
+
+    screenshot_manager._generate_screenshots(timestamp_outfile_tuple)
+
+    assert sorted(
+        call.kwargs["timestamp"] for call in run_ffmpeg.call_args_list
+    ) == ["00:01:15", "00:02:30", "00:03:45"]
+
+
+def test_screenshots_taken_in_parallel(screenshot_manager, mocker):
+    # all the ffmpeg processes waits for each other, hence this completes only when they run at the same time
+    barrier = threading.Barrier(3, timeout=5)
+    run_ffmpeg = mocker.patch.object(
+        GGBotScreenshotManager,
+        "_run_ffmpeg",
+        side_effect=lambda **kwargs: barrier.wait(),
+    )
+    screenshot_manager.screenshot_workers = 3
+    timestamp_outfile_tuple = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:01:15", "00:02:30", "00:03:45"]
+    )
+
+    screenshot_manager._generate_screenshots_individually(
+        timestamp_outfile_tuple
+    )
+
+    assert run_ffmpeg.call_count == 3
+
+
+def test_fast_seek_snaps_to_nearest_keyframe(screenshot_manager, mocker):
+    ffprobe = mocker.patch("utilities.utils_screenshots.FFprobe")
+    ffprobe.return_value.run.return_value = (
+        b"70.070000,K__\n72.000000,___\n80.080000,K__\n"
+        b"150.150000,K__\nN/A,K__\n",
+        b"",
+    )
+    ffmpeg = mocker.patch("utilities.utils_screenshots.FFmpeg")
+    ffmpeg.return_value.run.side_effect = lambda: _create_screenshots(
+        timestamp_outfile_tuple
+    )
+    screenshot_manager.seek_mode = "fast"
+    timestamp_outfile_tuple = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:01:15", "00:02:30"]
+    )
+
+    screenshot_manager._generate_screenshots(timestamp_outfile_tuple)
+
+    global_options = ffprobe.call_args.kwargs["global_options"]
+    assert (
+        global_options[global_options.index("-read_intervals") + 1]
+        == "00:01:15%+10,00:02:30%+10"
+    )
+    assert screenshot_manager.seek_timestamps == {
+        "00:01:15": "70.071",
+        "00:02:30": "150.151",
+    }
+    ffmpeg_options = shlex.split(ffmpeg.call_args.kwargs["global_options"])
+    # only the keyframes are decoded
+    assert ffmpeg_options.count("-noaccurate_seek") == 2
+    assert ffmpeg_options.count("nokey") == 2
+    assert "-itsoffset" not in ffmpeg_options
+    assert [
+        ffmpeg_options[index + 1]
+        for index, option in enumerate(ffmpeg_options)
+        if option == "-ss"
+    ] == ["70.071", "150.151"]
+    # screenshots are still named after the requested timestamps
+    assert all(
+        Path(output_file).is_file()
+        for _, output_file in timestamp_outfile_tuple
+    )
+
+
+def test_fast_seek_without_keyframes(screenshot_manager, mocker):
+    mocker.patch(
+        "utilities.utils_screenshots.FFprobe",
+        side_effect=FFRuntimeError("ffprobe", 1, b"", b""),
+    )
+    run_ffmpeg = mocker.patch.object(GGBotScreenshotManager, "_run_ffmpeg")
+    screenshot_manager.seek_mode = "fast"
+    timestamp_outfile_tuple = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:01:15"]
+    )
+
+    screenshot_manager._generate_screenshots(timestamp_outfile_tuple)
+
+    # seeks to the keyframe before the timestamp
+    run_ffmpeg.assert_called_once_with(
+        upload_media="/media/Some Movie.mkv",
+        timestamp="00:01:15",
+        output_file=timestamp_outfile_tuple[0][1],
+        seek_mode="fast",
+    )
+
+
+def _write_thumbnail(output_file, pixels):
+    Path(output_file).touch()
+    Path(f"{output_file}.thumb.gray").write_bytes(bytes(pixels))
+
+
+# thumbnails (36x32) of frames with details, a black frame and a fade
+DETAILED_FRAME = [(x * 7 + y * 3) % 256 for y in range(32) for x in range(36)]
+OTHER_DETAILED_FRAME = [
+    (x * 40 + y * y * 5) % 256 for y in range(32) for x in range(36)
+]
+BLACK_FRAME = [5] * (36 * 32)
+FADE_FRAME = [120 + (x % 2) for y in range(32) for x in range(36)]
+
+
+@pytest.mark.parametrize(
+    ("bad_frame", "reason"),
+    [
+        pytest.param(BLACK_FRAME, "black frame", id="black_frame"),
+        pytest.param(FADE_FRAME, "fade or solid frame", id="fade"),
+        pytest.param(DETAILED_FRAME, "duplicate", id="duplicate_frame"),
+    ],
+)
+def test_bad_screenshots_are_nudged(
+    screenshot_manager, mocker, bad_frame, reason
+):
+    timestamp_outfile_tuple = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:01:15", "00:02:30"]
+    )
+    _write_thumbnail(timestamp_outfile_tuple[0][1], DETAILED_FRAME)
+    _write_thumbnail(timestamp_outfile_tuple[1][1], bad_frame)
+    generate_screenshots = mocker.patch.object(
+        screenshot_manager,
+        "_generate_screenshots",
+        side_effect=lambda pending: _write_thumbnail(
+            pending[0][1], OTHER_DETAILED_FRAME
+        ),
+    )
+
+    screenshots = screenshot_manager._reject_bad_screenshots(
+        timestamp_outfile_tuple
+    )
+
+    nudged_screenshot = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:02:40"]
+    )[0]
+    assert screenshots == [timestamp_outfile_tuple[0], nudged_screenshot]
+    generate_screenshots.assert_called_once_with([nudged_screenshot])
+    # rejected screenshot is removed, so that it is not uploaded later
+    assert not Path(timestamp_outfile_tuple[1][1]).exists()
+    assert not Path(f"{timestamp_outfile_tuple[1][1]}.thumb.gray").exists()
+
+
+def test_nudging_limited_by_attempts(screenshot_manager, mocker):
+    timestamp_outfile_tuple = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:01:15"]
+    )
+    _write_thumbnail(timestamp_outfile_tuple[0][1], BLACK_FRAME)
+    generate_screenshots = mocker.patch.object(
+        screenshot_manager,
+        "_generate_screenshots",
+        side_effect=lambda pending: _write_thumbnail(
+            pending[0][1], BLACK_FRAME
+        ),
+    )
+
+    screenshots = screenshot_manager._reject_bad_screenshots(
+        timestamp_outfile_tuple
+    )
+
+    # nudged by 10, 20 and 30 seconds from the previous timestamp
+    assert [
+        call.args[0][0][0] for call in generate_screenshots.call_args_list
+    ] == [
+        "00:01:25",
+        "00:01:45",
+        "00:02:15",
+    ]
+    assert [timestamp for timestamp, _ in screenshots] == ["00:02:15"]
+
+
+def test_screenshots_without_thumbnails_are_accepted(
+    screenshot_manager, mocker
+):
+    timestamp_outfile_tuple = screenshot_manager._get_timestamp_outfile_tuple(
+        ["00:01:15", "00:02:30"]
+    )
+    _create_screenshots(timestamp_outfile_tuple)
+    generate_screenshots = mocker.patch.object(
+        screenshot_manager, "_generate_screenshots"
+    )
+    assert (
+        screenshot_manager._reject_bad_screenshots(timestamp_outfile_tuple)
+        == timestamp_outfile_tuple
+    )
+    generate_screenshots.assert_not_called()
+
+
+MOUNTS = (
+    "/dev/sda1 / ext4 rw,relatime 0 0\n"
+    "seedbox:/data /mnt/remote nfs4 rw,relatime 0 0\n"
+    "remote: /mnt/remote/rclone\\040drive fuse.rclone rw 0 0\n"
+    "/dev/sdb1 /mnt/remote/local ext4 rw 0 0\n"
+)
+
+
+@pytest.mark.parametrize(
+    ("path", "expected"),
+    [
+        pytest.param("/home/user/movie.mkv", False, id="local_disk"),
+        pytest.param("/mnt/remote/movie.mkv", True, id="nfs"),
+        pytest.param(
+            "/mnt/remote/rclone drive/movie.mkv", True, id="escaped_mount"
+        ),
+        pytest.param(
+            "/mnt/remote/local/movie.mkv", False, id="local_inside_nfs"
+        ),
+        pytest.param("/mnt/remote_2/movie.mkv", False, id="similar_prefix"),
+    ],
+)
+def test_is_on_network_storage(path, expected, mocker):
+    mocker.patch("builtins.open", mocker.mock_open(read_data=MOUNTS))
+    mocker.patch("os.path.realpath", side_effect=lambda p: p)
+    assert _is_on_network_storage(path) is expected
+
+
+@pytest.mark.parametrize(
+    ("configured_workers", "network_storage", "expected"),
+    [
+        pytest.param("0", False, 16, id="cpu_count"),
+        pytest.param("4", False, 4, id="configured_workers"),
+        pytest.param("0", True, 2, id="network_storage_cap"),
+        pytest.param("1", True, 1, id="configured_below_network_cap"),
+    ],
+)
+def test_screenshot_workers(
+    configured_workers, network_storage, expected, mocker
+):
+    mocker.patch(
+        "os.getenv",
+        side_effect=lambda key, default=None: {
+            "num_of_screenshots": "3",
+            "img_host_1": "DUMMY",
+            "screenshot_workers": configured_workers,
+        }.get(key, default),
+    )
+    mocker.patch("os.cpu_count", return_value=16)
+    mocker.patch(
+        "utilities.utils_screenshots._is_on_network_storage",
+        return_value=network_storage,
+    )
+    screenshot_manager = GGBotScreenshotManager(
+        duration="600000",
+        torrent_title="GGBotUploadAssistant",
+        upload_media="/media/Some Movie.mkv",
+        skip_screenshots=False,
+        base_path=f"{working_folder}/{media_path}",
+        hash_prefix=hash_prefix,
+    )
+    assert screenshot_manager.screenshot_workers == expected
@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from modules.exceptions.exception import GGBotUploaderException
+from utilities.utils_stage_graph import GGBotStageGraph
+
+
+class TestGGBotStageGraph:
+    def test_results_of_all_stages_are_returned(self):
+        graph = GGBotStageGraph(name="test")
+        graph.add_stage("first", lambda _: 1)
+        graph.add_stage(
+            "second", lambda results: results["first"] + 1, ["first"]
+        )
+        graph.add_stage(
+            "third",
+            lambda results: results["first"] + results["second"],
+            ["first", "second"],
+        )
+        assert graph.run() == {"first": 1, "second": 2, "third": 3}
+
+    def test_independent_stages_run_concurrently(self):
+        # both stages wait for each other, hence this completes only when they run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+        graph = GGBotStageGraph(name="test")
+        graph.add_stage("first", lambda _: barrier.wait() is not None)
+        graph.add_stage("second", lambda _: barrier.wait() is not None)
+        assert graph.run() == {"first": True, "second": True}
+
+    def test_stages_run_one_after_another_with_single_worker(self):
+        running = []
+        overlaps = []
+
+        def _stage(_):
+            overlaps.append(len(running))
+            running.append(1)
+            running.pop()
+
+        graph = GGBotStageGraph(name="test", max_workers=1)
+        for name in ["first", "second", "third"]:
+            graph.add_stage(name, _stage)
+        graph.run()
+        assert overlaps == [0, 0, 0]
+
+    def test_unknown_dependency(self):
+        graph = GGBotStageGraph(name="test")
+        with pytest.raises(GGBotUploaderException):
+            graph.add_stage("first", lambda _: 1, ["unknown"])
+
+    def test_failed_stage_stops_dependent_stages(self):
+        executed = []
+
+        def _fail(_):
+            raise ValueError("stage failed")
+
+        graph = GGBotStageGraph(name="test")
+        graph.add_stage("first", _fail)
+        graph.add_stage(
+            "second", lambda _: executed.append("second"), ["first"]
+        )
+        with pytest.raises(ValueError):
+            graph.run()
+        assert graph.is_cancelled is True
+        assert executed == []
+
+    def test_cancelled_graph_does_not_start_new_stages(self):
+        graph = GGBotStageGraph(name="test")
+        graph.add_stage("first", lambda _: graph.cancel())
+        graph.add_stage("second", lambda _: 2, ["first"])
+        assert graph.run() == {"first": None}
+        assert graph.is_cancelled is True
+
+    def test_running_stages_can_observe_cancellation(self):
+        started = threading.Event()
+
+        def _long_running_stage(_):
+            started.set()
+            for _ in range(500):
+                if graph.is_cancelled:
+                    return "cancelled"
+                threading.Event().wait(0.01)
+            return "completed"
+
+        def _cancelling_stage(_):
+            started.wait(timeout=5)
+            graph.cancel()
+            return False
+
+        graph = GGBotStageGraph(name="test")
+        graph.add_stage("long_running", _long_running_stage)
+        graph.add_stage("cancelling", _cancelling_stage)
+        assert graph.run() == {
+            "long_running": "cancelled",
+            "cancelling": False,
+        }
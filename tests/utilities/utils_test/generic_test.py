@@ -277,6 +277,47 @@ def test_retain_leftover_files_for_resume():
     )
 
 
+def test_delete_only_own_leftover_files_when_isolated():
+    # here we'll be working with /tests/working_folder/temp_upload/
+    # other uploads being processed in parallel must not lose their data
+    computed_working_folder = utils.delete_leftover_files(
+        working_folder=f"{working_folder}{temp_working_dir}",
+        file="some_name",
+        resume=False,
+        isolated=True,
+    )
+    hash = utils.get_hash("some_name")
+    assert computed_working_folder == f"{hash}/"
+    assert (
+        Path(f"{working_folder}{temp_working_dir}/temp_upload/{hash}").is_dir()
+        == True
+    )
+    assert (
+        Path(
+            f"{working_folder}{temp_working_dir}/temp_upload/{hash}/torrent1.torrent"
+        ).is_file()
+        == False
+    )
+    assert (
+        Path(
+            f"{working_folder}{temp_working_dir}/temp_upload/{hash}/screenshots/image1.png"
+        ).is_file()
+        == False
+    )
+    assert (
+        Path(
+            f"{working_folder}{temp_working_dir}/temp_upload/torrent1.torrent"
+        ).is_file()
+        == True
+    )
+    assert (
+        Path(
+            f"{working_folder}{temp_working_dir}/temp_upload/{hash}/screenshots/"
+        ).is_dir()
+        == True
+    )
+
+
 def test_create_temp_upload_itself():
     # here we'll be working with /tests/working_folder/temp_upload/
     # this will be the folder that the actual code will be dealing with
@@ -0,0 +1,163 @@
+import json
+import os
+import threading
+import time
+
+import pytest
+
+from modules.torrent_generator import piece_hasher
+
+from modules.torrent_generator.piece_size_policy import GGBotPieceSizePolicy
+from modules.torrent_generator.torf_generator import GGBOTTorrent
+import utilities.utils as utils
+from utilities import utils_torrent
+from utilities.utils_torrent import GGBotTorrentCreator, get_piece_size_policies
+
+PIECE_SIZE = 16 * 1024
+
+
+@pytest.fixture
+def media(tmp_path, mocker):
+    mocker.patch(
+        "os.getenv",
+        side_effect=lambda key, default=None: "False"
+        if key == "piece_hash_cache"
+        else default,
+    )
+    # working folder of the torrent is created by the uploader
+    (tmp_path / "temp_upload" / "prefix").mkdir(parents=True)
+    media = tmp_path / "movie.mkv"
+    media.write_bytes(os.urandom(10 * PIECE_SIZE + 5))
+    return str(media)
+
+
+def _create_torrent(tmp_path, media, tracker, piece_size_policies):
+    GGBotTorrentCreator(
+        media=media,
+        tracker=tracker,
+        working_folder=str(tmp_path),
+        hash_prefix="prefix/",
+        torrent_title="movie",
+        announce_urls=[f"https://{tracker}/announce"],
+        source=tracker,
+        use_mktorrent=False,
+        piece_size_policies=piece_size_policies,
+    ).generate_dot_torrent()
+    return GGBOTTorrent.read(
+        f"{tmp_path}/temp_upload/prefix/{tracker}-movie.torrent"
+    )
+
+
+def test_get_piece_size_policies(tmp_path):
+    (tmp_path / "tracker_one.json").write_text(
+        json.dumps({"torrent_piece_size": {"max": 8388608}})
+    )
+    (tmp_path / "tracker_two.json").write_text(json.dumps({}))
+
+    policies = get_piece_size_policies(
+        ["TR1", "TR2"],
+        f"{tmp_path}/",
+        {"tr1": "tracker_one", "tr2": "tracker_two"},
+    )
+
+    assert policies["TR1"].max_piece_size == 8388608
+    assert policies["TR2"].max_piece_size is None
+
+
+def test_media_hashed_once_for_trackers_with_common_piece_size(
+    tmp_path, media, mocker
+):
+    policies = {
+        "TR1": GGBotPieceSizePolicy(max_piece_size=4 * PIECE_SIZE),
+        "TR2": GGBotPieceSizePolicy(min_piece_size=4 * PIECE_SIZE),
+    }
+    hasher = mocker.spy(
+        piece_hasher.GGBotPieceHasher,
+        "hash_all_pieces",
+    )
+
+    first_torrent = _create_torrent(tmp_path, media, "TR1", policies)
+    second_torrent = _create_torrent(tmp_path, media, "TR2", policies)
+
+    assert hasher.call_count == 1
+    assert first_torrent.piece_size == 4 * PIECE_SIZE
+    assert second_torrent.piece_size == 4 * PIECE_SIZE
+    assert second_torrent.source == "TR2"
+    assert utils_torrent._torrent_creation_locks == {}
+
+
+def test_conflicting_piece_sizes_hashed_in_one_pass(tmp_path, media, mocker):
+    policies = {
+        "TR1": GGBotPieceSizePolicy(max_piece_size=PIECE_SIZE),
+        "TR2": GGBotPieceSizePolicy(min_piece_size=4 * PIECE_SIZE),
+    }
+    hasher = mocker.spy(
+        piece_hasher.GGBotPieceHasher,
+        "hash_all_pieces",
+    )
+
+    first_torrent = _create_torrent(tmp_path, media, "TR1", policies)
+    second_torrent = _create_torrent(tmp_path, media, "TR2", policies)
+
+    assert hasher.call_count == 1
+    assert first_torrent.piece_size == PIECE_SIZE
+    assert second_torrent.piece_size == 4 * PIECE_SIZE
+    assert second_torrent.trackers == [["https://TR2/announce"]]
+    assert second_torrent.verify(media) is True
+
+
+def test_watch_folder_moves_only_the_tracker_torrents(tmp_path, media, mocker):
+    policies = {
+        "TR1": GGBotPieceSizePolicy(max_piece_size=PIECE_SIZE),
+        "TR2": GGBotPieceSizePolicy(min_piece_size=4 * PIECE_SIZE),
+    }
+    _create_torrent(tmp_path, media, "TR1", policies)
+    _create_torrent(tmp_path, media, "TR2", policies)
+    watch_folder = tmp_path / "watch"
+    watch_folder.mkdir()
+    watch_folder_config = {
+        "enable_post_processing": True,
+        "post_processing_mode": "WATCH_FOLDER",
+        "translation_needed": False,
+        "dot_torrent_move_location": str(watch_folder),
+        "media_move_location": "",
+    }
+    mocker.patch(
+        "os.getenv",
+        side_effect=lambda key, default=None: watch_folder_config.get(
+            key, default
+        ),
+    )
+
+    utils.perform_post_processing(
+        {"type": "movie", "working_folder": "prefix/", "upload_media": media},
+        None,
+        str(tmp_path),
+        "TR2",
+    )
+
+    # torrent of the other piece size is left in the working folder
+    assert sorted(path.name for path in watch_folder.iterdir()) == [
+        "TR1-movie.torrent",
+        "TR2-movie.torrent",
+    ]
+
+
+def test_torrent_creation_lock_removed_once_released():
+    entered = threading.Event()
+
+    def _create_torrent_for_another_tracker():
+        with utils_torrent._torrent_creation_lock("prefix/"):
+            entered.set()
+
+    with utils_torrent._torrent_creation_lock("prefix/"):
+        thread = threading.Thread(target=_create_torrent_for_another_tracker)
+        thread.start()
+        while utils_torrent._torrent_creation_locks["prefix/"][1] < 2:
+            time.sleep(0.01)
+        # torrent of the same media is not created while the lock is held
+        assert entered.is_set() is False
+    thread.join(timeout=5)
+
+    assert entered.is_set() is True
+    assert utils_torrent._torrent_creation_locks == {}
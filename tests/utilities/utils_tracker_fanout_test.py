@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+from utilities.utils_tracker_fanout import (
+    GGBotRateLimiter,
+    GGBotTrackerLimiter,
+    run_for_trackers,
+)
+
+
+class TestGGBotRateLimiter:
+    def test_rate_limit_disabled(self, mocker):
+        sleep = mocker.patch("time.sleep")
+        rate_limiter = GGBotRateLimiter(0)
+        assert [rate_limiter.acquire() for _ in range(5)] == [0] * 5
+        sleep.assert_not_called()
+
+    def test_requests_are_spaced_out(self, mocker):
+        mocker.patch("time.monotonic", return_value=100.0)
+        sleep = mocker.patch("time.sleep")
+        rate_limiter = GGBotRateLimiter(30)
+        assert [rate_limiter.acquire() for _ in range(3)] == [0, 2.0, 4.0]
+        assert sleep.call_count == 2
+
+
+class TestGGBotTrackerLimiter:
+    def test_tracker_limits_from_config(self, mocker):
+        mocker.patch(
+            "os.getenv",
+            side_effect=lambda key, default=None: {
+                "BLU_MAX_CONCURRENT_REQUESTS": "2",
+                "BLU_REQUESTS_PER_MINUTE": "6",
+            }.get(key, default),
+        )
+        limiter = GGBotTrackerLimiter()
+        semaphore, rate_limiter = limiter._get_tracker_limits("blu")
+        assert semaphore._value == 2
+        assert rate_limiter.interval == 10
+        # limits are created only once for a tracker
+        assert limiter._get_tracker_limits("BLU")[0] is semaphore
+
+    def test_unlimited_tracker(self):
+        semaphore, rate_limiter = GGBotTrackerLimiter()._get_tracker_limits(
+            "ATH"
+        )
+        assert semaphore is None
+        assert rate_limiter.interval == 0
+
+    def test_concurrent_requests_per_tracker(self, mocker):
+        mocker.patch(
+            "os.getenv",
+            side_effect=lambda key, default=None: {
+                "BLU_MAX_CONCURRENT_REQUESTS": "1",
+            }.get(key, default),
+        )
+        limiter = GGBotTrackerLimiter()
+        in_request = threading.Event()
+        release_request = threading.Event()
+        blocked_request_completed = threading.Event()
+
+        def _first_request():
+            with limiter.request("BLU"):
+                in_request.set()
+                release_request.wait(timeout=5)
+
+        def _second_request():
+            with limiter.request("BLU"):
+                blocked_request_completed.set()
+
+        first = threading.Thread(target=_first_request)
+        first.start()
+        in_request.wait(timeout=5)
+        second = threading.Thread(target=_second_request)
+        second.start()
+        # other trackers are not affected by the limits of BLU
+        with limiter.request("ATH"):
+            pass
+        assert blocked_request_completed.wait(timeout=0.2) is False
+        release_request.set()
+        first.join()
+        second.join()
+        assert blocked_request_completed.is_set() is True
+
+
+@pytest.mark.parametrize(
+    "max_workers",
+    [
+        pytest.param(1, id="sequential"),
+        pytest.param(None, id="sequential_no_workers"),
+        pytest.param(4, id="concurrent"),
+    ],
+)
+def test_run_for_trackers_preserves_tracker_order(max_workers):
+    trackers = ["BLU", "ATH", "TELLY", "R4E"]
+    results = run_for_trackers(
+        trackers, lambda tracker: tracker.lower(), max_workers
+    )
+    assert list(results.items()) == [
+        ("BLU", "blu"),
+        ("ATH", "ath"),
+        ("TELLY", "telly"),
+        ("R4E", "r4e"),
+    ]
+
+
+def test_run_for_trackers_concurrently():
+    # all the trackers waits for each other, hence this completes only when they are processed concurrently
+    barrier = threading.Barrier(3, timeout=5)
+    results = run_for_trackers(
+        ["BLU", "ATH", "TELLY"], lambda _: barrier.wait() is not None, 3
+    )
+    assert results == {"BLU": True, "ATH": True, "TELLY": True}
+
+
+def test_run_for_trackers_failure_after_all_trackers():
+    processed = []
+
+    def _upload(tracker):
+        if tracker == "BLU":
+            raise ValueError("upload failed")
+        processed.append(tracker)
+        return True
+
+    with pytest.raises(ValueError):
+        run_for_trackers(["BLU", "ATH", "TELLY"], _upload, 2)
+    assert sorted(processed) == ["ATH", "TELLY"]
@@ -263,13 +263,16 @@ def has_user_provided_type(user_type):
         return False
 
 
-def delete_leftover_files(working_folder, file, resume=False):
+def delete_leftover_files(working_folder, file, resume=False, isolated=False):
     """
     Used to remove temporary files (mediainfo.txt, description.txt, screenshots) from the previous upload
     Func is called at the start of each run to make sure there are no mix up with wrong screenshots being uploaded etc.
 
     Not much significance when using the containerized solution, however if the `temp_upload` folder in container
     is mapped to a docker volume / host path, then clearing would be best. Hence keeping this method.
+
+    When `isolated` is set, only the sub folder belonging to `file` is cleared. This is used when multiple uploads are
+    being processed in parallel and the data of the other uploads must not be touched.
     """
     # We need these folders to store things like screenshots, .torrent & description files.
     # So create them now if they don't exist
@@ -281,7 +284,7 @@ def delete_leftover_files(working_folder, file, resume=False):
             logging.info(
                 f"[Utils] Resume flag provided by user. Preserving the contents of the folder: {working_dir}"
             )
-        else:
+        elif not isolated:
             files = glob.glob(f"{working_dir}*")
             for f in files:
                 if os.path.isfile(f):
@@ -292,7 +295,7 @@ def delete_leftover_files(working_folder, file, resume=False):
                 f"[Utils] Deleted the contents of the folder: {working_dir}"
             )
     else:
-        os.mkdir(working_dir)
+        os.makedirs(working_dir, exist_ok=True)
 
     if UploaderConfig().READABLE_TEMP_DIR:
         files = (
@@ -309,6 +312,12 @@ def delete_leftover_files(working_folder, file, resume=False):
         unique_hash = get_hash(file)
     unique_hash = f"{unique_hash}/"
 
+    if isolated and not resume and Path(f"{working_dir}{unique_hash}").is_dir():
+        shutil.rmtree(f"{working_dir}{unique_hash}")
+        logging.info(
+            f"[Utils] Deleted the contents of the folder: {working_dir}{unique_hash}"
+        )
+
     if not Path(f"{working_dir}{unique_hash}").is_dir():
         os.mkdir(f"{working_dir}{unique_hash}")
 
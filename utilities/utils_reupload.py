@@ -17,9 +17,13 @@
 import datetime
 import json
 import logging
+import os
+import random
+import socket
+import threading
 import uuid
 from pprint import pformat
-from typing import Dict, Tuple, Union, Any
+from typing import Dict, Tuple, Union, Any, List, Set, Optional
 
 from modules.cache import Cache
 from modules.config import ReUploaderConfig
@@ -29,7 +33,6 @@ from utilities.utils import get_and_validate_configured_trackers
 TORRENT_DB_KEY_PREFIX = "ReUpload::Torrent"
 JOB_REPO_DB_KEY_PREFIX = "ReUpload::JobRepository"
 TMDB_DB_KEY_PREFIX = "MetaData::TMDB"
-UPLOAD_RETRY_LIMIT = 3
 
 
 class TrackerUploadStatus:
@@ -49,6 +52,8 @@ class TorrentStatus:
     PENDING = "PENDING"
     DUPE_CHECK_FAILED = "DUPE_CHECK_FAILED"
     READY_FOR_PROCESSING = "READY_FOR_PROCESSING"
+    # the torrent failed due to a transient error and will be processed again after `next_attempt_at`
+    RETRY_SCHEDULED = "RETRY_SCHEDULED"
     KNOWN_FAILURE = "KNOWN_FAILURE"
     # unrecoverable error. Needs to check the log or console to resolve them. Not automatic fix available
     UNKNOWN_FAILURE = "UNKNOWN_FAILURE"
@@ -59,6 +64,7 @@ class TorrentFailureStatus:
     TMDB_IDENTIFICATION_FAILED = "TMDB_IDENTIFICATION_FAILED"
     DUPE_CHECK_FAILED = "DUPE_CHECK_FAILED"
     TYPE_AND_BASIC_INFO_ERROR = "TYPE_AND_BASIC_INFO_ERROR"
+    TRACKER_UPLOAD_FAILED = "TRACKER_UPLOAD_FAILED"
     UNKNOWN_FAILURE = "UNKNOWN_FAILURE"
 
 
@@ -67,6 +73,7 @@ torrent_failure_messages = {
     TorrentFailureStatus.TMDB_IDENTIFICATION_FAILED: "Failed to identify proper TMDb ID",
     TorrentFailureStatus.TYPE_AND_BASIC_INFO_ERROR: "Type and basic info of the torrent could not be identified.",
     TorrentFailureStatus.DUPE_CHECK_FAILED: "A dupe of this torrent already exists in tracker",
+    TorrentFailureStatus.TRACKER_UPLOAD_FAILED: "Upload to one or more trackers failed",
     TorrentFailureStatus.UNKNOWN_FAILURE: "Unknown Failure. Please get in touch with dev :(",
 }
 
@@ -75,15 +82,91 @@ client_labels_for_failure = {
     TorrentFailureStatus.TMDB_IDENTIFICATION_FAILED: "TMDB_IDENTIFICATION_FAILED",
     TorrentFailureStatus.TYPE_AND_BASIC_INFO_ERROR: "GGBOT_ERROR_TYPE_AND_BASIC",
     TorrentFailureStatus.DUPE_CHECK_FAILED: "DUPE_CHECK_FAILED",
+    TorrentFailureStatus.TRACKER_UPLOAD_FAILED: "GGBOT_ERROR_TRACKER_UPLOAD",
     TorrentFailureStatus.UNKNOWN_FAILURE: "GGBOT_ERROR_UNKNOWN_FAILURE",
 }
 
 
+class RetryStage:
+    # the whole processing is done again. screenshots and .torrent files from the failed attempt are reused
+    PROCESSING = "PROCESSING"
+    # only the uploads to the trackers that failed are attempted again
+    TRACKER_UPLOAD = "TRACKER_UPLOAD"
+
+
+class RetryPolicy:
+    """
+    Retry policy for a failure. The delay between the attempts grows exponentially from `base_delay` and is capped at
+    `max_delay`. A random jitter is added to the delay so that torrents that failed together are not retried together.
+    """
+
+    def __init__(self, *, max_attempts: int, base_delay: int, max_delay: int):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def can_retry(self, upload_attempt: int) -> bool:
+        return upload_attempt < self.max_attempts
+
+    def get_delay(self, upload_attempt: int) -> float:
+        delay = min(
+            self.max_delay, self.base_delay * (2 ** max(upload_attempt - 1, 0))
+        )
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
 class JobStatus:
     SUCCESS = "SUCCESS"
     FAILED = "FAILED"
 
 
+class TorrentLease:
+    """
+    Keeps the lease of a torrent claimed by this instance alive while the torrent is being processed.
+    The lease is renewed periodically from a background thread and released when the processing completes.
+    If a renewal fails (the lease expired and was stolen by another instance), the lease is marked as lost.
+    """
+
+    def __init__(self, manager: "AutoReUploaderManager", info_hash: str):
+        self.manager = manager
+        self.info_hash = info_hash
+        # renewing thrice during the lease duration, so that a single delayed heartbeat doesn't lose the lease
+        self.interval: float = max(manager.lease_duration / 3, 1)
+        self._stopped = threading.Event()
+        self._lost = threading.Event()
+        self._heartbeat = threading.Thread(
+            target=self._renew_periodically,
+            name=f"LeaseHeartbeat-{info_hash[:8]}",
+            daemon=True,
+        )
+
+    @property
+    def is_lost(self) -> bool:
+        return self._lost.is_set()
+
+    def _renew_periodically(self):
+        while not self._stopped.wait(self.interval):
+            if not self.manager.renew_lease(self.info_hash):
+                logging.error(
+                    f"[ReUploadUtils] Lost the lease of torrent `{self.info_hash}`. "
+                    "Torrent might be processed by another instance"
+                )
+                self._lost.set()
+                return
+
+    def __enter__(self) -> "TorrentLease":
+        self._heartbeat.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stopped.set()
+        self._heartbeat.join()
+        self.manager.active_leases.pop(self.info_hash, None)
+        if not self.is_lost:
+            self.manager.release_lease(self.info_hash)
+        return False
+
+
 class AutoReUploaderManager:
     def __init__(self, *, cache: Cache, client: TorrentClient):
         self.cache = cache
@@ -97,6 +180,34 @@ class AutoReUploaderManager:
             reuploader_config.TORRENT_CLIENT_PATH
         )
         self.uploader_accessible_path: bool = reuploader_config.UPLOADER_PATH
+        # when the torrent client supports a change feed, only the torrents that were added / changed since the
+        # previous poll are fetched from the client. `tracked_torrents` holds the latest view of the torrents that
+        # matches the reupload label and `settled_torrents` the ones that cannot be processed anymore.
+        self.use_change_feed: bool = (
+            reuploader_config.CLIENT_CHANGE_FEED and client.supports_change_feed
+        )
+        self.tracked_torrents: Dict[str, Dict] = {}
+        self.settled_torrents: Set[str] = set()
+        self.upload_retry_limit: int = reuploader_config.UPLOAD_RETRY_LIMIT
+        # only the failures mentioned here are retried automatically.
+        # rest of the failures (dupes, tmdb identification etc.) needs intervention from the user
+        retry_policy = RetryPolicy(
+            max_attempts=self.upload_retry_limit,
+            base_delay=reuploader_config.RETRY_BACKOFF_BASE_SECONDS,
+            max_delay=reuploader_config.RETRY_BACKOFF_MAX_SECONDS,
+        )
+        self.retry_policies: Dict[str, RetryPolicy] = {
+            TorrentFailureStatus.TRACKER_UPLOAD_FAILED: retry_policy,
+            TorrentFailureStatus.UNKNOWN_FAILURE: retry_policy,
+        }
+        # torrents are claimed with a lease before processing, so that multiple instances of the reuploader can
+        # share the same client and cache without uploading a torrent more than once.
+        self.instance_id: str = (
+            reuploader_config.REUPLOADER_INSTANCE_ID
+            or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        )
+        self.lease_duration: int = reuploader_config.LEASE_DURATION_SECONDS
+        self.active_leases: Dict[str, TorrentLease] = {}
 
     @staticmethod
     def get_unique_id():
@@ -112,16 +223,131 @@ class AutoReUploaderManager:
         return cached_data is not None and cached_data not in [TorrentStatus.READY_FOR_PROCESSING, TorrentStatus.PENDING]
 
         """
+        return self._is_status_un_processable(
+            self.get_torrent_status(info_hash)
+        )
+
+    @staticmethod
+    def _is_status_un_processable(torrent_status) -> bool:
         # torrents in pending or ready for processing can be uploaded again.
         # torrents that are in other statuses needs no more processing
-        torrent_status = self.get_torrent_status(info_hash)
         # status that are not mentioned below cannot be processed again by the uploader automatically
         return torrent_status is not None and torrent_status not in [
             TorrentStatus.READY_FOR_PROCESSING,
             TorrentStatus.PENDING,
+            TorrentStatus.RETRY_SCHEDULED,
         ]
 
-    def initialize_torrent(self, torrent: Dict) -> Dict:
+    @staticmethod
+    def _is_retry_due(cached_status: Dict) -> bool:
+        # torrents with scheduled retries are processed only once their next attempt is due
+        return (
+            cached_status.get("status") != TorrentStatus.RETRY_SCHEDULED
+            or cached_status.get("next_attempt_at") is None
+            or cached_status["next_attempt_at"]
+            <= datetime.datetime.now().isoformat()
+        )
+
+    @staticmethod
+    def _now_utc() -> str:
+        # leases are compared across instances, hence they are always in utc irrespective of the server timezone
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def _get_lease_expiry(self) -> str:
+        return (
+            datetime.datetime.now(datetime.timezone.utc)
+            + datetime.timedelta(seconds=self.lease_duration)
+        ).isoformat()
+
+    def _is_leased_by_other_instance(self, cached_status: Dict) -> bool:
+        return (
+            cached_status.get("lease_owner") is not None
+            and cached_status["lease_owner"] != self.instance_id
+            and cached_status.get("lease_expires_at") is not None
+            and cached_status["lease_expires_at"] > self._now_utc()
+        )
+
+    def _get_claimable_filter(self) -> Dict:
+        # a torrent can be claimed when no one holds its lease, when the lease is already held by this instance or
+        # when the lease has expired (the instance holding it crashed or got stuck)
+        return {
+            "status": {
+                "$in": [
+                    TorrentStatus.READY_FOR_PROCESSING,
+                    TorrentStatus.PENDING,
+                    TorrentStatus.RETRY_SCHEDULED,
+                ]
+            },
+            "$or": [
+                {"lease_owner": None},
+                {"lease_owner": self.instance_id},
+                {"lease_expires_at": {"$lt": self._now_utc()}},
+            ],
+        }
+
+    def claim_torrent(self, info_hash: str) -> Optional[Dict]:
+        """
+        Claims the lease of an already cached torrent for this instance. The check and the claim are performed
+        atomically, hence only one instance can claim a torrent at a time.
+        Returns the latest cached data of the torrent or None if the torrent cannot be claimed.
+        """
+        cached_data = self.cache.update_fields_if(
+            f"{TORRENT_DB_KEY_PREFIX}::{info_hash}",
+            self._get_claimable_filter(),
+            {
+                "lease_owner": self.instance_id,
+                "lease_expires_at": self._get_lease_expiry(),
+            },
+        )
+        if cached_data is None:
+            logging.info(
+                f"[ReUploadUtils] Torrent `{info_hash}` is claimed by another instance or cannot be processed anymore"
+            )
+            return None
+        logging.info(
+            f"[ReUploadUtils] Claimed torrent `{info_hash}` for instance `{self.instance_id}`"
+        )
+        return cached_data
+
+    def renew_lease(self, info_hash: str) -> bool:
+        """Extends the lease of the torrent. Returns False if the lease is no longer held by this instance."""
+        return (
+            self.cache.update_fields_if(
+                f"{TORRENT_DB_KEY_PREFIX}::{info_hash}",
+                {"lease_owner": self.instance_id},
+                {"lease_expires_at": self._get_lease_expiry()},
+            )
+            is not None
+        )
+
+    def release_lease(self, info_hash: str) -> bool:
+        return (
+            self.cache.update_fields_if(
+                f"{TORRENT_DB_KEY_PREFIX}::{info_hash}",
+                {"lease_owner": self.instance_id},
+                {"lease_owner": None, "lease_expires_at": None},
+            )
+            is not None
+        )
+
+    def lease(self, info_hash: str) -> TorrentLease:
+        """
+        Returns a context manager that keeps the lease of the claimed torrent alive and releases it on exit.
+        Usage: `with manager.lease(info_hash): ...`
+        """
+        torrent_lease = TorrentLease(self, info_hash)
+        self.active_leases[info_hash] = torrent_lease
+        return torrent_lease
+
+    def is_lease_lost(self, info_hash: str) -> bool:
+        torrent_lease = self.active_leases.get(info_hash)
+        return torrent_lease is not None and torrent_lease.is_lost
+
+    def initialize_torrent(self, torrent: Dict) -> Optional[Dict]:
+        """
+        Initializes the torrent in cache, with its lease claimed by this instance.
+        Returns None if the torrent was already initialized (by another instance).
+        """
         logging.debug(
             f'[AutoReUploaderManager::initialize_torrent_data] Initializing torrent data in cache for {torrent["name"]}'
         )
@@ -135,11 +361,18 @@ class AutoReUploaderManager:
             "movie_db": "None",
             "date_created": datetime.datetime.now().isoformat(),
             "possible_matches": "None",
+            "lease_owner": self.instance_id,
+            "lease_expires_at": self._get_lease_expiry(),
         }
         # when this attempt becomes greater than 3, the torrent will be marked as UNKNOWN_FAILURE
-        self.cache.save(
+        if not self.cache.insert_if_absent(
             f'{TORRENT_DB_KEY_PREFIX}::{torrent["hash"]}', init_data
-        )
+        ):
+            logging.info(
+                f'[AutoReUploaderManager::initialize_torrent_data] Torrent {torrent["name"]} has already been '
+                "initialized by another instance"
+            )
+            return None
         logging.debug(
             f'[AutoReUploaderManager::initialize_torrent_data] Successfully initialized torrent data in cache for {torrent["name"]} '
         )
@@ -149,46 +382,127 @@ class AutoReUploaderManager:
         logging.info(
             f'[ReUploadUtils] Updating upload attempt for torrent {torrent["name"]}'
         )
-        torrent["upload_attempt"] = torrent["upload_attempt"] + 1
-        if torrent["upload_attempt"] > UPLOAD_RETRY_LIMIT:
+        # the attempt is incremented in cache atomically, so that parallel workers never lose an attempt
+        upload_attempt = self.cache.increment(
+            f'{TORRENT_DB_KEY_PREFIX}::{torrent["hash"]}', "upload_attempt"
+        )
+        torrent["upload_attempt"] = (
+            upload_attempt
+            if upload_attempt is not None
+            else torrent["upload_attempt"] + 1
+        )
+        if torrent["upload_attempt"] > self.upload_retry_limit:
             torrent["status"] = TorrentStatus.UNKNOWN_FAILURE
-        self.cache.save(f'{TORRENT_DB_KEY_PREFIX}::{torrent["hash"]}', torrent)
-        return torrent["upload_attempt"] > UPLOAD_RETRY_LIMIT
+            self.update_torrent_status(torrent["hash"], torrent["status"])
+        return torrent["upload_attempt"] > self.upload_retry_limit
+
+    def schedule_retry(
+        self,
+        info_hash: str,
+        failure_status: str,
+        upload_attempt: int,
+        *,
+        retry_stage: str,
+        retry_trackers: Optional[List[str]] = None,
+        tracker_statuses: Optional[Dict[str, str]] = None,
+    ) -> bool:
+        """
+        Schedules the next attempt of the torrent as per the retry policy of the `failure_status`.
+        `retry_stage` is the stage from which the processing needs to be resumed in the next attempt.
+
+        Returns False if the failure cannot be retried (no retry policy or attempts exhausted).
+        """
+        retry_policy = self.retry_policies.get(failure_status)
+        if retry_policy is None or not retry_policy.can_retry(upload_attempt):
+            logging.info(
+                f"[ReUploadUtils] Failure `{failure_status}` of torrent `{info_hash}` cannot be retried. "
+                f"Upload attempt: {upload_attempt}"
+            )
+            return False
+
+        delay = retry_policy.get_delay(upload_attempt)
+        next_attempt_at = datetime.datetime.now() + datetime.timedelta(
+            seconds=delay
+        )
+        fields = {
+            "status": TorrentStatus.RETRY_SCHEDULED,
+            "next_attempt_at": next_attempt_at.isoformat(),
+            "retry_stage": retry_stage,
+            "retry_failure": failure_status,
+            "failure_message": torrent_failure_messages[failure_status],
+        }
+        if retry_trackers is not None:
+            fields["retry_trackers"] = retry_trackers
+        if tracker_statuses is not None:
+            fields["tracker_status"] = tracker_statuses
+        logging.info(
+            f"[ReUploadUtils] Scheduling retry of torrent `{info_hash}` from stage `{retry_stage}` after "
+            f"{delay:.0f} seconds due to failure `{failure_status}`"
+        )
+        self.update_torrent_fields(info_hash, fields)
+        return True
+
+    def resume_scheduled_retry(self, cached_data: Dict) -> Optional[Dict]:
+        """
+        Moves a torrent with a scheduled retry back to PENDING, so that it can be processed again.
+        Returns the details of the retry (stage, trackers and tracker statuses of the previous attempt) or None if
+        no retry was scheduled for the torrent.
+        """
+        if cached_data.get("status") != TorrentStatus.RETRY_SCHEDULED:
+            return None
+        retry_context = {
+            "retry_stage": cached_data.get(
+                "retry_stage", RetryStage.PROCESSING
+            ),
+            "retry_trackers": cached_data.get("retry_trackers", []),
+            "tracker_status": cached_data.get("tracker_status", {}),
+        }
+        logging.info(
+            f'[ReUploadUtils] Resuming torrent `{cached_data["hash"]}` from stage `{retry_context["retry_stage"]}`'
+        )
+        cached_data["status"] = TorrentStatus.PENDING
+        self.update_torrent_status(cached_data["hash"], TorrentStatus.PENDING)
+        return retry_context
 
     def get_cached_data(self, info_hash: str) -> Dict:
         data = self.cache.get(f"{TORRENT_DB_KEY_PREFIX}::{info_hash}")
         return data[0] if data is not None and len(data) > 0 else None
 
     def update_torrent_status(self, info_hash, status):
-        # data will always be present
-        existing_data = self.cache.get(f"{TORRENT_DB_KEY_PREFIX}::{info_hash}")[
-            0
-        ]
-        logging.debug(
-            f'[ReUploadUtils] Updating status of `{info_hash}` from `{existing_data["status"]}` to `{status}`'
-        )
-        existing_data["status"] = status
-        self.cache.save(f"{TORRENT_DB_KEY_PREFIX}::{info_hash}", existing_data)
-        return existing_data  # returning data for testing
+        return self.update_torrent_fields(info_hash, {"status": status})
 
     def update_torrent_field(self, info_hash, field, data, is_json):
-        # data will always be present
-        existing_data = self.cache.get(f"{TORRENT_DB_KEY_PREFIX}::{info_hash}")[
-            0
-        ]
         if is_json and data is not None:
             data = json.dumps(data)
-        if field not in existing_data:
-            logging.debug(
-                f"[ReUploadUtils] Setting `{field}` of `{info_hash}` to `{data}`"
-            )
-        else:
-            logging.debug(
-                f"[ReUploadUtils] Updating `{field}` of `{info_hash}` from `{existing_data[field]}` to `{data}`"
-            )
-        existing_data[field] = data
-        self.cache.save(f"{TORRENT_DB_KEY_PREFIX}::{info_hash}", existing_data)
-        return existing_data  # returning data for testing
+        return self.update_torrent_fields(info_hash, {field: data})
+
+    def update_torrent_fields(self, info_hash, fields: Dict):
+        # only the provided fields are updated in cache, rest of the document is left untouched
+        logging.debug(f"[ReUploadUtils] Updating `{info_hash}` with `{fields}`")
+        self.cache.update_fields(
+            f"{TORRENT_DB_KEY_PREFIX}::{info_hash}", fields
+        )
+        return fields  # returning data for testing
+
+    def _transition_torrent_status(self, info_hash, transitions):
+        """
+        Moves the status of the torrent to the first applicable target status from `transitions`.
+        `transitions` is a list of tuples of (current statuses, target status). Every transition is performed atomically
+        in cache, so concurrent uploads of the same torrent cannot overwrite each others status.
+
+        Returns the target status if a transition was made, otherwise the current status from cache.
+        """
+        for current_statuses, target_status in transitions:
+            if self.cache.set_if_status(
+                f"{TORRENT_DB_KEY_PREFIX}::{info_hash}",
+                current_statuses,
+                {"status": target_status},
+            ):
+                logging.debug(
+                    f"[ReUploadUtils] Updated status of `{info_hash}` from one of `{current_statuses}` to `{target_status}`"
+                )
+                return target_status
+        return self.get_torrent_status(info_hash)
 
     def insert_into_job_repo(self, job_repo_entry):
         logging.debug(
@@ -314,12 +628,77 @@ class AutoReUploaderManager:
             )
         return external_db_id
 
-    def get_processable_torrents(self):
+    def _list_torrents_from_change_feed(self) -> List[Dict]:
+        changes = self.client.list_torrent_changes()
+        if changes["full_update"]:
+            logging.info(
+                "[ReUploadUtils] Received full list of torrents from client. Resetting the tracked torrents"
+            )
+            self.tracked_torrents = {}
+            self.settled_torrents = set()
+
+        for info_hash in changes["removed"]:
+            self.tracked_torrents.pop(info_hash, None)
+            self.settled_torrents.discard(info_hash)
+
+        for torrent in changes["torrents"]:
+            self.tracked_torrents[torrent["hash"]] = torrent
+            # the torrent has changed in the client, hence we need to check its status in cache once again
+            self.settled_torrents.discard(torrent["hash"])
+
+        logging.info(
+            f"[ReUploadUtils] Torrent changes from client: {len(changes['torrents'])} added / changed, "
+            f"{len(changes['removed'])} removed. Tracking {len(self.tracked_torrents)} torrents"
+        )
+        return [
+            torrent
+            for info_hash, torrent in self.tracked_torrents.items()
+            if info_hash not in self.settled_torrents
+        ]
+
+    def _get_cached_statuses(self, torrents: List[Dict]) -> Dict[str, Dict]:
+        """
+        Fetches the status (along with the next attempt time of scheduled retries and the lease) of all the torrents
+        from cache in a single query. Torrents which are not present in cache will not be present in the returned dict.
+        """
+        if len(torrents) == 0:
+            return {}
+        cached_statuses = self.cache.get_by_hashes(
+            TORRENT_DB_KEY_PREFIX,
+            [torrent["hash"] for torrent in torrents],
+            fields=[
+                "hash",
+                "status",
+                "next_attempt_at",
+                "lease_owner",
+                "lease_expires_at",
+            ],
+        )
+        return {data["hash"]: data for data in cached_statuses}
+
+    def _get_cached_documents(self, info_hashes: List[str]) -> Dict[str, Dict]:
+        if len(info_hashes) == 0:
+            return {}
+        cached_documents = self.cache.get_by_hashes(
+            TORRENT_DB_KEY_PREFIX, info_hashes
+        )
+        return {data["hash"]: data for data in cached_documents}
+
+    def get_processable_torrents(self) -> List[Tuple[Dict, Union[Dict, None]]]:
+        """
+        Lists the completed torrents from the client that can be reuploaded.
+
+        Returns a list of tuples of the torrent from client and the data present for the torrent in cache.
+        The cached data will be None for torrents that hasn't been processed before.
+        """
         logging.info(
             "[ReUploadUtils] Listing latest torrents status from client"
         )
         # listing all the torrents that needs to be re-uploaded
-        torrents = self.client.list_torrents()
+        if self.use_change_feed:
+            torrents = self._list_torrents_from_change_feed()
+        else:
+            torrents = self.client.list_torrents()
 
         # Attributes present in the torrent list
         # "category", "completed", "content_path", "hash", "name", "save_path", "size", "tracker"
@@ -333,19 +712,50 @@ class AutoReUploaderManager:
         )
         torrents = list(
             filter(
-                lambda torrent: not self.is_un_processable_data_present_in_cache(
-                    torrent["hash"]
-                ),
-                filter(
-                    lambda torrent: torrent["completed"] == torrent["size"],
-                    torrents,
-                ),
+                lambda torrent: torrent["completed"] == torrent["size"],
+                torrents,
             )
         )
+        # status of all the completed torrents are fetched in one go, instead of querying the cache for each torrent
+        cached_statuses = self._get_cached_statuses(torrents)
+        processable_torrents = []
+        for torrent in torrents:
+            cached_status = cached_statuses.get(torrent["hash"], {})
+            if self._is_status_un_processable(cached_status.get("status")):
+                if self.use_change_feed:
+                    # no need to look up this torrent in cache again, until it changes in the client
+                    self.settled_torrents.add(torrent["hash"])
+                continue
+            if not self._is_retry_due(cached_status):
+                logging.debug(
+                    f'[ReUploadUtils] Next attempt of torrent {torrent["hash"]} is scheduled at '
+                    f'{cached_status["next_attempt_at"]}'
+                )
+                continue
+            if self._is_leased_by_other_instance(cached_status):
+                logging.debug(
+                    f'[ReUploadUtils] Torrent {torrent["hash"]} is being processed by instance '
+                    f'{cached_status["lease_owner"]}'
+                )
+                continue
+            processable_torrents.append(torrent)
+
+        # full cached data is fetched only for the torrents that will be processed.
+        # these are passed down to the processing so that the cache need not be queried again.
+        cached_documents = self._get_cached_documents(
+            [
+                torrent["hash"]
+                for torrent in processable_torrents
+                if torrent["hash"] in cached_statuses
+            ]
+        )
         logging.info(
-            f"[ReUploadUtils] Total number of completed torrents that needs to be reuploaded are {len(torrents)}"
+            f"[ReUploadUtils] Total number of completed torrents that needs to be reuploaded are {len(processable_torrents)}"
         )
-        return torrents
+        return [
+            (torrent, cached_documents.get(torrent["hash"]))
+            for torrent in processable_torrents
+        ]
 
     def translate_torrent_path(self, torrent_path: str) -> str:
         if not self.perform_path_translation:
@@ -413,35 +823,24 @@ class AutoReUploaderManager:
         return original_upload_to_trackers
 
     def mark_successful_upload(self, torrent, tracker, upload_response):
-        # getting the overall status of the torrent from cache
-        torrent_status = self.get_torrent_status(torrent["hash"])
-
         # this is the first tracker for this torrent
         self._save_job_repo_entry(
             torrent["hash"], tracker, JobStatus.SUCCESS, upload_response
         )
 
-        if (
-            torrent_status == TorrentStatus.PENDING
-            or torrent_status == TorrentStatus.READY_FOR_PROCESSING
-        ):
-            # updating the overall status of the torrent
-            self.update_torrent_field(
-                torrent["hash"], "status", TorrentStatus.SUCCESS, False
-            )
-            return TorrentStatus.SUCCESS
-        elif torrent_status == TorrentStatus.FAILED:
-            # updating the overall status of the torrent
-            self.update_torrent_field(
-                torrent["hash"],
-                "status",
-                TorrentStatus.PARTIALLY_SUCCESSFUL,
-                False,
-            )
-            return TorrentStatus.PARTIALLY_SUCCESSFUL
-        # here the status could be SUCCESS or PARTIALLY_SUCCESSFUL, We don't need to make any changes to this status
+        # updating the overall status of the torrent
+        # if the status is SUCCESS or PARTIALLY_SUCCESSFUL, We don't need to make any changes to this status
         # for testing purpose we just return the status from cache
-        return torrent_status
+        return self._transition_torrent_status(
+            torrent["hash"],
+            [
+                (
+                    [TorrentStatus.PENDING, TorrentStatus.READY_FOR_PROCESSING],
+                    TorrentStatus.SUCCESS,
+                ),
+                ([TorrentStatus.FAILED], TorrentStatus.PARTIALLY_SUCCESSFUL),
+            ],
+        )
 
     def _save_job_repo_entry(self, info_hash, tracker, status, upload_response):
         job_repo_entry = {
@@ -454,46 +853,34 @@ class AutoReUploaderManager:
         self.insert_into_job_repo(job_repo_entry)
 
     def mark_failed_upload(self, torrent, tracker, upload_response):
-        # getting the overall status of the torrent from cache
-        torrent_status = self.get_torrent_status(torrent["hash"])
-
-        # this is the first tracker for this torrent
+        # inserting the torrent->tracker data to job_repository
         self._save_job_repo_entry(
             torrent["hash"], tracker, JobStatus.FAILED, upload_response
         )
 
-        # inserting the torrent->tracker data to job_repository
-        if (
-            torrent_status == TorrentStatus.PENDING
-            or torrent_status == TorrentStatus.READY_FOR_PROCESSING
-        ):
-            # updating the overall status of the torrent
-            self.update_torrent_field(
-                torrent["hash"], "status", TorrentStatus.FAILED, False
-            )
-            return TorrentStatus.FAILED
-        elif torrent_status == TorrentStatus.SUCCESS:
-            # updating the overall status of the torrent
-            self.update_torrent_field(
-                torrent["hash"],
-                "status",
-                TorrentStatus.PARTIALLY_SUCCESSFUL,
-                False,
-            )
-            return TorrentStatus.PARTIALLY_SUCCESSFUL
-        # here status could be FAILED or PARTIALLY_SUCCESSFUL, we don't need to change this status
+        # updating the overall status of the torrent
+        # if the status is FAILED or PARTIALLY_SUCCESSFUL, we don't need to change this status
         # for testing purpose we just return the status obtained from cache
-        return torrent_status
+        return self._transition_torrent_status(
+            torrent["hash"],
+            [
+                (
+                    [TorrentStatus.PENDING, TorrentStatus.READY_FOR_PROCESSING],
+                    TorrentStatus.FAILED,
+                ),
+                ([TorrentStatus.SUCCESS], TorrentStatus.PARTIALLY_SUCCESSFUL),
+            ],
+        )
 
     def mark_torrent_failure(
         self, info_hash: str, status: TorrentFailureStatus
     ):
-        self.update_torrent_field(info_hash, "status", status, False)
-        self.update_torrent_field(
+        self.update_torrent_fields(
             info_hash,
-            "failure_message",
-            torrent_failure_messages[status],
-            False,
+            {
+                "status": status,
+                "failure_message": torrent_failure_messages[status],
+            },
         )
         self.client.update_torrent_category(
             info_hash=info_hash, category_name=client_labels_for_failure[status]
@@ -505,6 +892,7 @@ class AutoReUploaderManager:
         tracker_status_map: Dict[
             str, Tuple[TrackerUploadStatus, Union[Dict, Any]]
         ],
+        previous_tracker_statuses: Optional[Dict[str, str]] = None,
     ) -> None:
         # saving tracker status to job repo
         for trkr, response in tracker_status_map.items():
@@ -512,16 +900,39 @@ class AutoReUploaderManager:
                 info_hash, trkr, JobStatus.FAILED, response[1]
             )
 
-        torrent_status = self.get_client_label_for_torrent(tracker_status_map)
+        # status of the torrent considers the trackers from the previous attempts as well
+        torrent_status = self.get_client_label_for_torrent(
+            self.merge_tracker_statuses(
+                previous_tracker_statuses, tracker_status_map
+            )
+        )
         if torrent_status is None:
             torrent_status = TorrentStatus.SUCCESS
         self.update_torrent_field(info_hash, "status", torrent_status, False)
 
+    @staticmethod
+    def merge_tracker_statuses(
+        previous_tracker_statuses: Optional[Dict[str, str]],
+        tracker_status_map: Dict[
+            str, Tuple[TrackerUploadStatus, Union[Dict, Any]]
+        ],
+    ) -> Dict[str, Tuple[TrackerUploadStatus, Union[Dict, Any]]]:
+        """
+        Merges the tracker statuses from the previous attempts of the torrent with the statuses of the current attempt.
+        Statuses of the current attempt takes precedence.
+        """
+        merged_status_map = {
+            trkr: (status, None)
+            for trkr, status in (previous_tracker_statuses or {}).items()
+        }
+        merged_status_map.update(tracker_status_map)
+        return merged_status_map
+
     @staticmethod
     def get_client_label_for_torrent(
         tracker_status_map: Dict[
             str, Tuple[TrackerUploadStatus, Union[Dict, Any]]
-        ]
+        ],
     ) -> Union[str, None]:
         if all(
             status[0] == TrackerUploadStatus.SUCCESS
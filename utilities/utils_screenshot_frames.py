@@ -0,0 +1,114 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import statistics
+from pathlib import Path
+from typing import List, Optional
+
+# each screenshot is accompanied by a tiny grayscale thumbnail (raw luma bytes) written by the same ffmpeg process.
+# frames are scored from the thumbnail, hence the full size png never needs to be decoded.
+# thumbnail is 9x8 blocks of 4x4 pixels, which is what the difference hash needs.
+THUMBNAIL_WIDTH = 36
+THUMBNAIL_HEIGHT = 32
+HASH_BLOCK_SIZE = 4
+THUMBNAIL_OUTPUT_OPTIONS = [
+    "-vf",
+    f"scale={THUMBNAIL_WIDTH}:{THUMBNAIL_HEIGHT},format=gray",
+    "-frames:v",
+    "1",
+    "-f",
+    "rawvideo",
+]
+
+# frames darker than this (average luma, 0 - 255) are considered black
+BLACK_FRAME_LUMINANCE = 20
+# frames with lesser variation than this (standard deviation of luma) are fades / solid colors
+FLAT_FRAME_DEVIATION = 4
+# frames whose hashes differ by at most these many bits (of 64) are near duplicates
+DUPLICATE_FRAME_DISTANCE = 4
+
+
+def get_thumbnail_path(screenshot: str) -> str:
+    return f"{screenshot}.thumb.gray"
+
+
+def _get_difference_hash(pixels: bytes) -> int:
+    # average of each 4x4 block, giving a 9x8 grid. Each bit tells whether a block is brighter than the next one
+    columns = THUMBNAIL_WIDTH // HASH_BLOCK_SIZE
+    rows = THUMBNAIL_HEIGHT // HASH_BLOCK_SIZE
+    blocks: List[List[float]] = [
+        [
+            statistics.fmean(
+                pixels[y * THUMBNAIL_WIDTH + x]
+                for y in range(
+                    row * HASH_BLOCK_SIZE, (row + 1) * HASH_BLOCK_SIZE
+                )
+                for x in range(
+                    column * HASH_BLOCK_SIZE, (column + 1) * HASH_BLOCK_SIZE
+                )
+            )
+            for column in range(columns)
+        ]
+        for row in range(rows)
+    ]
+    frame_hash = 0
+    for row in blocks:
+        for left, right in zip(row, row[1:]):
+            frame_hash = (frame_hash << 1) | int(left > right)
+    return frame_hash
+
+
+class GGBotFrameScore:
+    def __init__(self, pixels: bytes):
+        self.luminance: float = statistics.fmean(pixels)
+        self.deviation: float = statistics.pstdev(pixels, self.luminance)
+        self.frame_hash: int = _get_difference_hash(pixels)
+
+    @property
+    def is_black(self) -> bool:
+        return self.luminance < BLACK_FRAME_LUMINANCE
+
+    @property
+    def is_flat(self) -> bool:
+        return self.deviation < FLAT_FRAME_DEVIATION
+
+    def is_duplicate_of(self, other: "GGBotFrameScore") -> bool:
+        return (
+            bin(self.frame_hash ^ other.frame_hash).count("1")
+            <= DUPLICATE_FRAME_DISTANCE
+        )
+
+    def get_rejection_reason(
+        self, accepted_scores: List["GGBotFrameScore"]
+    ) -> Optional[str]:
+        if self.is_black:
+            return f"black frame (luminance {self.luminance:.1f})"
+        if self.is_flat:
+            return f"fade or solid frame (deviation {self.deviation:.1f})"
+        if any(self.is_duplicate_of(score) for score in accepted_scores):
+            return "duplicate of another screenshot"
+        return None
+
+
+def score_frame(screenshot: str) -> Optional[GGBotFrameScore]:
+    """Scores the screenshot from its thumbnail. None when the thumbnail is not available"""
+    thumbnail = Path(get_thumbnail_path(screenshot))
+    if not thumbnail.is_file():
+        return None
+    pixels = thumbnail.read_bytes()
+    if len(pixels) != THUMBNAIL_WIDTH * THUMBNAIL_HEIGHT:
+        return None
+    return GGBotFrameScore(pixels)
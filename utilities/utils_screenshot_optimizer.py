@@ -0,0 +1,187 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from ffmpy import FFmpeg
+from rich.console import Console
+
+from modules.config import ImageHostConfig, UploaderConfig
+
+console = Console()
+
+BYTES_IN_MB = 1024 * 1024
+# png encoder options of ffmpeg for the best lossless compression. ffmpeg doesn't filter the rows by default
+LOSSLESS_PNG_OPTIONS = ["-compression_level", "9", "-pred", "mixed"]
+# jpeg qualities tried (in order) when the screenshot doesn't fit the size target losslessly
+LOSSY_JPEG_QUALITIES = ["2", "4", "6"]
+
+
+def _get_size(path: str) -> int:
+    return os.path.getsize(path) if Path(path).is_file() else 0
+
+
+class GGBotScreenshotOptimizer:
+    """
+    Reduces the size of the screenshots before they are uploaded to the image hosts.
+
+    Screenshots are re-encoded losslessly (with `oxipng` when available, otherwise with the png encoder of ffmpeg)
+    and the re-encoded image replaces the original only when it is smaller.
+    When `screenshot_lossy_fallback` is enabled, screenshots that are still larger than the size limit
+    (`<image_host>_max_image_size_mb`) of the image host they are being uploaded to are converted to jpeg for that
+    image host. Image hosts without a size limit always receive the png. Keep it disabled for trackers that require
+    png screenshots.
+    """
+
+    def __init__(self, workers: int = 1):
+        uploader_config = UploaderConfig()
+        self.is_enabled: bool = uploader_config.SCREENSHOT_OPTIMIZATION
+        self.lossy_fallback: bool = uploader_config.SCREENSHOT_LOSSY_FALLBACK
+        self.workers = max(workers, 1)
+        self.oxipng = shutil.which("oxipng")
+
+    @staticmethod
+    def _get_size_target(image_host: str) -> Optional[int]:
+        size_limit = ImageHostConfig.IMAGE_HOST_MAX_IMAGE_SIZE_MB(image_host)
+        return None if size_limit is None else int(size_limit * BYTES_IN_MB)
+
+    def _recompress_losslessly(self, screenshot: str) -> None:
+        if self.oxipng is not None:
+            # oxipng writes the output only if it is smaller than the input
+            subprocess.run(
+                [self.oxipng, "-q", "-o", "2", "--strip", "safe", screenshot],
+                check=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            return
+
+        optimized_screenshot = f"{screenshot}.optimized.png"
+        try:
+            FFmpeg(
+                global_options="-loglevel panic -y",
+                inputs={screenshot: None},
+                outputs={optimized_screenshot: LOSSLESS_PNG_OPTIONS},
+            ).run()
+            if 0 < _get_size(optimized_screenshot) < _get_size(screenshot):
+                os.replace(optimized_screenshot, screenshot)
+        finally:
+            Path(optimized_screenshot).unlink(missing_ok=True)
+
+    @staticmethod
+    def _convert_to_jpeg(screenshot: str, size_target: int) -> str:
+        jpeg_screenshot = f"{os.path.splitext(screenshot)[0]}.jpg"
+        for quality in LOSSY_JPEG_QUALITIES:
+            FFmpeg(
+                global_options="-loglevel panic -y",
+                inputs={screenshot: None},
+                outputs={jpeg_screenshot: ["-q:v", quality]},
+            ).run()
+            if _get_size(jpeg_screenshot) < size_target:
+                break
+        logging.info(
+            f"[GGBotScreenshotOptimizer] Converted {screenshot} to jpeg since it exceeds the size target of "
+            f"{size_target} bytes"
+        )
+        return jpeg_screenshot
+
+    def _optimize_screenshot(self, screenshot: str) -> None:
+        try:
+            self._recompress_losslessly(screenshot)
+        except Exception as ex:
+            # original screenshot is uploaded when it cannot be optimized
+            logging.error(
+                f"[GGBotScreenshotOptimizer] Failed to optimize screenshot {screenshot}. Error: {ex}"
+            )
+
+    def _fit_screenshot(self, screenshot: str, size_target: int) -> str:
+        if _get_size(screenshot) < size_target:
+            return screenshot
+        try:
+            return self._convert_to_jpeg(screenshot, size_target)
+        except Exception as ex:
+            # image host gets the original screenshot, which it may still accept
+            logging.error(
+                f"[GGBotScreenshotOptimizer] Failed to convert screenshot {screenshot} to jpeg. Error: {ex}"
+            )
+            return screenshot
+
+    def fit_to_image_host(
+        self, image_host: str, screenshots: List[str]
+    ) -> List[str]:
+        """
+        Returns the screenshots to be uploaded to `image_host`, in the order of `screenshots`. Screenshots larger
+        than the size limit of the image host are converted to jpeg when `screenshot_lossy_fallback` is enabled.
+        """
+        size_target = self._get_size_target(image_host)
+        if (
+            not self.is_enabled
+            or not self.lossy_fallback
+            or size_target is None
+        ):
+            return screenshots
+        with ThreadPoolExecutor(
+            max_workers=min(self.workers, max(len(screenshots), 1)),
+            thread_name_prefix="ScreenshotOptimizer",
+        ) as executor:
+            return list(
+                executor.map(
+                    lambda screenshot: self._fit_screenshot(
+                        screenshot, size_target
+                    ),
+                    screenshots,
+                )
+            )
+
+    def optimize(self, screenshots: List[str]) -> List[str]:
+        """
+        Optimizes the screenshots losslessly (in place) and returns the paths of the screenshots to be uploaded, in
+        the order of `screenshots`.
+        """
+        if not self.is_enabled or len(screenshots) == 0:
+            return screenshots
+
+        start_time = time.perf_counter()
+        original_size = sum(_get_size(screenshot) for screenshot in screenshots)
+        with console.status("Optimizing screenshots.."):
+            with ThreadPoolExecutor(
+                max_workers=min(self.workers, len(screenshots)),
+                thread_name_prefix="ScreenshotOptimizer",
+            ) as executor:
+                list(executor.map(self._optimize_screenshot, screenshots))
+        optimized_size = sum(
+            _get_size(screenshot) for screenshot in screenshots
+        )
+        saved_bytes = original_size - optimized_size
+        duration = time.perf_counter() - start_time
+        logging.info(
+            f"[GGBotScreenshotOptimizer] Optimized {len(screenshots)} screenshots from {original_size} bytes to "
+            f"{optimized_size} bytes (saved {saved_bytes} bytes) in {duration:.2f} seconds"
+        )
+        console.print(
+            f"Optimized screenshots: saved {saved_bytes / BYTES_IN_MB:.2f} MB "
+            f"({saved_bytes * 100 / max(original_size, 1):.1f}%) in {duration:.2f} seconds\n",
+            style="sea_green3",
+            highlight=False,
+        )
+        return screenshots
@@ -16,29 +16,108 @@
 
 import json
 import logging
+import os
+import shlex
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Tuple, List, Dict
+from typing import Tuple, List, Dict, Optional
 
-from ffmpy import FFmpeg
+from ffmpy import FFmpeg, FFprobe
 from rich.console import Console
 from rich.progress import track
 
-from modules.config import UploaderConfig
+from modules.config import ImageHostConfig, UploaderConfig
 from modules.constants import (
     BB_CODE_IMAGES_PATH,
     URL_IMAGES_PATH,
     SCREENSHOTS_PATH,
     UPLOADS_COMPLETE_MARKER_PATH,
     SCREENSHOTS_RESULT_FILE_PATH,
+    SCREENSHOT_UPLOAD_CACHE,
 )
 from modules.image_hosts.image_host_manager import GGBotImageHostManager
+from modules.image_hosts.image_host_stats import GGBotImageHostStats
+from modules.image_hosts.image_upload_cache import GGBotImageUploadCache
 from modules.image_hosts.image_upload_status import GGBotImageUploadStatus
 from utilities.utils import normalize_for_system_path
+from utilities.utils_screenshot_frames import (
+    THUMBNAIL_OUTPUT_OPTIONS,
+    GGBotFrameScore,
+    get_thumbnail_path,
+    score_frame,
+)
+from utilities.utils_screenshot_optimizer import GGBotScreenshotOptimizer
 
 # For more control over rich terminal content, import and construct a Console object.
 console = Console()
 
+# options used for each of the screenshot outputs
+SCREENSHOT_OUTPUT_OPTIONS = [
+    "-vf",
+    "scale='max(sar,1)*iw':'max(1/sar,1)*ih'",
+    "-frames:v",
+    "1",
+    "-q:v",
+    "10",
+    "-pix_fmt",
+    "rgb24",
+]
+
+# in fast seek mode, keyframes are looked up within this many seconds after each screenshot timestamp
+KEYFRAME_SEARCH_WINDOW_SECONDS = 10
+# keyframes are seeked slightly after their timestamp, so that rounding doesn't land the seek on the previous keyframe
+KEYFRAME_SEEK_MARGIN_SECONDS = 0.001
+
+# file systems on which parallel reads are limited by `network_storage_screenshot_workers`
+NETWORK_FILE_SYSTEMS = {
+    "nfs",
+    "nfs4",
+    "cifs",
+    "smb3",
+    "smbfs",
+    "9p",
+    "glusterfs",
+    "ceph",
+    "davfs",
+    "fuse.sshfs",
+    "fuse.rclone",
+    "fuse.s3fs",
+    "fuse.davfs2",
+}
+
+
+def _is_on_network_storage(path: str) -> bool:
+    """Checks whether the `path` is on a network file system, based on its mount point in /proc/mounts"""
+    try:
+        with open("/proc/mounts") as mounts:
+            mount_entries = [line.split() for line in mounts]
+    except OSError:
+        # mount information is not available (non linux systems)
+        return False
+    path = os.path.realpath(path)
+    file_system, longest_mount_point = None, -1
+    for mount_entry in mount_entries:
+        if len(mount_entry) < 3:
+            continue
+        # spaces in mount points are escaped as octal in /proc/mounts
+        mount_point = mount_entry[1].replace("\\040", " ")
+        if (
+            path == mount_point
+            or path.startswith(f"{mount_point.rstrip('/')}/")
+        ) and len(mount_point) > longest_mount_point:
+            file_system, longest_mount_point = mount_entry[2], len(mount_point)
+    return file_system in NETWORK_FILE_SYSTEMS
+
+
+def _timestamp_to_seconds(timestamp: str) -> float:
+    seconds = 0.0
+    for part in timestamp.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
 
 def _get_ss_range(duration: int, num_of_screenshots: int) -> List[str]:
     # If no spoilers is enabled, then screenshots are taken from first half of the movie or tv show
@@ -78,9 +157,26 @@ class GGBotScreenshotManager:
         self.skip_screenshots = skip_screenshots
         self.upload_media = upload_media
         self.duration = duration
-        self.num_of_screenshots: int = UploaderConfig().NO_OF_SCREENSHOTS
+        uploader_config = UploaderConfig()
+        self.num_of_screenshots: int = uploader_config.NO_OF_SCREENSHOTS
+        self.screenshot_workers: int = self._get_screenshot_workers(
+            uploader_config
+        )
+        self.seek_mode: str = uploader_config.SCREENSHOT_SEEK_MODE
+        self.frame_rejection: bool = uploader_config.SCREENSHOT_FRAME_REJECTION
+        self.nudge_seconds: int = uploader_config.SCREENSHOT_NUDGE_SECONDS
+        self.nudge_attempts: int = uploader_config.SCREENSHOT_NUDGE_ATTEMPTS
+        # timestamp of the screenshot -> timestamp to seek to (nearest keyframe in fast seek mode)
+        self.seek_timestamps: Dict[str, str] = {}
         self.torrent_title = normalize_for_system_path(torrent_title)
-        self.image_host_manager = GGBotImageHostManager(self.torrent_title)
+        self.image_host_manager = GGBotImageHostManager(
+            self.torrent_title,
+            upload_cache=self._get_upload_cache(base_path),
+            host_stats=self._get_host_stats(base_path),
+        )
+        self.screenshot_optimizer = GGBotScreenshotOptimizer(
+            self.screenshot_workers
+        )
 
         self.bb_code_images_path = BB_CODE_IMAGES_PATH.format(
             base_path=base_path, sub_folder=hash_prefix
@@ -105,6 +201,35 @@ class GGBotScreenshotManager:
             f"[GGBotScreenshotManager::init] Using {upload_media} to generate screenshots"
         )
 
+    @staticmethod
+    def _get_upload_cache(base_path) -> Optional[GGBotImageUploadCache]:
+        if not ImageHostConfig().SCREENSHOT_UPLOAD_CACHE:
+            return None
+        return GGBotImageUploadCache(
+            SCREENSHOT_UPLOAD_CACHE.format(base_path=base_path)
+        )
+
+    @staticmethod
+    def _get_host_stats(base_path) -> Optional[GGBotImageHostStats]:
+        if ImageHostConfig().IMAGE_HOST_ORDERING != "adaptive":
+            return None
+        # stats are kept along with the cached uploads, in the same database
+        return GGBotImageHostStats(
+            SCREENSHOT_UPLOAD_CACHE.format(base_path=base_path)
+        )
+
+    def _get_screenshot_workers(self, uploader_config: UploaderConfig) -> int:
+        workers = uploader_config.SCREENSHOT_WORKERS or os.cpu_count() or 1
+        if _is_on_network_storage(self.upload_media):
+            logging.info(
+                f"[GGBotScreenshotManager::init] {self.upload_media} is on a network storage. Limiting parallel "
+                f"screenshots to {uploader_config.NETWORK_STORAGE_SCREENSHOT_WORKERS}"
+            )
+            workers = min(
+                workers, uploader_config.NETWORK_STORAGE_SCREENSHOT_WORKERS
+            )
+        return workers
+
     def _display_heading(self) -> None:
         console.line(count=2)
         console.rule("Screenshots", style="red", align="center")
@@ -169,38 +294,147 @@ class GGBotScreenshotManager:
         return Path(self.marker_path).is_file()
 
     @staticmethod
-    def _run_ffmpeg(*, upload_media, timestamp, output_file):
+    def _get_seek_options(timestamp, seek_mode="accurate") -> List[str]:
+        if seek_mode == "fast":
+            # seeks to the keyframe and decodes only that frame, instead of decoding up to the exact timestamp
+            return [
+                "-skip_frame",
+                "nokey",
+                "-noaccurate_seek",
+                "-ss",
+                timestamp,
+            ]
+        return ["-ss", timestamp, "-itsoffset", "-2"]
+
+    @staticmethod
+    def _get_screenshot_outputs(output_file, map_options=()) -> Dict:
+        outputs = {output_file: [*map_options, *SCREENSHOT_OUTPUT_OPTIONS]}
+        if UploaderConfig().SCREENSHOT_FRAME_REJECTION:
+            # thumbnail used to score the frame, written from the same decoded frame
+            outputs[get_thumbnail_path(output_file)] = [
+                *map_options,
+                *THUMBNAIL_OUTPUT_OPTIONS,
+            ]
+        return outputs
+
+    @staticmethod
+    def _run_ffmpeg(
+        *, upload_media, timestamp, output_file, seek_mode="accurate"
+    ):
         FFmpeg(
             inputs={
                 upload_media: [
                     "-loglevel",
                     "panic",
-                    "-ss",
-                    timestamp,
-                    "-itsoffset",
-                    "-2",
-                ]
-            },
-            outputs={
-                output_file: [
-                    "-vf",
-                    "scale='max(sar,1)*iw':'max(1/sar,1)*ih'",
-                    "-frames:v",
-                    "1",
-                    "-q:v",
-                    "10",
-                    "-pix_fmt",
-                    "rgb24",
+                    *GGBotScreenshotManager._get_seek_options(
+                        timestamp, seek_mode
+                    ),
                 ]
             },
+            outputs=GGBotScreenshotManager._get_screenshot_outputs(output_file),
         ).run()
 
+    @staticmethod
+    def _run_ffmpeg_for_all(
+        *, upload_media, timestamp_outfile_tuple, seek_mode="accurate"
+    ):
+        """
+        Takes all the screenshots with a single ffmpeg process. The media is opened once for every timestamp,
+        each input seeking to its own timestamp, and every output takes a single frame from its input.
+        This avoids spawning a process and probing the container for every screenshot.
+        """
+        seeked_inputs = []
+        outputs = {}
+        for index, (timestamp, output_file) in enumerate(
+            timestamp_outfile_tuple
+        ):
+            seeked_inputs += [
+                *GGBotScreenshotManager._get_seek_options(timestamp, seek_mode),
+                "-i",
+                upload_media,
+            ]
+            outputs.update(
+                GGBotScreenshotManager._get_screenshot_outputs(
+                    output_file, ["-map", f"{index}:v:0"]
+                )
+            )
+        # ffmpy accepts the inputs as a dict, hence the same media cannot be provided more than once as input.
+        # the seeked inputs are passed as global options instead, which ffmpy places before the outputs.
+        FFmpeg(
+            global_options=shlex.join(["-loglevel", "panic", *seeked_inputs]),
+            outputs=outputs,
+        ).run()
+
+    def _find_keyframes(self, timestamps: List[str]) -> List[float]:
+        """
+        Lists the keyframes around the timestamps from the index of the container, with a single ffprobe process.
+        Only the packets (not the frames) are read, hence nothing is decoded.
+        """
+        read_intervals = ",".join(
+            f"{timestamp}%+{KEYFRAME_SEARCH_WINDOW_SECONDS}"
+            for timestamp in sorted(timestamps, key=_timestamp_to_seconds)
+        )
+        probe_output = FFprobe(
+            inputs={self.upload_media: None},
+            global_options=[
+                "-v",
+                "quiet",
+                "-select_streams",
+                "v:0",
+                "-read_intervals",
+                read_intervals,
+                "-show_entries",
+                "packet=pts_time,flags",
+                "-of",
+                "csv=p=0",
+            ],
+        ).run(stdout=subprocess.PIPE)
+        keyframes = []
+        for line in probe_output[0].decode("utf-8").splitlines():
+            pts_time, _, flags = line.strip().partition(",")
+            if "K" in flags and pts_time not in ("", "N/A"):
+                keyframes.append(float(pts_time))
+        return keyframes
+
+    def _get_seek_timestamps(self, timestamps: List[str]) -> Dict[str, str]:
+        if self.seek_mode != "fast" or len(timestamps) == 0:
+            return {timestamp: timestamp for timestamp in timestamps}
+
+        start_time = time.perf_counter()
+        try:
+            keyframes = self._find_keyframes(timestamps)
+        except Exception as ex:
+            logging.error(
+                f"[GGBotScreenshotManager::generate_screenshots] Failed to find the keyframes from the container "
+                f"index. Screenshots will be taken from the keyframes before the timestamps. Error: {ex}"
+            )
+            keyframes = []
+        seek_timestamps = {}
+        for timestamp in timestamps:
+            seconds = _timestamp_to_seconds(timestamp)
+            nearest_keyframe = min(
+                keyframes,
+                key=lambda keyframe: abs(keyframe - seconds),
+                default=None,
+            )
+            seek_timestamps[timestamp] = (
+                timestamp
+                if nearest_keyframe is None
+                else f"{nearest_keyframe + KEYFRAME_SEEK_MARGIN_SECONDS:.3f}"
+            )
+        logging.info(
+            f"[GGBotScreenshotManager::generate_screenshots] Found {len(keyframes)} keyframes in "
+            f"{time.perf_counter() - start_time:.2f} seconds. Seek timestamps: {seek_timestamps}"
+        )
+        return seek_timestamps
+
     def _generate_screenshot(self, *, output_file, timestamp):
         if not self._does_screenshot_exist(output_file):
             self._run_ffmpeg(
                 upload_media=self.upload_media,
-                timestamp=timestamp,
+                timestamp=self.seek_timestamps.get(timestamp, timestamp),
                 output_file=output_file,
+                seek_mode=self.seek_mode,
             )
         else:
             logging.info(
@@ -219,14 +453,142 @@ class GGBotScreenshotManager:
             for timestamp in ss_timestamps
         ]
 
+    def _generate_screenshots_individually(self, timestamp_outfile_tuple):
+        workers = min(self.screenshot_workers, len(timestamp_outfile_tuple))
+        if workers <= 1:
+            for timestamp_file in track(
+                timestamp_outfile_tuple,
+                description="Taking screenshots..",
+            ):
+                self._generate_screenshot(
+                    timestamp=timestamp_file[0], output_file=timestamp_file[1]
+                )
+            return
+
+        logging.info(
+            f"[GGBotScreenshotManager::generate_screenshots] Taking {len(timestamp_outfile_tuple)} screenshots "
+            f"with {workers} workers"
+        )
+        # each screenshot is taken by its own ffmpeg process, hence threads are enough to run them in parallel
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="Screenshot"
+        ) as executor:
+            futures = [
+                executor.submit(
+                    self._generate_screenshot,
+                    timestamp=timestamp_file[0],
+                    output_file=timestamp_file[1],
+                )
+                for timestamp_file in timestamp_outfile_tuple
+            ]
+            for future in track(
+                as_completed(futures),
+                total=len(futures),
+                description="Taking screenshots..",
+            ):
+                future.result()
+
     def _generate_screenshots(self, timestamp_outfile_tuple):
-        for timestamp_file in track(
-            timestamp_outfile_tuple,
-            description="Taking screenshots..",
-        ):
-            self._generate_screenshot(
-                timestamp=timestamp_file[0], output_file=timestamp_file[1]
-            )
+        pending_screenshots = []
+        for timestamp, output_file in timestamp_outfile_tuple:
+            if self._does_screenshot_exist(output_file):
+                logging.info(
+                    f"[GGBotScreenshotManager::generate_screenshots] Continuing with existing screenshot "
+                    f"instead of taking new one: {self.torrent_title} - ({timestamp}).png"
+                )
+            else:
+                pending_screenshots.append((timestamp, output_file))
+
+        self.seek_timestamps = self._get_seek_timestamps(
+            [timestamp for timestamp, _ in pending_screenshots]
+        )
+        if len(pending_screenshots) > 1:
+            try:
+                with console.status("Taking screenshots.."):
+                    self._run_ffmpeg_for_all(
+                        upload_media=self.upload_media,
+                        timestamp_outfile_tuple=[
+                            (self.seek_timestamps[timestamp], output_file)
+                            for timestamp, output_file in pending_screenshots
+                        ],
+                        seek_mode=self.seek_mode,
+                    )
+            except Exception as ex:
+                logging.error(
+                    f"[GGBotScreenshotManager::generate_screenshots] Failed to take all screenshots with a single "
+                    f"ffmpeg invocation. Falling back to taking screenshots one by one. Error: {ex}"
+                )
+                # screenshots written by the failed process could be incomplete, hence they are taken again
+                for _, output_file in pending_screenshots:
+                    Path(output_file).unlink(missing_ok=True)
+        # screenshots that couldn't be taken in one go (if any) are taken one at a time
+        self._generate_screenshots_individually(
+            [
+                timestamp_file
+                for timestamp_file in pending_screenshots
+                if not self._does_screenshot_exist(timestamp_file[1])
+            ]
+        )
+
+    def _nudge_timestamp(self, timestamp: str, attempt: int) -> Optional[str]:
+        # bad frames are moved forward, or backward when there is no room left at the end of the video
+        seconds = _timestamp_to_seconds(timestamp)
+        offset = self.nudge_seconds * attempt
+        if seconds + offset < int(self.duration) / 1000:
+            seconds += offset
+        elif seconds - offset >= 0:
+            seconds -= offset
+        else:
+            return None
+        return time.strftime("%H:%M:%S", time.gmtime(seconds))
+
+    def _remove_screenshot(self, output_file: str) -> None:
+        Path(output_file).unlink(missing_ok=True)
+        Path(get_thumbnail_path(output_file)).unlink(missing_ok=True)
+
+    def _reject_bad_screenshots(
+        self, timestamp_outfile_tuple: List[Tuple[str, str]]
+    ) -> List[Tuple[str, str]]:
+        """
+        Replaces the black, faded and near duplicate screenshots with screenshots taken slightly later (nudged),
+        before anything is uploaded. A screenshot is nudged at most `screenshot_nudge_attempts` times, after which
+        the last screenshot is used irrespective of its score.
+        Screenshots without thumbnails (taken before frame rejection was enabled) are used as is.
+        """
+        if not self.frame_rejection:
+            return timestamp_outfile_tuple
+
+        accepted_scores: List[GGBotFrameScore] = []
+        accepted_screenshots = []
+        for timestamp, output_file in timestamp_outfile_tuple:
+            score = score_frame(output_file)
+            for attempt in range(1, self.nudge_attempts + 1):
+                reason = (
+                    None
+                    if score is None
+                    else score.get_rejection_reason(accepted_scores)
+                )
+                nudged_timestamp = (
+                    None
+                    if reason is None
+                    else self._nudge_timestamp(timestamp, attempt)
+                )
+                if nudged_timestamp is None:
+                    break
+                logging.info(
+                    f"[GGBotScreenshotManager::generate_screenshots] Rejected screenshot at {timestamp} as "
+                    f"{reason}. Taking screenshot at {nudged_timestamp} instead"
+                )
+                self._remove_screenshot(output_file)
+                timestamp, output_file = self._get_timestamp_outfile_tuple(
+                    [nudged_timestamp]
+                )[0]
+                self._generate_screenshots([(timestamp, output_file)])
+                score = score_frame(output_file)
+            if score is not None:
+                accepted_scores.append(score)
+            accepted_screenshots.append((timestamp, output_file))
+        return accepted_screenshots
 
     def generate_screenshots(self) -> bool:
         self._display_heading()
@@ -246,7 +608,17 @@ class GGBotScreenshotManager:
         timestamp_outfile_tuple = self._get_timestamp_outfile_tuple(
             ss_timestamps
         )
+        start_time = time.perf_counter()
         self._generate_screenshots(timestamp_outfile_tuple)
+        timestamp_outfile_tuple = self._reject_bad_screenshots(
+            timestamp_outfile_tuple
+        )
+        ss_timestamps = [timestamp for timestamp, _ in timestamp_outfile_tuple]
+        # time taken is logged along with the seek mode, so that the modes can be compared for a file
+        logging.info(
+            f"[GGBotScreenshotManager::generate_screenshots] Took {len(timestamp_outfile_tuple)} screenshots in "
+            f"{time.perf_counter() - start_time:.2f} seconds using {self.seek_mode} seek mode: {self.upload_media}"
+        )
 
         console.print("Finished taking screenshots!\n", style="sea_green3")
         # log the list of screenshot timestamps
@@ -297,14 +669,16 @@ class GGBotScreenshotManager:
             style="Bold Blue",
         )
         successfully_uploaded_image_count = 0
-        for tuple_item in track(
-            timestamp_outfile_tuple, description="Uploading screenshots..."
-        ):
-            status: GGBotImageUploadStatus = (
-                self.image_host_manager.upload_screenshots(
-                    image_path=tuple_item[1]
-                )
-            )
+        # screenshots are uploaded in parallel, but the statuses are in the order of the timestamps
+        upload_statuses: List[
+            GGBotImageUploadStatus
+        ] = self.image_host_manager.upload_all_screenshots(
+            self.screenshot_optimizer.optimize(
+                [tuple_item[1] for tuple_item in timestamp_outfile_tuple]
+            ),
+            prepare_for_image_host=self.screenshot_optimizer.fit_to_image_host,
+        )
+        for status in upload_statuses:
             if status.status:
                 successfully_uploaded_image_count += 1
                 images_data[
@@ -0,0 +1,148 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional
+
+from modules.exceptions.exception import GGBotUploaderException
+
+
+class GGBotStage:
+    def __init__(self, *, name: str, function: Callable, depends_on: List[str]):
+        self.name = name
+        self.function = function
+        self.depends_on = depends_on
+        self.duration: Optional[float] = None
+
+
+class GGBotStageGraph:
+    """
+    Runs a set of stages, each of which can depend on the results of other stages.
+    A stage is started as soon as all the stages it depends on have completed, hence stages that doesn't depend on
+    each other runs concurrently.
+
+    Each stage is a callable that receives the results of the completed stages as a dict (stage name -> result).
+    When a stage fails (raises an exception), or when any stage cancels the graph, no new stages are started.
+    Stages that are already running can observe the cancellation through `is_cancelled` and stop early.
+    """
+
+    def __init__(self, name: str, max_workers: Optional[int] = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.stages: Dict[str, GGBotStage] = {}
+        self.results: Dict[str, Any] = {}
+        self._cancelled = threading.Event()
+
+    def add_stage(
+        self,
+        name: str,
+        function: Callable[[Dict[str, Any]], Any],
+        depends_on: Optional[List[str]] = None,
+    ) -> "GGBotStageGraph":
+        depends_on = depends_on or []
+        for dependency in depends_on:
+            if dependency not in self.stages:
+                raise GGBotUploaderException(
+                    f"Stage `{name}` depends on unknown stage `{dependency}`"
+                )
+        self.stages[name] = GGBotStage(
+            name=name, function=function, depends_on=depends_on
+        )
+        return self
+
+    def cancel(self) -> None:
+        logging.info(f"[GGBotStageGraph::{self.name}] Cancelling the stages")
+        self._cancelled.set()
+
+    @property
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def _run_stage(self, stage: GGBotStage, results: Dict[str, Any]) -> Any:
+        logging.info(
+            f"[GGBotStageGraph::{self.name}] Starting stage `{stage.name}`"
+        )
+        start_time = time.perf_counter()
+        try:
+            return stage.function(results)
+        finally:
+            stage.duration = time.perf_counter() - start_time
+            logging.info(
+                f"[GGBotStageGraph::{self.name}] Stage `{stage.name}` finished in {stage.duration:.2f} seconds"
+            )
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Runs all the stages and waits for the running stages to complete.
+        Returns the results of the completed stages. The first exception raised by a stage is re-raised after all the
+        running stages have completed.
+        """
+        start_time = time.perf_counter()
+        pending = dict(self.stages)
+        running = {}
+        error: Optional[BaseException] = None
+        with ThreadPoolExecutor(
+            max_workers=self.max_workers or max(len(self.stages), 1),
+            thread_name_prefix=self.name,
+        ) as executor:
+            while len(pending) > 0 or len(running) > 0:
+                if error is None and not self.is_cancelled:
+                    for name in list(pending.keys()):
+                        stage = pending[name]
+                        if all(
+                            dependency in self.results
+                            for dependency in stage.depends_on
+                        ):
+                            pending.pop(name)
+                            # stages gets a snapshot of the results, so that they are not affected by other stages
+                            running[
+                                executor.submit(
+                                    self._run_stage, stage, dict(self.results)
+                                )
+                            ] = name
+                else:
+                    pending.clear()
+
+                if len(running) == 0:
+                    if len(pending) > 0:
+                        raise GGBotUploaderException(
+                            f"Stages {list(pending.keys())} cannot be started. Check the dependencies of the stages"
+                        )
+                    break
+
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                    except BaseException as ex:
+                        logging.error(
+                            f"[GGBotStageGraph::{self.name}] Stage `{name}` failed with error: {ex}"
+                        )
+                        if error is None:
+                            error = ex
+                        self._cancelled.set()
+
+        logging.info(
+            f"[GGBotStageGraph::{self.name}] Completed stages in {time.perf_counter() - start_time:.2f} seconds. "
+            f"Stage durations: { {name: round(stage.duration, 2) for name, stage in self.stages.items() if stage.duration is not None} }"
+        )
+        if error is not None:
+            raise error
+        return self.results
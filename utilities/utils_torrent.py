@@ -15,18 +15,73 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import glob
+import json
 import logging
-from typing import List
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
 
-from modules.constants import WORKING_DIR
-from modules.torrent_generator.generator_base import GGBotTorrentGeneratorBase
+from modules.config import UploaderConfig
+from modules.constants import PIECE_HASH_CACHE, WORKING_DIR
+from modules.torrent_generator.client_torrent_importer import (
+    GGBotClientTorrentImporter,
+)
+from modules.torrent_generator.generator_base import (
+    EXTRA_TORRENTS_FOLDER,
+    GGBotTorrentGeneratorBase,
+)
 from modules.torrent_generator.mktorrent_generator import (
     GGBotMkTorrentGenerator,
 )
+from modules.torrent_generator.piece_hash_cache import GGBotPieceHashCache
+from modules.torrent_generator.piece_size_policy import GGBotPieceSizePolicy
+from modules.torrent_generator.torf_generator import GGBOTTorrent
 from modules.torrent_generator.torf_generator import GGBotTorfTorrentGenerator
 from modules.torrent_generator.torrent_editor import GGBotTorrentEditor
 from utilities.utils import normalize_for_system_path
 
+# .torrent files of a media are created one at a time, since the torrents for all the trackers are edited from the
+# first one generated. This allows the trackers to be processed concurrently.
+# lock of a media is kept along with the number of trackers using it, and is removed once no tracker needs it
+_torrent_creation_locks: Dict[str, Tuple[threading.Lock, int]] = {}
+_torrent_creation_locks_guard = threading.Lock()
+
+
+@contextmanager
+def _torrent_creation_lock(torrent_prefix: str):
+    with _torrent_creation_locks_guard:
+        lock, users = _torrent_creation_locks.get(
+            torrent_prefix, (threading.Lock(), 0)
+        )
+        _torrent_creation_locks[torrent_prefix] = (lock, users + 1)
+    try:
+        with lock:
+            yield
+    finally:
+        with _torrent_creation_locks_guard:
+            lock, users = _torrent_creation_locks[torrent_prefix]
+            if users == 1:
+                del _torrent_creation_locks[torrent_prefix]
+            else:
+                _torrent_creation_locks[torrent_prefix] = (lock, users - 1)
+
+
+def get_piece_size_policies(
+    trackers: List[str], site_templates_path: str, acronym_to_tracker: Dict
+) -> Dict[str, GGBotPieceSizePolicy]:
+    """Returns the piece size constraints declared in the site templates of the trackers"""
+    policies = {}
+    for tracker in trackers:
+        with open(
+            f"{site_templates_path}{acronym_to_tracker.get(str(tracker).lower())}.json",
+            encoding="utf-8",
+        ) as template:
+            policies[tracker] = GGBotPieceSizePolicy.from_template(
+                json.load(template)
+            )
+    return policies
+
 
 def _callback_progress(torrent, filepath, pieces_done, pieces_total):
     _print_progress_bar(
@@ -72,8 +127,15 @@ class GGBotTorrentCreator:
         announce_urls: List,
         source: str,
         use_mktorrent: bool,
+        is_cancelled: Optional[Callable[[], bool]] = None,
+        export_client_torrent: Optional[Callable[[], Optional[bytes]]] = None,
+        piece_size_policies: Optional[Dict[str, GGBotPieceSizePolicy]] = None,
     ):
         self.working_dir = WORKING_DIR.format(base_path=working_folder)
+        # the cache is kept outside the working dir, which is cleared after every upload
+        self.piece_hash_cache_path = PIECE_HASH_CACHE.format(
+            base_path=working_folder
+        )
         self.hash_prefix = hash_prefix
         self.media = media
         self.torrent_title = normalize_for_system_path(torrent_title)
@@ -81,6 +143,21 @@ class GGBotTorrentCreator:
         self.source = source
         self.tracker = tracker
         self.use_mktorrent = use_mktorrent
+        # when provided, torrent generation will be stopped once this returns True
+        self.is_cancelled = is_cancelled
+        # when provided, the torrent exported from the torrent client is reused instead of hashing the media
+        self.export_client_torrent = export_client_torrent
+        # piece size constraints of all the trackers the media is uploaded to.
+        # the torrent is hashed with piece sizes that satisfies all of them, so that the other trackers can edit it
+        piece_size_policies = piece_size_policies or {}
+        self.piece_size_policy = piece_size_policies.get(
+            tracker, GGBotPieceSizePolicy()
+        )
+        self.other_piece_size_policies = [
+            policy
+            for policy_tracker, policy in piece_size_policies.items()
+            if policy_tracker != tracker
+        ]
 
     def generate_dot_torrent(self):
         logging.info("[DotTorrentGeneration] Creating the .torrent file now")
@@ -91,10 +168,37 @@ class GGBotTorrentCreator:
             f"[DotTorrentGeneration] Source field in info `{self.source}`"
         )
 
-        if self.torrent_file_exist:
-            self._edit_existing_torrent()
-        else:
-            self._generate_new_torrent()
+        with _torrent_creation_lock(f"{self.working_dir}{self.hash_prefix}"):
+            existing_torrent = self._find_existing_torrent()
+            if existing_torrent is None and self._import_client_torrent():
+                existing_torrent = self._find_existing_torrent()
+            if existing_torrent is not None:
+                self._edit_existing_torrent(existing_torrent)
+            else:
+                self._generate_new_torrent()
+
+    def _find_existing_torrent(self) -> Optional[str]:
+        """Returns an existing .torrent of the media whose piece size is accepted by the tracker"""
+        torrent_prefix = f"{self.working_dir}{self.hash_prefix}"
+        for torrent_path in sorted(
+            glob.glob(f"{torrent_prefix}*.torrent")
+        ) + sorted(
+            glob.glob(f"{torrent_prefix}{EXTRA_TORRENTS_FOLDER}/*.torrent")
+        ):
+            try:
+                torrent = GGBOTTorrent.read(torrent_path)
+            except Exception as ex:
+                logging.error(
+                    f"[DotTorrentGeneration] Failed to read existing torrent {torrent_path}. Error: {ex}"
+                )
+                continue
+            if self.piece_size_policy.allows(torrent.piece_size, torrent.size):
+                return torrent_path
+            logging.info(
+                f"[DotTorrentGeneration] Piece size {torrent.piece_size} of {torrent_path} is not accepted by "
+                f"{self.tracker}"
+            )
+        return None
 
     def _generate_new_torrent(self):
         # we need to actually generate a torrent file "from scratch"
@@ -104,10 +208,44 @@ class GGBotTorrentCreator:
         torrent_generator: GGBotTorrentGeneratorBase = (
             self._get_torrent_generator()
         )
-        torrent_generator.generate_torrent()
+        try:
+            torrent_generator.generate_torrent()
+        finally:
+            if torrent_generator.piece_hash_cache is not None:
+                torrent_generator.piece_hash_cache.close()
+        if self.is_cancelled is not None and self.is_cancelled():
+            logging.info(
+                "[DotTorrentGeneration] Torrent generation has been cancelled"
+            )
+            return
         torrent_generator.do_post_generation_task()
 
-    def _edit_existing_torrent(self):
+    def _import_client_torrent(self) -> bool:
+        client_torrent_path = (
+            f"{self.working_dir}{self.hash_prefix}GGBOT_CLIENT.torrent"
+        )
+        if self.export_client_torrent is None:
+            return False
+        if Path(client_torrent_path).is_file():
+            # client torrent was imported already, but its piece size is not accepted by this tracker
+            return False
+        try:
+            metainfo = self.export_client_torrent()
+        except Exception as ex:
+            logging.error(
+                f"[DotTorrentGeneration] Failed to export the torrent from the client. Error: {ex}"
+            )
+            return False
+        if metainfo is None:
+            return False
+        logging.info(
+            "[DotTorrentGeneration] Trying to reuse the torrent exported from the client"
+        )
+        return GGBotClientTorrentImporter(
+            self.media, self.piece_size_policies
+        ).import_torrent(metainfo, torrent_path=client_torrent_path)
+
+    def _edit_existing_torrent(self, torrent_path: Optional[str] = None):
         torrent_editor = GGBotTorrentEditor(
             f"{self.working_dir}{self.hash_prefix}"
         )
@@ -116,6 +254,7 @@ class GGBotTorrentCreator:
             tracker=self.tracker,
             source=self.source,
             torrent_title=self.torrent_title,
+            torrent_path=torrent_path,
         )
 
     @property
@@ -137,6 +276,8 @@ class GGBotTorrentCreator:
                 source=self.source,
                 torrent_title=self.torrent_title,
                 torrent_path_prefix=f"{self.working_dir}{self.hash_prefix}{self.tracker}",
+                progress_callback=self._callback_progress,
+                piece_size_policies=self.piece_size_policies,
             )
         return GGBotTorfTorrentGenerator(
             media=self.media,
@@ -144,5 +285,23 @@ class GGBotTorrentCreator:
             source=self.source,
             torrent_title=self.torrent_title,
             torrent_path_prefix=f"{self.working_dir}{self.hash_prefix}{self.tracker}",
-            progress_callback=_callback_progress,
+            progress_callback=self._callback_progress,
+            piece_hash_cache=self._get_piece_hash_cache(),
+            piece_size_policies=self.piece_size_policies,
         )
+
+    @property
+    def piece_size_policies(self) -> List[GGBotPieceSizePolicy]:
+        # policy of this tracker comes first, since the torrent of this tracker is the one being generated
+        return [self.piece_size_policy, *self.other_piece_size_policies]
+
+    def _get_piece_hash_cache(self) -> Optional[GGBotPieceHashCache]:
+        if not UploaderConfig().PIECE_HASH_CACHE:
+            return None
+        return GGBotPieceHashCache(self.piece_hash_cache_path)
+
+    def _callback_progress(self, torrent, filepath, pieces_done, pieces_total):
+        # returning anything other than None will stop the hashing
+        if self.is_cancelled is not None and self.is_cancelled():
+            return True
+        _callback_progress(torrent, filepath, pieces_done, pieces_total)
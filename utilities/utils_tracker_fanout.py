@@ -0,0 +1,140 @@
+# GG Bot Upload Assistant
+# Copyright (C) 2022  Noob Master669
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published
+# by the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from modules.config import TrackerConfig
+
+
+class GGBotRateLimiter:
+    """
+    Spaces out the requests evenly so that no more than `requests_per_minute` requests are made in a minute.
+    A limit of 0 (or less) disables the rate limiting.
+    """
+
+    def __init__(self, requests_per_minute: float):
+        self.interval = (
+            60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        )
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> float:
+        """Blocks until the request can be made. Returns the number of seconds waited."""
+        if self.interval == 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        wait_time = slot - now
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+
+class GGBotTrackerLimiter:
+    """
+    Limits the requests made to the trackers.
+    - `requests_per_minute` is the global rate limit for the requests made to all the trackers together
+    - `<TRACKER>_MAX_CONCURRENT_REQUESTS` limits the number of requests made to a tracker at the same time
+    - `<TRACKER>_REQUESTS_PER_MINUTE` is the rate limit for the requests made to a tracker
+    The limits are shared across threads, hence a single limiter needs to be used by the whole application.
+    """
+
+    def __init__(self, requests_per_minute: float = 0):
+        self.global_rate_limiter = GGBotRateLimiter(requests_per_minute)
+        self._tracker_limits: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _get_tracker_limits(self, tracker: str) -> tuple:
+        tracker = str(tracker).upper()
+        with self._lock:
+            if tracker not in self._tracker_limits:
+                tracker_config = TrackerConfig(tracker)
+                max_concurrent_requests = tracker_config.MAX_CONCURRENT_REQUESTS
+                self._tracker_limits[tracker] = (
+                    (
+                        threading.BoundedSemaphore(max_concurrent_requests)
+                        if max_concurrent_requests > 0
+                        else None
+                    ),
+                    GGBotRateLimiter(tracker_config.REQUESTS_PER_MINUTE),
+                )
+            return self._tracker_limits[tracker]
+
+    @contextmanager
+    def request(self, tracker: str):
+        semaphore, rate_limiter = self._get_tracker_limits(tracker)
+        if semaphore is not None:
+            semaphore.acquire()
+        try:
+            wait_time = self.global_rate_limiter.acquire()
+            wait_time += rate_limiter.acquire()
+            if wait_time > 0:
+                logging.info(
+                    f"[GGBotTrackerLimiter] Waited {wait_time:.2f} seconds before making request to {tracker}"
+                )
+            yield
+        finally:
+            if semaphore is not None:
+                semaphore.release()
+
+
+def run_for_trackers(
+    trackers: List[str],
+    function: Callable[[str], Any],
+    max_workers: Optional[int] = 1,
+) -> Dict[str, Any]:
+    """
+    Invokes `function` for each of the trackers and returns the results (tracker -> result) in the order of trackers.
+    When `max_workers` is more than 1, the trackers are processed concurrently. In such cases the `function` is
+    responsible for not sharing any tracker specific state between the trackers.
+    If the function fails for any tracker, the first error is raised once all the trackers have been processed.
+    """
+    if max_workers is None or max_workers <= 1 or len(trackers) <= 1:
+        return {tracker: function(tracker) for tracker in trackers}
+
+    logging.info(
+        f"[TrackerFanOut] Processing {len(trackers)} trackers with {min(max_workers, len(trackers))} workers"
+    )
+    results: Dict[str, Any] = {}
+    error: Optional[Exception] = None
+    with ThreadPoolExecutor(
+        max_workers=min(max_workers, len(trackers)),
+        thread_name_prefix="TrackerUpload",
+    ) as executor:
+        futures = {
+            executor.submit(function, tracker): tracker for tracker in trackers
+        }
+        for future in as_completed(futures):
+            tracker = futures[future]
+            try:
+                results[tracker] = future.result()
+            except Exception as ex:
+                logging.exception(
+                    f"[TrackerFanOut] Unexpected error while processing tracker {tracker}"
+                )
+                if error is None:
+                    error = ex
+    if error is not None:
+        raise error
+    return {tracker: results[tracker] for tracker in trackers}
@@ -232,6 +232,9 @@ class VisorServerManager:
             }, 200
         return {"status": "Error", "message": "Unknown action"}, 404
 
+    def get_cache_index_usage(self):
+        return self.cache.index_usage()
+
     def get_status(self):
         if self.cache.hello():
             return {"status": "OK", "message": "GG-BOT Auto-ReUploader"}, 200